@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Semantic Answer Cache
+---------------------
+During a complaint wave dozens of guests send nearly the same review, and
+each one would otherwise trigger a full multi-tool agent run. This cache
+sits in front of agent.run:
+
+  - every answered review is embedded locally (text_embedding.py) and
+    stored with its answer, partitioned by hotel
+  - a new review is compared against its hotel's partition:
+      similarity >= draft_threshold     -> the cached draft is adapted to
+                                           the new review by one cheap,
+                                           tool-free run (personalise_prompt
+                                           of complaint_clusters.py)
+      similarity >= research_threshold  -> the agent runs once more, with
+                                           the earlier answer as a lead it
+                                           checks before searching again
+  - entries expire after a TTL, and each partition is capped in size
+
+Thresholds are cosine similarities of the hashed embeddings: unrelated
+corpus reviews score below ~0.35 99.9% of the time, paraphrases of one
+incident around 0.45-0.65, and near-verbatim copies above 0.8. Different
+incidents worded alike score as high as paraphrases ("noise from the
+concert" vs "noise from the construction" at the same hotel: 0.74), so a
+research hit is only a lead: the prompt leaves the agent free to search.
+
+Usage:
+  cache = SemanticCache()
+  hit = cache.lookup(review, hotel="Oasis")
+  if hit and hit.mode == MODE_DRAFT:
+      answer = agent.run(personalise_prompt(review, hit.entry.answer)).final_output
+  else:
+      answer = agent.run(research_prompt(review, hit) if hit else prompt).final_output
+      cache.store(review, answer, hotel="Oasis")
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from review_corpus import extract_hotel_mentions
+from text_embedding import default_embedder
+
+DRAFT_THRESHOLD = 0.8
+RESEARCH_THRESHOLD = 0.4
+DEFAULT_TTL = 6 * 3600.0
+MAX_ENTRIES = 2000
+# Partition for reviews that name no hotel
+ANY_HOTEL = "*"
+
+MODE_DRAFT = "draft"
+MODE_RESEARCH = "research"
+
+RESEARCH_PROMPT = """
+    A guest shared the following review:
+
+    "{review}"
+
+    A similar complaint about the same hotel was researched {age} ago.
+    This was the response drafted for it:
+
+    ---
+    {answer}
+    ---
+
+    It may be about a different incident worded alike. Reuse the findings above only where
+    this guest describes the same cause, and use the tools for anything they do not cover.
+    Then draft a short, empathetic response to this guest, adapted to what they wrote.
+"""
+
+
+def hotel_for(review, hotel=None):
+    """Cache partition of a review: the given hotel, else the first hotel it mentions."""
+    if hotel is not None and not isinstance(hotel, str):
+        raise TypeError(f"hotel must be a string, not {type(hotel).__name__}")
+    if hotel:
+        return hotel.strip().lower()
+    mentions = extract_hotel_mentions(review)
+    return mentions[0].lower() if mentions else ANY_HOTEL
+
+
+def _format_age(seconds):
+    if seconds < 90:
+        return f"{seconds:.0f} seconds"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f} minutes"
+    return f"{seconds / 3600:.1f} hours"
+
+
+class CacheEntry:
+    __slots__ = ("review", "answer", "hotel", "created", "hits")
+
+    def __init__(self, review, answer, hotel, created):
+        self.review = review
+        self.answer = answer
+        self.hotel = hotel
+        self.created = created
+        self.hits = 0
+
+
+class CacheHit:
+    def __init__(self, entry, similarity, mode, age):
+        self.entry = entry
+        self.similarity = similarity
+        self.mode = mode
+        self.age = age
+
+    def to_dict(self):
+        return {"mode": self.mode, "similarity": round(self.similarity, 3), "age_s": round(self.age),
+                "hotel": self.entry.hotel}
+
+
+class Partition:
+    """One hotel's entries and their vectors, in insertion (= age) order."""
+
+    def __init__(self, dim):
+        self.vectors = np.empty((16, dim), dtype=np.float32)
+        self.created = np.empty(16, dtype=np.float64)
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, vector, entry):
+        size = len(self.entries)
+        if size == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.empty_like(self.vectors)])
+            self.created = np.concatenate([self.created, np.empty_like(self.created)])
+        self.vectors[size] = vector
+        self.created[size] = entry.created
+        self.entries.append(entry)
+
+    def drop_oldest(self, count):
+        """Drop the `count` oldest entries (they are at the front)."""
+        if count <= 0:
+            return 0
+        size = len(self.entries)
+        self.vectors[:size - count] = self.vectors[count:size]
+        self.created[:size - count] = self.created[count:size]
+        del self.entries[:count]
+        return count
+
+    def best(self, vector):
+        """(entry, similarity) of the closest entry."""
+        size = len(self.entries)
+        similarities = self.vectors[:size] @ vector
+        index = int(np.argmax(similarities))
+        return self.entries[index], float(similarities[index])
+
+
+class SemanticCache:
+    """Thread-safe, TTL-bounded semantic cache of concierge answers."""
+
+    def __init__(self, embedder=None, draft_threshold=DRAFT_THRESHOLD, research_threshold=RESEARCH_THRESHOLD,
+                 ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES, clock=time.time):
+        self.embedder = embedder or default_embedder()
+        self.draft_threshold = draft_threshold
+        self.research_threshold = research_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = {MODE_DRAFT: 0, MODE_RESEARCH: 0}
+        self.misses = 0
+        self.expired = 0
+        self._partitions = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, partition, now):
+        # Entries are in creation order, so the expired ones form a prefix.
+        stale = int(np.searchsorted(partition.created[:len(partition)], now - self.ttl, side="left"))
+        self.expired += partition.drop_oldest(stale)
+
+    def lookup(self, review, hotel=None):
+        """Closest cached answer for this hotel, or None below research_threshold."""
+        key = hotel_for(review, hotel)
+        vector = self.embedder.embed(review)
+        with self._lock:
+            now = self.clock()
+            partition = self._partitions.get(key)
+            if partition is not None:
+                self._expire(partition, now)
+            if not partition:
+                self.misses += 1
+                return None
+            entry, similarity = partition.best(vector)
+            if similarity < self.research_threshold:
+                self.misses += 1
+                return None
+            mode = MODE_DRAFT if similarity >= self.draft_threshold else MODE_RESEARCH
+            entry.hits += 1
+            self.hits[mode] += 1
+            return CacheHit(entry, similarity, mode, now - entry.created)
+
+    def store(self, review, answer, hotel=None):
+        if not answer:
+            return
+        key = hotel_for(review, hotel)
+        vector = self.embedder.embed(review)
+        with self._lock:
+            now = self.clock()
+            partition = self._partitions.setdefault(key, Partition(self.embedder.dim))
+            self._expire(partition, now)
+            partition.drop_oldest(len(partition) - self.max_entries + 1)
+            partition.add(vector, CacheEntry(review, answer, key, now))
+
+    def clear(self, hotel=None):
+        with self._lock:
+            if hotel is None:
+                self._partitions.clear()
+            else:
+                self._partitions.pop(hotel_for("", hotel), None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.misses + sum(self.hits.values())
+            return {
+                "entries": sum(len(p) for p in self._partitions.values()),
+                "partitions": len(self._partitions),
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else 0.0,
+                "expired": self.expired,
+                "ttl_s": self.ttl,
+            }
+
+
+def research_prompt(review, hit):
+    """Agent input that reuses a cached answer's research for a similar review."""
+    return RESEARCH_PROMPT.format(review=review, age=_format_age(hit.age), answer=hit.entry.answer)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Batch API Key Provisioning
+--------------------------
+Cohort version of setup_user_api_key.py: generates an API signing key for
+many users at once, uploads the public keys and writes one config bundle
+per user.
+
+  - RSA key generation is CPU-bound, so it runs in a process pool
+  - fingerprints come from fingerprint.py (native MD5); the first key of
+    every batch is cross-checked against the pure-Python md5
+  - each bundle (private key, public key, config) is written atomically
+    before its public key is uploaded, so no uploaded key lacks its
+    private half; uploads go through the Identity API concurrently
+  - a failed upload removes its bundle again; when the key may have
+    reached the user anyway (timeout, fingerprint mismatch) it is deleted
+    from the user first, since OCI allows only 3 API keys per user
+  - users that already have a bundle in --out-dir are skipped
+
+Users file: one user OCID per line, optionally followed by a comma and a
+bundle name (defaults to the OCID).
+
+Usage:
+  python batch_api_keys.py --users-file cohort.txt --out-dir bundles
+  python batch_api_keys.py --benchmark 32
+"""
+
+import argparse
+import os
+import shutil
+import stat
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import oci
+
+from setup_user_api_key import (
+    DEFAULT_KEY_NAME,
+    DEFAULT_PROFILE_NAME,
+    DEFAULT_REGION,
+    PRIVATE_KEY_FILENAME_SUFFIX,
+    PRIVATE_KEY_LABEL,
+    PUBLIC_KEY_FILENAME_SUFFIX,
+    generate_key,
+    serialize_key,
+)
+from fingerprint import BACKENDS, fingerprint_pem
+from oci_clients import ClientFactory
+
+DEFAULT_KEY_SIZE = 2048
+DEFAULT_UPLOAD_WORKERS = 8
+
+
+class FingerprintMismatch(Exception):
+    """Raised when the native and pure-Python MD5 disagree."""
+
+
+class ApiKeyLeftBehind(Exception):
+    """Raised when a failed upload may have left a key on the user that could not be deleted."""
+
+
+def generate_keypair_pem(key_size=DEFAULT_KEY_SIZE):
+    """Generate an RSA key pair and return (private_pem, public_pem) bytes.
+
+    Module-level so it can run in a ProcessPoolExecutor worker.
+    """
+    private_key = generate_key(key_size)
+    return (serialize_key(private_key=private_key),
+            serialize_key(public_key=private_key.public_key()))
+
+
+def checked_fingerprint(public_pem):
+    """Native fingerprint, verified against the pure-Python implementation."""
+    fast = fingerprint_pem(public_pem)
+    expected = fingerprint_pem(public_pem, backend="pure")
+    if fast != expected:
+        raise FingerprintMismatch(f"native {fast} != pure-Python {expected}")
+    return fast
+
+
+def atomic_write(path, data):
+    """Write bytes to `path` via a user-only temp file and an atomic rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        os.fchmod(fd, stat.S_IRUSR | stat.S_IWUSR)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def render_config(user_id, fingerprint, key_file, tenancy, region, profile_name=DEFAULT_PROFILE_NAME):
+    return (
+        f"[{profile_name}]\n"
+        f"user={user_id}\n"
+        f"fingerprint={fingerprint}\n"
+        f"key_file={key_file}\n"
+        f"tenancy={tenancy}\n"
+        f"region={region}\n"
+    )
+
+
+def bundle_dir_for(out_dir, name):
+    return os.path.abspath(os.path.join(out_dir, name))
+
+
+def write_bundle(out_dir, name, user_id, private_pem, public_pem, fingerprint, tenancy, region):
+    """Write private key, public key and config for one user; return the bundle dir."""
+    bundle_dir = bundle_dir_for(out_dir, name)
+    os.makedirs(bundle_dir, exist_ok=True)
+    os.chmod(bundle_dir, stat.S_IRUSR | stat.S_IWUSR | stat.S_IXUSR)
+
+    private_path = os.path.join(bundle_dir, DEFAULT_KEY_NAME + PRIVATE_KEY_FILENAME_SUFFIX)
+    public_path = os.path.join(bundle_dir, DEFAULT_KEY_NAME + PUBLIC_KEY_FILENAME_SUFFIX)
+    atomic_write(private_path, private_pem + PRIVATE_KEY_LABEL.encode("ascii"))
+    atomic_write(public_path, public_pem)
+    # Config last: a bundle with a config file is a complete bundle.
+    atomic_write(os.path.join(bundle_dir, "config"),
+                 render_config(user_id, fingerprint, private_path, tenancy, region).encode("ascii"))
+    return bundle_dir
+
+
+def read_users(file_path):
+    """Return (user_ocid, bundle_name) pairs from the users file."""
+    users = []
+    with open(file_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            user_id, _, name = line.partition(",")
+            users.append((user_id.strip(), (name.strip() or user_id.strip())))
+    return users
+
+
+def generate_keys(count, key_size=DEFAULT_KEY_SIZE, workers=None):
+    """Generate `count` key pairs in a process pool."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(generate_keypair_pem, [key_size] * count))
+
+
+def _error_message(e):
+    return getattr(e, "message", None) or str(e) or type(e).__name__
+
+
+def delete_uploaded_key(identity_client, user_id, fingerprint, reason):
+    """Delete a key a failed upload may have left on the user, then raise `reason`."""
+    try:
+        identity_client.delete_api_key(user_id, fingerprint)
+    except Exception as e:
+        # 404: the upload never happened.
+        if getattr(e, "status", None) != 404:
+            raise ApiKeyLeftBehind(f"{_error_message(reason)}; key {fingerprint} could not be deleted: "
+                                   f"{_error_message(e)}") from reason
+    raise reason
+
+
+def upload_keys(identity_client, uploads, workers=DEFAULT_UPLOAD_WORKERS):
+    """Upload public keys concurrently.
+
+    `uploads` is a list of (user_id, public_pem, fingerprint). Returns
+    user_id -> exception for every failed or mismatching upload; a key that
+    may have been uploaded anyway is deleted again, and ApiKeyLeftBehind
+    reports the ones that could not be.
+    """
+
+    def upload(item):
+        user_id, public_pem, fingerprint = item
+        details = oci.identity.models.CreateApiKeyDetails(key=public_pem.decode("ascii"))
+        try:
+            response = identity_client.upload_api_key(user_id, details)
+        except oci.exceptions.ServiceError:
+            raise  # Rejected by the service: nothing was uploaded.
+        except Exception as e:
+            # A timeout or dropped connection may have uploaded the key anyway.
+            delete_uploaded_key(identity_client, user_id, fingerprint, e)
+        if response.data.fingerprint != fingerprint:
+            delete_uploaded_key(identity_client, user_id, response.data.fingerprint, FingerprintMismatch(
+                f"service fingerprint {response.data.fingerprint} != {fingerprint}"))
+
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(upload, item): item[0] for item in uploads}
+        for future, user_id in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                errors[user_id] = e
+    return errors
+
+
+def provision(users, out_dir, tenancy, region, identity_client=None,
+              key_size=DEFAULT_KEY_SIZE, workers=None, upload_workers=DEFAULT_UPLOAD_WORKERS):
+    # A new bundle would overwrite the private key of a key already on the user.
+    existing = {user_id for user_id, name in users
+                if os.path.exists(os.path.join(bundle_dir_for(out_dir, name), "config"))}
+    if existing:
+        print(f"⏭️  Skipping {len(existing)} user(s) that already have a bundle in {out_dir}")
+        users = [(user_id, name) for user_id, name in users if user_id not in existing]
+
+    started = time.perf_counter()
+    print(f"🔄 Generating {len(users)} RSA-{key_size} key(s) in a process pool...")
+    keys = generate_keys(len(users), key_size, workers)
+    keygen_seconds = time.perf_counter() - started
+    print(f"✅ Generated {len(keys)} key(s) in {keygen_seconds:.1f}s ({len(keys) / keygen_seconds:.1f} keys/s)")
+
+    fingerprints = []
+    for index, (_, public_pem) in enumerate(keys):
+        # Cross-check the native digest once per batch; it is deterministic.
+        fingerprints.append(checked_fingerprint(public_pem) if index == 0 else fingerprint_pem(public_pem))
+
+    # Bundles first: an uploaded key must never be missing its private key.
+    errors = {}
+    bundles = {}
+    for (user_id, name), (private_pem, public_pem), fingerprint in zip(users, keys, fingerprints):
+        try:
+            bundles[user_id] = write_bundle(out_dir, name, user_id, private_pem, public_pem, fingerprint,
+                                            tenancy, region)
+        except OSError as e:
+            errors[user_id] = e
+            print(f"❌ {name}: could not write the bundle: {e}")
+
+    if identity_client is not None and bundles:
+        print(f"🔄 Uploading {len(bundles)} public key(s)...")
+        upload_errors = upload_keys(identity_client,
+                                    [(user_id, public_pem, fp) for (user_id, _), (_, public_pem), fp
+                                     in zip(users, keys, fingerprints) if user_id in bundles],
+                                    workers=upload_workers)
+        for user_id, name in users:
+            if user_id not in upload_errors:
+                continue
+            error = errors[user_id] = upload_errors[user_id]
+            bundle_dir = bundles.pop(user_id)
+            if isinstance(error, ApiKeyLeftBehind):
+                # The key may be on the user: keep its private half so it can be used or deleted.
+                print(f"❌ {name}: {_error_message(error)} (bundle kept in {bundle_dir})")
+            else:
+                shutil.rmtree(bundle_dir, ignore_errors=True)
+                print(f"❌ {name}: {_error_message(error)}")
+
+    written = len(bundles)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Wrote {written} bundle(s) to {out_dir} in {elapsed:.1f}s "
+          f"({written / elapsed:.1f} users/s end to end, {len(errors)} failed)")
+    return errors
+
+
+def benchmark(count, key_size=DEFAULT_KEY_SIZE, workers=None):
+    """Print keys/s for serial vs. process-pool keygen and native vs. pure-Python fingerprints."""
+    print(f"⏱️  Benchmark: {count} RSA-{key_size} key(s), {os.cpu_count()} CPU(s)")
+
+    started = time.perf_counter()
+    serial = [generate_keypair_pem(key_size) for _ in range(count)]
+    serial_rate = count / (time.perf_counter() - started)
+    print(f"   keygen serial         {serial_rate:10.1f} keys/s")
+
+    started = time.perf_counter()
+    generate_keys(count, key_size, workers)
+    pool_rate = count / (time.perf_counter() - started)
+    print(f"   keygen process pool   {pool_rate:10.1f} keys/s  ({pool_rate / serial_rate:.1f}x)")
+
+    publics = [public_pem for _, public_pem in serial]
+    for backend in BACKENDS:
+        rounds = max(1, 2000 // count)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for public_pem in publics:
+                fingerprint_pem(public_pem, backend)
+        rate = rounds * count / (time.perf_counter() - started)
+        print(f"   fingerprint {backend:<10}{rate:10.0f} keys/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch OCI API key provisioning")
+    parser.add_argument("--users-file", help="File with one user OCID per line (optionally 'ocid,name')")
+    parser.add_argument("--out-dir", default="api_key_bundles", help="Directory for per-user bundles")
+    parser.add_argument("--region", default=DEFAULT_REGION, help="Region written to each config")
+    parser.add_argument("--tenancy", default=os.environ.get("OCI_TENANCY"), help="Tenancy OCID (defaults to OCI_TENANCY)")
+    parser.add_argument("--key-size", type=int, default=DEFAULT_KEY_SIZE)
+    parser.add_argument("--workers", type=int, help="Key generation processes (defaults to CPU count)")
+    parser.add_argument("--upload-workers", type=int, default=DEFAULT_UPLOAD_WORKERS)
+    parser.add_argument("--no-upload", action="store_true", help="Only generate keys and bundles")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark with N keys and exit")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.key_size, args.workers)
+        return
+    if not args.users_file:
+        parser.error("--users-file is required unless --benchmark is given")
+
+    identity_client = None
+    tenancy = args.tenancy
+    if not args.no_upload:
+        clients = ClientFactory()
+        identity_client = clients.identity()
+        tenancy = tenancy or clients.tenancy
+
+    users = read_users(args.users_file)
+    os.makedirs(args.out_dir, exist_ok=True)
+    errors = provision(users, args.out_dir, tenancy, args.region, identity_client,
+                       key_size=args.key_size, workers=args.workers, upload_workers=args.upload_workers)
+    if identity_client is not None:
+        clients.print_summary()
+    if errors:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Provisioning Benchmark
+----------------------
+Runs the real orchestration code against the in-process fake control plane
+(fake_oci.py) and reports end-to-end provisioning and teardown time for a
+lab of N users:
+
+  provisioning
+    1. env_setup/setup_lab_env_forusers.py   group, compartments, users, policies
+    2. one concierge stack per user           setup.build_provisioning_graph
+  teardown
+    3. one teardown graph per stack           cleanup.build_teardown_graph
+    4. env_setup/delete_genai_resources...    sweep leftovers and compartments
+    5. env_setup/cleanup_lab_env_forusers.py  users, policies, group
+
+The lab scripts run unmodified via runpy (prompts answered, ClientFactory
+swapped for the fake). All service latencies, transition times, rate
+limits and the scripts' poll intervals are compressed by --scale; the
+"modelled" column divides wall time by the scale to estimate the time the
+same run would take against the real service.
+
+A single end-to-end `setup.py` / `cleanup.py` CLI run (packed upload) is
+reported first.
+
+Usage:
+  python benchmark_provisioning.py                       # 1, 50 and 500 users
+  python benchmark_provisioning.py --users 1 50 --scale 0.005 --verbose
+"""
+
+import argparse
+import builtins
+import contextlib
+import os
+import runpy
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENV_SETUP = os.path.join(HERE, "env_setup")
+sys.path.insert(0, ENV_SETUP)
+
+import cleanup  # noqa: E402
+import identity_executor  # noqa: E402
+import oci_clients  # noqa: E402
+import oci_waiter  # noqa: E402
+import setup  # noqa: E402
+from fake_oci import RATE_LIMITS, FakeClientFactory, FakeControlPlane, Latency  # noqa: E402
+from state_store import StateStore  # noqa: E402
+
+LAB_NAME = "benchlab"
+DEFAULT_USERS = [1, 50, 500]
+DEFAULT_SCALE = 0.01
+STACK_WORKERS = 50
+
+
+class Timer:
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+
+@contextlib.contextmanager
+def quiet(verbose):
+    if verbose:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+@contextlib.contextmanager
+def simulated(factory, scale):
+    """Point every script at the fake and compress its timing constants."""
+    saved = [
+        (oci_clients, "ClientFactory", oci_clients.ClientFactory),
+        (setup, "ClientFactory", setup.ClientFactory),
+        (cleanup, "ClientFactory", cleanup.ClientFactory),
+        (setup, "FILE_TO_UPLOAD", setup.FILE_TO_UPLOAD),
+        (oci_waiter, "INITIAL_DELAY", oci_waiter.INITIAL_DELAY),
+        (oci_waiter, "MAX_DELAY", oci_waiter.MAX_DELAY),
+        (identity_executor, "API_FAMILY_RATES", identity_executor.API_FAMILY_RATES),
+        (identity_executor, "MIN_RATE", identity_executor.MIN_RATE),
+        (identity_executor, "RATE_INCREASE", identity_executor.RATE_INCREASE),
+        (identity_executor, "RETRY_DELAY", identity_executor.RETRY_DELAY),
+        (identity_executor, "MAX_RETRY_DELAY", identity_executor.MAX_RETRY_DELAY),
+    ]
+    make_factory = lambda *args, **kwargs: factory  # noqa: E731
+    try:
+        oci_clients.ClientFactory = setup.ClientFactory = cleanup.ClientFactory = make_factory
+        setup.FILE_TO_UPLOAD = os.path.join(HERE, setup.FILE_TO_UPLOAD)
+        oci_waiter.INITIAL_DELAY *= scale
+        oci_waiter.MAX_DELAY *= scale
+        identity_executor.MIN_RATE /= scale
+        identity_executor.RATE_INCREASE /= scale
+        identity_executor.RETRY_DELAY *= scale
+        identity_executor.MAX_RETRY_DELAY *= scale
+        identity_executor.API_FAMILY_RATES = {
+            family: (ceiling / scale, rate / scale)
+            for family, (ceiling, rate) in identity_executor.API_FAMILY_RATES.items()
+        }
+        yield
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+
+
+def run_script(path, answers):
+    """Run an env_setup script as __main__, answering its input() prompts."""
+    replies = iter(answers)
+    original_input, original_argv = builtins.input, sys.argv
+    builtins.input = lambda prompt="": next(replies)
+    # The scripts parse their own flags; don't hand them the benchmark's.
+    sys.argv = [path]
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        builtins.input, sys.argv = original_input, original_argv
+
+
+def run_cli(workdir, verbose):
+    """setup.py then cleanup.py, end to end through their main()."""
+    timer = Timer()
+    argv = sys.argv
+    os.chdir(workdir)
+    try:
+        with quiet(verbose):
+            with timer.phase("setup.py"):
+                sys.argv = ["setup.py"]
+                setup.main()
+            with timer.phase("cleanup.py"):
+                sys.argv = ["cleanup.py"]
+                cleanup.main()
+    finally:
+        sys.argv = argv
+    return timer.phases
+
+
+def provision_stack(factory, compartment_id, workdir):
+    state = StateStore(os.path.join(workdir, f"{compartment_id}.json"))
+    graph = setup.build_provisioning_graph(
+        factory.object_storage(), factory.genai_agent(), factory.plane.namespace,
+        compartment_id, setup.upload_file, state)
+    results = graph.run(max_workers=8)
+    return {
+        "BUCKET_NAME": results["bucket"],
+        "KNOWLEDGEBASE_ID": results["knowledge_base"],
+        "HOTEL_CONCIERGE_AGENT_ID": results["agent1"],
+        "HOTEL_CONCIERGE_AGENT_ADK_ID": results["agent2"],
+    }
+
+
+def teardown_stack(factory, compartment_id, ocids):
+    graph = cleanup.build_teardown_graph(
+        factory.object_storage(retries=False), factory.genai_agent(), factory.plane.namespace,
+        compartment_id, ocids)
+    return all(ok is not False for ok in graph.run(max_workers=8).values())
+
+
+def run_lab(factory, users, workdir, verbose, stack_workers=STACK_WORKERS):
+    timer = Timer()
+    plane = factory.plane
+    os.chdir(workdir)
+    with open("users.txt", "w") as f:
+        for i in range(users):
+            f.write(f"{LAB_NAME}.user{i:04d}@example.com\n")
+
+    with quiet(verbose):
+        with timer.phase("onboard"):
+            run_script(os.path.join(ENV_SETUP, "setup_lab_env_forusers.py"), [LAB_NAME])
+
+        compartments = [r.id for r in plane.resources.values()
+                        if r.kind == "compartment" and r.live and LAB_NAME in r.fields["name"]]
+        with timer.phase("stacks"), ThreadPoolExecutor(max_workers=stack_workers) as pool:
+            stacks = dict(zip(compartments, pool.map(
+                lambda c: provision_stack(factory, c, workdir), compartments)))
+
+        with timer.phase("stack teardown"), ThreadPoolExecutor(max_workers=stack_workers) as pool:
+            torn_down = list(pool.map(lambda item: teardown_stack(factory, *item), stacks.items()))
+
+        with timer.phase("sweep"):
+            run_script(os.path.join(ENV_SETUP, "delete_genai_resources_for_labcompartments.py"), [LAB_NAME])
+        with timer.phase("offboard"):
+            run_script(os.path.join(ENV_SETUP, "cleanup_lab_env_forusers.py"), [LAB_NAME])
+
+    leftovers = sum(1 for r in plane.resources.values() if r.live)
+    return timer.phases, {
+        "stacks": len(stacks),
+        "failed teardowns": torn_down.count(False),
+        "leftovers": leftovers + len(plane.buckets),
+    }
+
+
+def fresh_factory(scale, call_latency, rate_limit_factor=1.0):
+    rate_limits = {service: {family: rate * rate_limit_factor for family, rate in limits.items()}
+                   for service, limits in RATE_LIMITS.items()}
+    return FakeClientFactory(FakeControlPlane(latency=Latency(call=call_latency, scale=scale),
+                                              rate_limits=rate_limits))
+
+
+def print_row(label, seconds, scale, extra=""):
+    print(f"   {label:<28}{seconds:>9.2f}s{seconds / scale / 60:>11.1f}m  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark provisioning against a fake OCI control plane")
+    parser.add_argument("--users", type=int, nargs="+", default=DEFAULT_USERS, help="Lab sizes to benchmark")
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE,
+                        help=f"Time compression factor (default: {DEFAULT_SCALE})")
+    parser.add_argument("--call-latency", type=float, default=0.05, help="Modelled API round trip in seconds")
+    parser.add_argument("--rate-limit-factor", type=float, default=1.0,
+                        help="Multiply the fake service rate limits (lower it to provoke 429s)")
+    parser.add_argument("--stack-workers", type=int, default=STACK_WORKERS, help="Stacks provisioned concurrently")
+    parser.add_argument("--no-cli", action="store_true", help="Skip the setup.py/cleanup.py CLI run")
+    parser.add_argument("--verbose", action="store_true", help="Show the scripts' own output")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    print(f"⏱️  Provisioning benchmark (scale {args.scale}: 1s wall = {1 / args.scale:.0f}s modelled)")
+    print(f"   {'phase':<28}{'wall':>10}{'modelled':>12}")
+    try:
+        if not args.no_cli:
+            factory = fresh_factory(args.scale, args.call_latency, args.rate_limit_factor)
+            with tempfile.TemporaryDirectory() as workdir, simulated(factory, args.scale):
+                phases = run_cli(workdir, args.verbose)
+            print("\n   single stack (CLI, packed upload)")
+            for name, seconds in phases.items():
+                print_row(name, seconds, args.scale)
+            print_row("total", sum(phases.values()), args.scale,
+                      f"{factory.stats.calls} API calls, {factory.plane.throttled} throttled")
+
+        for users in args.users:
+            factory = fresh_factory(args.scale, args.call_latency, args.rate_limit_factor)
+            with tempfile.TemporaryDirectory() as workdir, simulated(factory, args.scale):
+                phases, outcome = run_lab(factory, users, workdir, args.verbose, args.stack_workers)
+            provisioning = phases["onboard"] + phases["stacks"]
+            teardown = phases["stack teardown"] + phases["sweep"] + phases["offboard"]
+            print(f"\n   {users} user(s): {outcome['stacks']} stack(s), "
+                  f"{outcome['failed teardowns']} failed teardown(s), {outcome['leftovers']} leftover resource(s)")
+            for name, seconds in phases.items():
+                print_row(name, seconds, args.scale)
+            print_row("provisioning", provisioning, args.scale)
+            print_row("teardown", teardown, args.scale,
+                      f"{factory.stats.calls} API calls, {factory.plane.throttled} throttled")
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Triage Classifier Benchmark
+---------------------------
+Measures review_triage.py on the lab corpus, repeated up to --reviews
+reviews:
+
+  1. training time (weak labels, embedding, both logistic heads)
+  2. scoring throughput for each batch size, split into the embedding
+     (feature extraction + hashing) and the model itself (one matmul)
+  3. the same reviews spread over --workers processes (score_many)
+  4. one review at a time (model.score in a loop), the baseline the
+     vectorised batches replace
+
+Usage:
+  python benchmark_triage.py                                  # 20000 reviews
+  python benchmark_triage.py --reviews 100000 --batch-sizes 1024 4096 --workers 2 4 8
+"""
+
+import argparse
+import itertools
+import os
+import time
+
+from review_corpus import iter_reviews
+from review_triage import TriageModel, review_text
+
+DEFAULT_REVIEWS = 20000
+DEFAULT_BATCH_SIZES = [64, 1024, 4096, 16384]
+SINGLE_SAMPLE = 500
+
+
+def print_row(label, count, seconds, extra=""):
+    print(f"   {label:<24}{seconds:>9.3f}s{count / seconds:>14,.0f}/s  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the review triage classifier")
+    parser.add_argument("--reviews", type=int, default=DEFAULT_REVIEWS, help="Reviews to score (corpus repeated)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1],
+                        help="Process counts for score_many")
+    parser.add_argument("--single", type=int, default=SINGLE_SAMPLE, help="Reviews scored one at a time")
+    args = parser.parse_args()
+
+    corpus = [review_text(r) for r in iter_reviews()]
+    texts = list(itertools.islice(itertools.cycle(corpus), args.reviews))
+    print(f"⏱️  Triage benchmark: {len(corpus)} corpus reviews, {len(texts)} scored "
+          f"({sum(map(len, texts)) / len(texts):.0f} chars on average)")
+    print(f"   {'phase':<24}{'wall':>10}{'throughput':>15}")
+
+    started = time.perf_counter()
+    model = TriageModel.train(corpus)
+    print_row("train", len(corpus), time.perf_counter() - started,
+             f"{model.report['labelled']} weakly labelled")
+
+    print("\n   scoring")
+    for batch_size in args.batch_sizes:
+        embed = score = 0.0
+        escalated = 0
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            t0 = time.perf_counter()
+            x = model.embedder.embed_many(batch)
+            t1 = time.perf_counter()
+            p = model._probabilities(x)
+            t2 = time.perf_counter()
+            embed += t1 - t0
+            score += t2 - t1
+            escalated += int(((p[:, 0] >= 0.5) | (p[:, 1] >= 0.5)).sum())
+        print_row(f"batch {batch_size}", len(texts), embed + score,
+                  f"embed {embed / (embed + score):.0%}, model {score * 1e6 / len(texts):.1f}µs/review, "
+                  f"{escalated / len(texts):.0%} escalated")
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        model.score_many(texts, workers=workers)
+        print_row(f"{workers} process(es)", len(texts), time.perf_counter() - started)
+
+    sample = texts[:args.single]
+    started = time.perf_counter()
+    for text in sample:
+        model.score(text)
+    print_row("one at a time", len(sample), time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Bucket Purge
+------------
+Empties an Object Storage bucket so it can be deleted:
+
+  - pages through every object (list_objects only returns 1000 per call)
+  - deletes every object version when versioning is or was enabled
+  - aborts uncommitted multipart uploads
+
+Deletes run on a bounded thread pool; throttled (429) and transient (5xx)
+failures of every call (listing pages and get_bucket included, since the
+client is built without SDK retries) are retried with jittered exponential
+backoff. The purge reports
+its throughput in objects per second.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import oci
+
+PAGE_SIZE = 1000
+MAX_WORKERS = 32
+MAX_ATTEMPTS = 6
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class PurgeStats:
+    """Thread-safe counters for a purge run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.deleted = 0
+        self.aborted = 0
+        self.retries = 0
+        self.failed = []
+        self.started = time.monotonic()
+        self.finished = None
+
+    def add(self, field, value=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + value)
+
+    def fail(self, item, error):
+        with self._lock:
+            self.failed.append((item, error))
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rate(self):
+        return (self.deleted + self.aborted) / self.elapsed if self.elapsed else 0.0
+
+
+def call_with_retry(fn, stats, max_attempts=MAX_ATTEMPTS):
+    """Call `fn`, retrying throttled and transient errors. A 404 counts as done."""
+    delay = 0.5
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fn()
+        except oci.exceptions.ServiceError as e:
+            if e.status == 404:
+                return None
+            if e.status not in RETRYABLE_STATUSES or attempt == max_attempts:
+                raise
+            stats.add("retries")
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, 20.0)
+
+
+def iter_objects(os_client, namespace, bucket_name, stats):
+    """Yield (name, None) for every object, following next_start_with."""
+    start = None
+    while True:
+        response = call_with_retry(lambda: os_client.list_objects(
+            namespace, bucket_name, start=start, limit=PAGE_SIZE, fields="name"), stats)
+        if response is None:
+            return
+        data = response.data
+        for obj in data.objects:
+            yield obj.name, None
+        start = data.next_start_with
+        if not start:
+            return
+
+
+def iter_object_versions(os_client, namespace, bucket_name, stats):
+    """Yield (name, version_id) for every object version, including delete markers."""
+    page = None
+    while True:
+        response = call_with_retry(lambda: os_client.list_object_versions(
+            namespace, bucket_name, page=page, limit=PAGE_SIZE, fields="name"), stats)
+        if response is None:
+            return
+        for version in response.data.items:
+            yield version.name, version.version_id
+        page = response.next_page
+        if not page:
+            return
+
+
+def iter_multipart_uploads(os_client, namespace, bucket_name, stats):
+    """Yield (object_name, upload_id) for every uncommitted multipart upload."""
+    page = None
+    while True:
+        response = call_with_retry(lambda: os_client.list_multipart_uploads(
+            namespace, bucket_name, page=page, limit=PAGE_SIZE), stats)
+        if response is None:
+            return
+        for upload in response.data:
+            yield upload.object, upload.upload_id
+        page = response.next_page
+        if not page:
+            return
+
+
+def _bounded_map(pool, fn, items, limit):
+    """Submit fn(item) for every item, keeping at most `limit` tasks in flight."""
+    slots = threading.Semaphore(limit)
+    futures = []
+    for item in items:
+        slots.acquire()
+        future = pool.submit(fn, item)
+        future.add_done_callback(lambda _f: slots.release())
+        futures.append(future)
+    for future in futures:
+        # Workers record their own failures; anything else escaping them is re-raised here.
+        future.result()
+
+
+def purge_bucket(os_client, namespace, bucket_name, max_workers=MAX_WORKERS, verbose=False):
+    """Delete every object, object version and multipart upload in a bucket."""
+    stats = PurgeStats()
+    bucket = call_with_retry(lambda: os_client.get_bucket(namespace, bucket_name), stats)
+    if bucket is None:
+        # Already gone: nothing to purge.
+        stats.finished = time.monotonic()
+        return stats
+    versioning = getattr(bucket.data, "versioning", None)
+    versioned = versioning not in (None, "Disabled")
+
+    def delete(item):
+        name, version_id = item
+        try:
+            call_with_retry(lambda: os_client.delete_object(
+                namespace, bucket_name, name, version_id=version_id), stats)
+            stats.add("deleted")
+            if verbose:
+                print(f"✅ Deleted object: {name}" + (f" ({version_id})" if version_id else ""))
+        except Exception as e:
+            # Connection errors and bugs count too: the purge must not look clean while objects remain.
+            stats.fail(name, getattr(e, "message", None) or str(e))
+
+    def abort(item):
+        name, upload_id = item
+        try:
+            call_with_retry(lambda: os_client.abort_multipart_upload(
+                namespace, bucket_name, name, upload_id), stats)
+            stats.add("aborted")
+        except Exception as e:
+            stats.fail(f"{name} (multipart {upload_id})", getattr(e, "message", None) or str(e))
+
+    listing = iter_object_versions if versioned else iter_objects
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        _bounded_map(pool, abort, iter_multipart_uploads(os_client, namespace, bucket_name, stats),
+                     max_workers * 4)
+        _bounded_map(pool, delete, listing(os_client, namespace, bucket_name, stats), max_workers * 4)
+
+    stats.finished = time.monotonic()
+    return stats
@@ -2,184 +2,366 @@
 """
 OCI Generative AI Agent Cleanup Script (Python SDK version)
 -----------------------------------------------------------
-Deletes all resources created by setup.py in the proper order:
-1. For each agent: delete tools, delete endpoints, delete agent
+Deletes all resources created by setup.py in dependency order:
+1. For each agent: delete tools and endpoints, then the agent
+   (agents are torn down concurrently)
 2. Delete knowledge base
 3. Delete bucket
 
+Each step waits for the previous deletes to finish (work request or
+lifecycle polling) instead of sleeping. Use --dry-run to print the plan.
+
+Deployments come from the inventory database written by setup.py (see
+inventory.py): the most recent one by default, a named one with
+--deployment, or every deployment older than a given age with
+--older-than (reaped concurrently). A legacy GENERATED_OCIDS.txt is
+imported into the inventory the first time cleanup runs.
+
 Prerequisites:
   - Python 3.9+
   - pip install oci
   - ~/.oci/config configured (DEFAULT profile or set OCI_CLI_PROFILE)
-  - GENERATED_OCIDS.txt file from setup.py
+  - the inventory database (or GENERATED_OCIDS.txt) from setup.py
 """
 
 import argparse
 import oci
 import os
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-OCIDS_FILE = "GENERATED_OCIDS.txt"
+from bucket_purge import purge_bucket
+from inventory import INVENTORY_FILE, LEGACY_OCIDS_FILE, Inventory, parse_duration
+from oci_clients import ClientFactory
+from oci_waiter import WaitError, wait_for_all, wait_for_deletion
+from provisioning import ProvisioningError, ProvisioningGraph
 
 
-def load_ocids():
-    """Load OCIDs from the generated file."""
-    if not os.path.exists(OCIDS_FILE):
-        print(f"❌ Error: {OCIDS_FILE} not found")
-        print("Make sure you're running this script from the directory where setup.py was executed.")
-        exit(1)
-    
-    ocids = {}
-    with open(OCIDS_FILE, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if '=' in line:
-                key, value = line.split('=', 1)
-                ocids[key] = value
-    
-    print(f"✅ Loaded OCIDs from {OCIDS_FILE}")
+
+def load_ocids(inventory, deployment):
+    """Load a deployment's OCIDs from the inventory."""
+    ocids = inventory.ocids(deployment)
+    print(f"✅ Loaded {len(ocids)} OCID(s) for deployment {deployment}")
     return ocids
 
 
-def delete_agent_tools(agent_client, agent_id, agent_name, compartment_id):
-    """Delete all tools for a specific agent."""
+def import_legacy_ocids(inventory, compartment_id):
+    """Adopt GENERATED_OCIDS.txt from an older setup.py run, once."""
+    if inventory.deployments(include_deleted=True) or not os.path.exists(LEGACY_OCIDS_FILE):
+        return None
+    deployment = inventory.import_ocids_file(LEGACY_OCIDS_FILE, compartment_id=compartment_id)
+    print(f"♻️  Imported {LEGACY_OCIDS_FILE} into the inventory as deployment {deployment}")
+    return deployment
+
+
+def list_all_items(list_fn, **kwargs):
+    """Page through a *Collection list call and return every item."""
+    items = []
+    for response in oci.pagination.list_call_get_all_results_generator(list_fn, "response", **kwargs):
+        items.extend(response.data.items)
+    return items
+
+
+def _wait_deleted(agent_client, response, get_fn, resource_id, label):
+    """Gate the next teardown step on the delete having actually finished."""
+    try:
+        wait_for_deletion(agent_client, response, get_fn, resource_id, label)
+        return True
+    except (WaitError, oci.exceptions.ServiceError) as e:
+        print(f"❌ {label} did not finish deleting: {e}")
+        return False
+
+
+def delete_agent_tools(agent_client, agent_id, agent_name, compartment_id, dry_run=False):
+    """Delete all tools for a specific agent and wait until they are gone."""
     print(f"🔄 Listing tools for {agent_name}...")
     
     try:
         # List tools for the agent
-        tools_response = agent_client.list_tools(compartment_id=compartment_id, agent_id=agent_id)
-        tools = tools_response.data.items
+        tools = list_all_items(agent_client.list_tools, compartment_id=compartment_id, agent_id=agent_id)
         
         if not tools:
             print(f"✅ No tools found for {agent_name}")
-            return
+            return True
         
         print(f"📋 Found {len(tools)} tool(s) for {agent_name}")
         
+        waits = {}
+        failed = False
         for tool in tools:
             tool_id = tool.id
             tool_name = tool.description or tool.id
+            if dry_run:
+                print(f"📝 Would delete tool: {tool_name}")
+                continue
             print(f"🔄 Deleting tool: {tool_name}...")
             
             try:
-                agent_client.delete_tool(tool_id)
-                print(f"✅ Tool deleted: {tool_name}")
+                response = agent_client.delete_tool(tool_id)
+                waits[tool_name] = (lambda r=response, t=tool_id, n=tool_name:
+                                    _wait_deleted(agent_client, r, agent_client.get_tool, t, f"Tool {n}"))
             except oci.exceptions.ServiceError as e:
                 if e.status == 404:
                     print(f"⚠️  Tool already deleted: {tool_name}")
                 else:
                     print(f"❌ Failed to delete tool {tool_name}: {e.message}")
+                    failed = True
+        
+        try:
+            waited = all(wait_for_all(waits).values())
+        except WaitError as e:
+            print(f"❌ Tools of {agent_name} did not finish deleting: {e}")
+            waited = False
+        return waited and not failed
     
     except oci.exceptions.ServiceError as e:
         print(f"❌ Failed to list tools for {agent_name}: {e.message}")
+        return False
 
 
-def delete_agent_endpoints(agent_client, agent_id, agent_name, compartment_id):
-    """Delete all endpoints for a specific agent."""
+def delete_agent_endpoints(agent_client, agent_id, agent_name, compartment_id, dry_run=False):
+    """Delete all endpoints for a specific agent and wait until they are gone."""
     print(f"🔄 Listing endpoints for {agent_name}...")
     
     try:
         # List endpoints for the agent
-        endpoints_response = agent_client.list_agent_endpoints(compartment_id=compartment_id, agent_id=agent_id)
-        endpoints = endpoints_response.data.items
+        endpoints = list_all_items(agent_client.list_agent_endpoints, compartment_id=compartment_id, agent_id=agent_id)
         
         if not endpoints:
             print(f"✅ No endpoints found for {agent_name}")
-            return
+            return True
         
         print(f"📋 Found {len(endpoints)} endpoint(s) for {agent_name}")
         
+        waits = {}
+        failed = False
         for endpoint in endpoints:
             endpoint_id = endpoint.id
             endpoint_name = endpoint.display_name or endpoint.id
+            if dry_run:
+                print(f"📝 Would delete endpoint: {endpoint_name}")
+                continue
             print(f"🔄 Deleting endpoint: {endpoint_name}...")
             
             try:
-                agent_client.delete_agent_endpoint(endpoint_id)
-                print(f"✅ Endpoint deleted: {endpoint_name}")
-                # Wait a moment for the endpoint to be fully deleted
-                import time
-                time.sleep(2)
+                response = agent_client.delete_agent_endpoint(endpoint_id)
+                # The agent cannot be deleted until its endpoints are gone, so
+                # wait on the delete instead of sleeping a fixed amount.
+                waits[endpoint_name] = (lambda r=response, e=endpoint_id, n=endpoint_name:
+                                        _wait_deleted(agent_client, r, agent_client.get_agent_endpoint, e, f"Endpoint {n}"))
             except oci.exceptions.ServiceError as e:
                 if e.status == 404:
                     print(f"⚠️  Endpoint already deleted: {endpoint_name}")
                 else:
                     print(f"❌ Failed to delete endpoint {endpoint_name}: {e.message}")
+                    failed = True
+        
+        try:
+            waited = all(wait_for_all(waits).values())
+        except WaitError as e:
+            print(f"❌ Endpoints of {agent_name} did not finish deleting: {e}")
+            waited = False
+        return waited and not failed
     
     except oci.exceptions.ServiceError as e:
         print(f"❌ Failed to list endpoints for {agent_name}: {e.message}")
+        return False
 
 
-def delete_agent(agent_client, agent_id, agent_name):
-    """Delete a specific agent."""
+def delete_agent(agent_client, agent_id, agent_name, dry_run=False):
+    """Delete a specific agent once its tools and endpoints are gone."""
+    if dry_run:
+        print(f"📝 Would delete agent: {agent_name}")
+        return True
     print(f"🔄 Deleting agent: {agent_name}...")
     
     try:
-        agent_client.delete_agent(agent_id)
-        print(f"✅ Agent deleted: {agent_name}")
+        response = agent_client.delete_agent(agent_id)
     except oci.exceptions.ServiceError as e:
         if e.status == 404:
             print(f"⚠️  Agent already deleted: {agent_name}")
-        elif e.status == 409 and "AgentEndpoint" in e.message:
-            print(f"⚠️  Agent has active endpoints. Waiting for endpoints to be deleted...")
-            import time
-            time.sleep(5)
-            try:
-                agent_client.delete_agent(agent_id)
-                print(f"✅ Agent deleted: {agent_name}")
-            except oci.exceptions.ServiceError as e2:
-                if e2.status == 404:
-                    print(f"⚠️  Agent already deleted: {agent_name}")
-                else:
-                    print(f"❌ Failed to delete agent {agent_name}: {e2.message}")
-        else:
-            print(f"❌ Failed to delete agent {agent_name}: {e.message}")
+            return True
+        print(f"❌ Failed to delete agent {agent_name}: {e.message}")
+        return False
+
+    if _wait_deleted(agent_client, response, agent_client.get_agent, agent_id, f"Agent {agent_name}"):
+        print(f"✅ Agent deleted: {agent_name}")
+        return True
+    return False
 
 
-def delete_knowledge_base(agent_client, kb_id):
+def delete_knowledge_base(agent_client, kb_id, dry_run=False):
     """Delete the knowledge base."""
+    if dry_run:
+        print(f"📝 Would delete knowledge base: {kb_id}")
+        return True
     print("🔄 Deleting knowledge base...")
     
     try:
-        agent_client.delete_knowledge_base(kb_id)
-        print("✅ Knowledge base deleted")
+        response = agent_client.delete_knowledge_base(kb_id)
     except oci.exceptions.ServiceError as e:
         if e.status == 404:
             print("⚠️  Knowledge base already deleted")
-        else:
-            print(f"❌ Failed to delete knowledge base: {e.message}")
+            return True
+        print(f"❌ Failed to delete knowledge base: {e.message}")
+        return False
+
+    if _wait_deleted(agent_client, response, agent_client.get_knowledge_base, kb_id, "Knowledge base"):
+        print("✅ Knowledge base deleted")
+        return True
+    return False
 
 
-def delete_bucket(os_client, namespace, bucket_name):
+def delete_bucket(os_client, namespace, bucket_name, dry_run=False):
     """Delete the bucket and all its objects."""
+    if dry_run:
+        print(f"📝 Would delete bucket and all its objects: {bucket_name}")
+        return True
     print(f"🔄 Deleting bucket: {bucket_name}...")
     
     try:
-        # First, delete all objects in the bucket
+        # First, empty the bucket: objects (every page), versions and multipart uploads
         print(f"🔄 Deleting all objects in bucket: {bucket_name}...")
-        objects_response = os_client.list_objects(namespace, bucket_name)
-        objects = objects_response.data.objects
+        stats = purge_bucket(os_client, namespace, bucket_name)
         
-        if objects:
-            print(f"📋 Found {len(objects)} object(s) in bucket")
-            for obj in objects:
-                try:
-                    os_client.delete_object(namespace, bucket_name, obj.name)
-                    print(f"✅ Deleted object: {obj.name}")
-                except oci.exceptions.ServiceError as e:
-                    print(f"❌ Failed to delete object {obj.name}: {e.message}")
+        if stats.deleted or stats.aborted:
+            print(f"✅ Deleted {stats.deleted} object(s), aborted {stats.aborted} multipart upload(s) "
+                  f"in {stats.elapsed:.1f}s ({stats.rate:.0f} objects/s, {stats.retries} throttled retries)")
         else:
             print("✅ No objects found in bucket")
+        for name, message in stats.failed:
+            print(f"❌ Failed to delete object {name}: {message}")
         
         # Then delete the bucket
         os_client.delete_bucket(namespace, bucket_name)
         print(f"✅ Bucket deleted: {bucket_name}")
+        return True
         
     except oci.exceptions.ServiceError as e:
         if e.status == 404:
             print(f"⚠️  Bucket already deleted: {bucket_name}")
-        else:
-            print(f"❌ Failed to delete bucket {bucket_name}: {e.message}")
+            return True
+        print(f"❌ Failed to delete bucket {bucket_name}: {e.message}")
+        return False
+
+
+AGENTS = [
+    ("HOTEL_CONCIERGE_AGENT_ID", "Hotel_Concierge_Agent"),
+    ("HOTEL_CONCIERGE_AGENT_ADK_ID", "Hotel_Concierge_Agent_ADK"),
+]
+
+# Teardown step -> inventory keys that are gone once it succeeds
+DELETED_KEYS = {
+    "Hotel_Concierge_Agent/agent": ["HOTEL_CONCIERGE_AGENT_ID", "HOTEL_CONCIERGE_AGENT_ENDPOINT_ID",
+                                    "HOTEL_CONCIERGE_AGENT_RAG_TOOL_ID"],
+    "Hotel_Concierge_Agent_ADK/agent": ["HOTEL_CONCIERGE_AGENT_ADK_ID", "HOTEL_CONCIERGE_AGENT_ADK_ENDPOINT_ID"],
+    "knowledge_base": ["KNOWLEDGEBASE_ID", "DATASOURCE_ID", "DATA_INGESTION_JOB_ID"],
+    "bucket": ["BUCKET_NAME"],
+}
+
+
+def _after_upstream(label, step):
+    """Run step() only if every upstream step succeeded; a skipped step counts as failed.
+
+    The delete helpers report failure by returning False rather than
+    raising, so the graph would otherwise go on to delete an agent whose
+    endpoints are still there (409) or a bucket a knowledge base still reads.
+    """
+    def run(*upstream):
+        if any(result is False for result in upstream):
+            print(f"⏭️  Skipping {label}: an upstream deletion failed")
+            return False
+        return step()
+    return run
+
+
+def build_teardown_graph(os_client, agent_client, namespace, compartment_id, ocids, dry_run=False):
+    """Describe the teardown as a dependency graph.
+
+    tools + endpoints -> agent -> knowledge base -> bucket
+
+    Each agent is its own branch, so independent agents are torn down
+    concurrently; the knowledge base waits for every agent (their RAG
+    tools reference it) and the bucket waits for the knowledge base
+    (its data source reads from the bucket).
+    """
+    graph = ProvisioningGraph()
+    agent_steps = []
+
+    for key, agent_name in AGENTS:
+        if key not in ocids:
+            print(f"⚠️  {agent_name} ID not recorded for this deployment")
+            continue
+        agent_id = ocids[key]
+        graph.add(f"{agent_name}/tools", lambda a=agent_id, n=agent_name: delete_agent_tools(
+            agent_client, a, n, compartment_id, dry_run=dry_run))
+        graph.add(f"{agent_name}/endpoints", lambda a=agent_id, n=agent_name: delete_agent_endpoints(
+            agent_client, a, n, compartment_id, dry_run=dry_run))
+        graph.add(f"{agent_name}/agent", _after_upstream(agent_name, lambda a=agent_id, n=agent_name: delete_agent(
+            agent_client, a, n, dry_run=dry_run)),
+            deps=[f"{agent_name}/tools", f"{agent_name}/endpoints"])
+        agent_steps.append(f"{agent_name}/agent")
+
+    if 'KNOWLEDGEBASE_ID' in ocids:
+        graph.add("knowledge_base", _after_upstream("knowledge base", lambda: delete_knowledge_base(
+            agent_client, ocids['KNOWLEDGEBASE_ID'], dry_run=dry_run)), deps=agent_steps)
+    else:
+        print("⚠️  Knowledge Base ID not recorded for this deployment")
+
+    if 'BUCKET_NAME' in ocids:
+        deps = ["knowledge_base"] if "knowledge_base" in graph.nodes else agent_steps
+        graph.add("bucket", _after_upstream("bucket", lambda: delete_bucket(
+            os_client, namespace, ocids['BUCKET_NAME'], dry_run=dry_run)), deps=deps)
+    else:
+        print("⚠️  Bucket name not recorded for this deployment")
+
+    return graph
+
+
+def print_plan(graph):
+    """Print the teardown steps grouped into waves that can run in parallel."""
+    remaining = dict(graph.nodes)
+    done = set()
+    wave = 1
+    while remaining:
+        ready = sorted(name for name, node in remaining.items() if all(d in done for d in node.deps))
+        print(f"   Wave {wave}: {', '.join(ready)}")
+        for name in ready:
+            done.add(name)
+            del remaining[name]
+        wave += 1
+
+
+def teardown_deployment(os_client, agent_client, namespace, inventory, deployment, compartment_id,
+                        dry_run=False, max_workers=8, show_plan=True):
+    """Tear down one deployment and record what was deleted; returns the failed steps."""
+    ocids = load_ocids(inventory, deployment)
+    graph = build_teardown_graph(os_client, agent_client, namespace, compartment_id, ocids, dry_run=dry_run)
+    if show_plan:
+        print("\n🕸️  Teardown plan")
+        print("-" * 40)
+        print_plan(graph)
+        print("\n🧹 Tearing down resources (independent agents in parallel)")
+        print("-" * 40)
+    try:
+        results = graph.run(max_workers=max_workers)
+    except ProvisioningError as e:
+        print(f"❌ {deployment}: {e}")
+        # Record what finished; the failed step and everything after it count as failed.
+        results = {name: node.result if node.finished is not None and node.error is None else False
+                   for name, node in graph.nodes.items()}
+    finally:
+        if show_plan:
+            graph.print_summary("Teardown timings")
+
+    failed = [name for name, ok in results.items() if ok is False]
+    if not dry_run:
+        for name, ok in results.items():
+            if ok is not False:
+                for key in DELETED_KEYS.get(name, []):
+                    inventory.mark_deleted(deployment, key)
+        if not failed:
+            inventory.mark_deployment_deleted(deployment)
+    return failed
 
 
 def main():
@@ -187,72 +369,77 @@ def main():
     print("=" * 60)
     
     parser = argparse.ArgumentParser(description="OCI Generative AI Agent Cleanup")
-    parser.add_argument("--compartment-id", help="Optional compartment OCID (defaults to tenancy from OCI config)")
+    parser.add_argument("--compartment-id", help="Optional compartment OCID (defaults to the deployment's, then tenancy from OCI config)")
+    parser.add_argument("--deployment", help="Deployment to delete (default: the most recent one)")
+    parser.add_argument("--older-than", help="Delete every deployment older than this instead (e.g. 12h, 7d)")
+    parser.add_argument("--inventory", default=INVENTORY_FILE, help=f"Deployment inventory database (default: {INVENTORY_FILE})")
+    parser.add_argument("--dry-run", action="store_true", help="List what would be deleted, in order, without deleting anything")
+    parser.add_argument("--max-workers", type=int, default=8, help="Maximum teardown steps to run concurrently")
+    parser.add_argument("--parallel-deployments", type=int, default=8, help="Deployments torn down concurrently with --older-than")
     args = parser.parse_args()
 
-    # Load OCIDs
-    print("🔄 Loading OCIDs...")
-    ocids = load_ocids()
-
     # Load config
     print("🔄 Loading OCI configuration...")
-    config = oci.config.from_file("~/.oci/config", oci.config.DEFAULT_PROFILE)
-    compartment_id = args.compartment_id if args.compartment_id else config["tenancy"]
-    print(f"✅ Using compartment ID: {compartment_id}")
+    clients = ClientFactory()
+
+    # Pick deployments
+    print("🔄 Loading deployments...")
+    inventory = Inventory(args.inventory)
+    import_legacy_ocids(inventory, args.compartment_id or clients.tenancy)
+    if args.older_than:
+        deployments = inventory.deployments(older_than=parse_duration(args.older_than))
+    else:
+        name = args.deployment or inventory.latest_deployment()
+        deployments = [inventory.deployment(name)] if name and inventory.deployment(name) else []
+    if not deployments:
+        print(f"❌ Error: no deployment found in {args.inventory}")
+        print("Make sure you're running this script from the directory where setup.py was executed.")
+        exit(1)
+    print(f"✅ {len(deployments)} deployment(s) to delete: {', '.join(d['name'] for d in deployments)}")
 
     # Initialize clients
     print("🔄 Initializing OCI clients...")
-    os_client = oci.object_storage.ObjectStorageClient(config)
-    agent_client = oci.generative_ai_agent.GenerativeAiAgentClient(config)
+    # Bucket purges retry throttled deletes themselves
+    os_client = clients.object_storage(retries=False)
+    agent_client = clients.genai_agent()
     namespace = os_client.get_namespace().data
     print(f"✅ Object Storage namespace: {namespace}")
 
-    print("\n🤖 STEP 1: Cleaning up Agents")
-    print("-" * 40)
-    
-    # Clean up Hotel_Concierge_Agent
-    if 'HOTEL_CONCIERGE_AGENT_ID' in ocids:
-        agent_id = ocids['HOTEL_CONCIERGE_AGENT_ID']
-        print(f"\n🔹 Cleaning up Hotel_Concierge_Agent...")
-        delete_agent_tools(agent_client, agent_id, "Hotel_Concierge_Agent", compartment_id)
-        delete_agent_endpoints(agent_client, agent_id, "Hotel_Concierge_Agent", compartment_id)
-        delete_agent(agent_client, agent_id, "Hotel_Concierge_Agent")
-    else:
-        print("⚠️  Hotel_Concierge_Agent ID not found in OCIDs file")
-
-    # Clean up Hotel_Concierge_Agent_ADK
-    if 'HOTEL_CONCIERGE_AGENT_ADK_ID' in ocids:
-        agent_id = ocids['HOTEL_CONCIERGE_AGENT_ADK_ID']
-        print(f"\n🔹 Cleaning up Hotel_Concierge_Agent_ADK...")
-        delete_agent_tools(agent_client, agent_id, "Hotel_Concierge_Agent_ADK", compartment_id)
-        delete_agent_endpoints(agent_client, agent_id, "Hotel_Concierge_Agent_ADK", compartment_id)
-        delete_agent(agent_client, agent_id, "Hotel_Concierge_Agent_ADK")
-    else:
-        print("⚠️  Hotel_Concierge_Agent_ADK ID not found in OCIDs file")
+    def teardown(deployment):
+        compartment_id = args.compartment_id or deployment["compartment_id"] or clients.tenancy
+        try:
+            return teardown_deployment(os_client, agent_client, namespace, inventory, deployment["name"],
+                                       compartment_id, dry_run=args.dry_run, max_workers=args.max_workers,
+                                       show_plan=len(deployments) == 1)
+        except Exception as e:
+            # One broken deployment must not abort the teardown of the others.
+            print(f"❌ Teardown of {deployment['name']} failed: {e}")
+            return ["teardown"]
 
-    print("\n🧠 STEP 2: Cleaning up Knowledge Base")
-    print("-" * 40)
-    
-    if 'KNOWLEDGEBASE_ID' in ocids:
-        kb_id = ocids['KNOWLEDGEBASE_ID']
-        delete_knowledge_base(agent_client, kb_id)
-    else:
-        print("⚠️  Knowledge Base ID not found in OCIDs file")
+    try:
+        if len(deployments) == 1:
+            outcomes = {deployments[0]["name"]: teardown(deployments[0])}
+        else:
+            print(f"\n🧹 Tearing down {len(deployments)} deployments ({args.parallel_deployments} at a time)")
+            print("-" * 40)
+            with ThreadPoolExecutor(max_workers=args.parallel_deployments) as pool:
+                outcomes = dict(zip((d["name"] for d in deployments), pool.map(teardown, deployments)))
+    finally:
+        clients.print_summary()
 
-    print("\n📦 STEP 3: Cleaning up Object Storage")
-    print("-" * 40)
-    
-    if 'BUCKET_NAME' in ocids:
-        bucket_name = ocids['BUCKET_NAME']
-        delete_bucket(os_client, namespace, bucket_name)
-    else:
-        print("⚠️  Bucket name not found in OCIDs file")
+    failed = {name: steps for name, steps in outcomes.items() if steps}
+    if args.dry_run:
+        print("\n📝 Dry run complete - nothing was deleted")
+        return
+    if failed:
+        for name, steps in failed.items():
+            print(f"\n⚠️  Cleanup of {name} finished with failures in: {', '.join(steps)}")
+        return
 
     print("\n🎉 Cleanup Complete!")
     print("=" * 60)
-    print("✅ All resources have been cleaned up")
-    print(f"📄 OCIDs file: {OCIDS_FILE}")
-    print("💡 You can now safely delete the OCIDs file if desired")
+    print(f"✅ All resources of {len(outcomes)} deployment(s) have been cleaned up")
+    print(f"📄 Marked deleted in: {args.inventory}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Complaint Clusters
+------------------
+Complaint waves share a root cause: construction next door, a barking
+dog, a festival down the road. Researching each guest's review separately
+repeats the same web_search/RAG calls once per guest. This module groups
+negative reviews so the concierge researches once per incident:
+
+  - reviews are partitioned by hotel (answer_cache.hotel_for), and never
+    clustered across hotels; reviews that name no hotel stay on their own
+  - within a hotel, reviews are taken in the order they were received and
+    join the most similar open cluster (cosine similarity of the review
+    embedding to the cluster centroid >= threshold) whose latest review
+    is at most `window` seconds older; otherwise they start a new cluster
+  - a cluster with several reviews gets one research run (cluster_prompt)
+    and then a cheap, tool-free run per guest that adapts the shared
+    findings (personalise_prompt)
+
+Usage:
+  clusters = cluster_complaints(texts, received=timestamps, hotels=hotels)
+  for cluster in clusters:
+      research = agent.run(cluster_prompt([texts[i] for i in cluster.members], cluster.name)).final_output
+      for i in cluster.members:
+          answer = agent.run(personalise_prompt(texts[i], research)).final_output
+"""
+
+import numpy as np
+
+from answer_cache import ANY_HOTEL, hotel_for
+from review_corpus import extract_hotel_mentions
+from text_embedding import default_embedder
+
+# Centroid similarity for a review to join a cluster. Lower than the
+# answer cache's research threshold: the reviews already share a hotel and
+# a time window, and guests describe one incident in very different words.
+CLUSTER_THRESHOLD = 0.35
+DEFAULT_WINDOW = 72 * 3600.0
+# Reviews quoted in a cluster's research prompt
+MAX_QUOTED = 8
+
+CLUSTER_PROMPT = """
+    {count} guests{hotel} sent the following reviews within a short time of each other:
+
+{reviews}
+
+    They likely share a root cause. Use the review search, events and web search tools to find
+    out what happened (for example construction, an event nearby, a service outage), then write:
+      1. a short summary of the findings, with dates and sources
+      2. the points every apology to these guests should make
+"""
+PERSONALISE_PROMPT = """
+    A guest shared the following review:
+
+    "{review}"
+
+    Other guests reported the same problem. This research was already done:
+
+    ---
+    {research}
+    ---
+
+    Do not call any tools. Draft a short, empathetic response to this guest, adapted to what they
+    wrote; use only the parts of the research that apply to their review.
+"""
+
+
+class Cluster:
+    """Reviews (by position in the input) that likely report the same incident."""
+
+    def __init__(self, hotel, name, first, vector, received):
+        self.hotel = hotel
+        self.name = name
+        self.members = [first]
+        self._sum = vector.astype(np.float32, copy=True)
+        self.centroid = vector
+        self.first_received = received
+        self.last_received = received
+
+    def __len__(self):
+        return len(self.members)
+
+    def add(self, position, vector, received):
+        self.members.append(position)
+        self._sum += vector
+        self.centroid = self._sum / (np.linalg.norm(self._sum) or 1.0)
+        if received is not None:
+            self.last_received = max(self.last_received or received, received)
+
+    def open_at(self, received, window):
+        if received is None or self.last_received is None:
+            return True
+        return received - self.last_received <= window
+
+    def to_dict(self):
+        return {"hotel": self.name, "size": len(self.members), "members": list(self.members),
+                "first_received": self.first_received, "last_received": self.last_received}
+
+
+def cluster_complaints(texts, received=None, hotels=None, threshold=CLUSTER_THRESHOLD, window=DEFAULT_WINDOW,
+                       embedder=None):
+    """Group texts into Clusters, largest first.
+
+    received: optional per-text timestamps (seconds; None where unknown)
+    hotels:   optional per-text hotel names (else the first hotel a text names)
+    """
+    embedder = embedder or default_embedder()
+    received = received or [None] * len(texts)
+    hotels = hotels or [None] * len(texts)
+    vectors = embedder.embed_many(texts)
+
+    partitions = {}
+    names = {}
+    for position, (text, hotel) in enumerate(zip(texts, hotels)):
+        key = hotel_for(text, hotel)
+        partitions.setdefault(key, []).append(position)
+        if key != ANY_HOTEL:
+            names.setdefault(key, hotel.strip() if hotel else extract_hotel_mentions(text)[0])
+
+    clusters = []
+    for hotel, positions in partitions.items():
+        name = names.get(hotel)
+        if hotel == ANY_HOTEL:
+            clusters += [Cluster(hotel, name, p, vectors[p], received[p]) for p in positions]
+            continue
+        positions.sort(key=lambda p: (received[p] is not None, received[p] or 0))
+        found = []
+        for position in positions:
+            vector, at = vectors[position], received[position]
+            candidates = [c for c in found if c.open_at(at, window)]
+            if candidates:
+                similarities = np.stack([c.centroid for c in candidates]) @ vector
+                best = int(similarities.argmax())
+                if similarities[best] >= threshold:
+                    candidates[best].add(position, vector, at)
+                    continue
+            found.append(Cluster(hotel, name, position, vector, at))
+        clusters += found
+    clusters.sort(key=lambda c: (-len(c), c.members[0]))
+    return clusters
+
+
+def cluster_prompt(reviews, hotel=None):
+    """Agent input that researches the shared cause of a cluster's reviews once."""
+    quoted = "\n\n".join(f'    Guest {i}: "{review}"' for i, review in enumerate(reviews[:MAX_QUOTED], 1))
+    at = f" of {hotel}" if hotel else ""
+    return CLUSTER_PROMPT.format(count=len(reviews), hotel=at, reviews=quoted)
+
+
+def personalise_prompt(review, research):
+    """Cheap, tool-free agent input that adapts a cluster's research to one guest."""
+    return PERSONALISE_PROMPT.format(review=review, research=research)
@@ -1,10 +1,17 @@
 from oci.addons.adk import Agent, AgentClient, tool
 from oci.addons.adk.tool.prebuilt import AgenticRagTool
+import oci
 import requests
 import json
 import os
 from dotenv import load_dotenv
 
+import event_store
+import hotel_analytics
+import hotel_index
+import rag_cache
+from tool_prefetch import event_lookups, prefetch_run, prefetchable
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -12,6 +19,9 @@ load_dotenv()
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 AGENT_ENDPOINT_ID = os.getenv("AGENT_ENDPOINT_ID")
 KNOWLEDGE_BASE_ID = os.getenv("KNOWLEDGE_BASE_ID")
+# Optional: the RAG agent's endpoint (HOTEL_CONCIERGE_AGENT_ENDPOINT_ID). When set, review
+# searches run client-side through the retrieval cache instead of the server-side RAG tool.
+RAG_ENDPOINT_ID = os.getenv("RAG_ENDPOINT_ID")
 
 # Validate that required environment variables are set
 if not TAVILY_API_KEY:
@@ -21,17 +31,8 @@ if not AGENT_ENDPOINT_ID:
 if not KNOWLEDGE_BASE_ID:
     raise ValueError("KNOWLEDGE_BASE_ID environment variable is required")
 
-@tool
-def web_search(query: str):
-    """
-    Performs a web search using the Tavily API.
-
-    Args:
-        query: The search query string.
-
-    Returns:
-        A dictionary with the search results or an error message string.
-    """
+def tavily_search(query):
+    """Advanced Tavily search: the response dictionary, or an error message string."""
     # The API endpoint URL
     url = "https://api.tavily.com/search"
 
@@ -70,20 +71,144 @@ def web_search(query: str):
         return f"Oops: Something Else: {err}"
 
 
-def main():
+@tool
+def web_search(query: str):
+    """
+    Performs a web search using the Tavily API.
+
+    Args:
+        query: The search query string.
+
+    Returns:
+        A dictionary with the search results or an error message string.
+    """
+    result = tavily_search(query)
+    # Event searches ("events in London on 15 August 2024") also fill the local event store;
+    # that must never cost the agent a search it already has.
+    try:
+        event_store.default_store().record_search(query, result)
+    except Exception as e:
+        print(f"⚠️  Could not record the search in the event store: {e}")
+    return result
+
+
+def _speculative_lookups(signals):
+    lookups = []
+    for city, date in event_lookups(signals):
+        try:
+            day = event_store.parse_date(date).isoformat()
+        except ValueError:
+            continue
+        lookups.append({"city": event_store.city_key(city), "start": day, "end": day})
+    return lookups
+
+
+@prefetchable(_speculative_lookups)
+def lookup_events(city, start, end):
+    return event_store.default_store().lookup(city, start, end, search=tavily_search)
+
+
+@tool
+def events_on(city: str, date: str, end_date: str = ""):
+    """
+    Returns the events that took place (or will take place) in a city on a date or in a date range,
+    from a local event store. Dates not in the store are searched on the web and stored.
+    Use it instead of web search for questions like "was there an event in London on that date?".
+
+    Args:
+        city: The city or area (e.g. "London").
+        date: The date, as YYYY-MM-DD or as written in the review (e.g. "August 15th").
+        end_date: Optional last date of a range (at most 31 days), as YYYY-MM-DD.
+
+    Returns:
+        A dictionary with the events (date, name, url, snippet), or an error message.
+    """
+    try:
+        start = event_store.parse_date(date)
+        end = event_store.parse_date(end_date) if end_date else start
+    except ValueError as e:
+        return {"error": str(e)}
+    # Canonical arguments, so the call matches the lookup prefetched for the review.
+    return lookup_events(event_store.city_key(city), start.isoformat(), end.isoformat())
 
-    client = AgentClient(
+
+@tool
+@prefetchable(lambda signals: [{"hotel": h} for h in signals.hotels[:2]])
+def reviews_for_hotel(hotel: str, page: int = 1, page_size: int = 10):
+    """
+    Returns every review that mentions a given hotel, one page at a time.
+
+    Args:
+        hotel: The hotel name, as written in a review (e.g. "Hana Riverside").
+        page: The page to return, starting at 1.
+        page_size: Reviews per page (at most 50).
+
+    Returns:
+        A dictionary with the hotel, the total number of reviews, the page and its reviews,
+        or an error with the closest hotel names.
+    """
+    return hotel_index.reviews_for_hotel(hotel, int(page), int(page_size))
+
+
+@tool
+def hotel_review_stats(hotel: str = "", since: str = "", until: str = ""):
+    """
+    Returns precomputed review statistics of a hotel: review counts, sentiment distribution,
+    top complaint topics and the monthly trend. Use it for aggregate questions instead of
+    reading many reviews.
+
+    Args:
+        hotel: The hotel name. Leave empty to list the hotels with the most negative reviews.
+        since: Only count reviews received on or after this date (YYYY-MM-DD).
+        until: Only count reviews received before this date (YYYY-MM-DD).
+
+    Returns:
+        A dictionary with the hotel's statistics, or an error with the closest hotel names.
+    """
+    return hotel_analytics.hotel_report(hotel, since, until)
+
+
+@tool
+def search_reviews(query: str):
+    """
+    Searches the user reviews in the knowledge base. Repeated questions are answered from a local cache.
+
+    Args:
+        query: What to look for in the reviews (e.g. "noise complaints at Hana Riverside").
+
+    Returns:
+        A dictionary with the answer and the reviews it cites, or an error message string.
+    """
+    try:
+        return rag_cache.cached_retrieval(KNOWLEDGE_BASE_ID, RAG_ENDPOINT_ID, query)
+    except oci.exceptions.ServiceError as e:
+        return f"Knowledge base Error: {e.status} {e.message}"
+
+
+INSTRUCTIONS = "You are a Hotel Concierge. You are responsible for analyzing and responding to user reviews. You can use a RAG search tool to find information about the users reviews, a reviews-for-hotel tool to list every review of one hotel, a hotel statistics tool for aggregate questions (counts, sentiment, top complaints, trends), an events tool to find out what took place in a city on a date, and a web search tool to find any additional information you need."
+
+
+def create_client():
+    return AgentClient(
         auth_type="api_key",
         profile="DEFAULT",
         region="us-chicago-1"
     )
 
+
+def build_agent(client=None, setup=True):
+    """Create the concierge agent; setup=False skips syncing tools to the endpoint.
+
+    Syncing once is enough: further agents for the same endpoint (e.g. a
+    pool of warm agents) can be built with setup=False.
+    """
     # Use the knowledge base ID from environment variables
     knowledge_base_id = KNOWLEDGE_BASE_ID
 
     # Create a RAG tool that uses the knowledge base
     # The tool name and description are optional, but strongly recommended for LLM to understand the tool.
-    user_review_rag_tool = AgenticRagTool(
+    # With a RAG endpoint configured, the cached client-side search takes its place.
+    user_review_rag_tool = search_reviews if RAG_ENDPOINT_ID else AgenticRagTool(
         name="User Review RAG tool",
         description="Use this tool to retrieve user reviews from the knowledge base.",
         knowledge_base_ids=[knowledge_base_id],
@@ -91,14 +216,21 @@ def main():
 
     # Create the agent with the RAG tool
     agent = Agent(
-        client=client,
+        client=client or create_client(),
         agent_endpoint_id=AGENT_ENDPOINT_ID,
-        instructions="You are a Hotel Concierge. You are responsible for analyzing and responding to user reviews. You can use a RAG search tool to find information about the users reviews, and a web search tool to find any additional information you need.",
-        tools=[user_review_rag_tool, web_search]
+        instructions=INSTRUCTIONS,
+        tools=[user_review_rag_tool, reviews_for_hotel, hotel_review_stats, events_on, web_search]
     )
 
+    if setup:
+        agent.setup()
+    return agent
+
+
+def main():
+
     # Set up the agent once
-    agent.setup()
+    agent = build_agent()
 
     # Run the agent with a user query
     input = """
@@ -110,12 +242,15 @@ def main():
         Traffic was backed up for hours, and even late into the evening the shouting and music made it impossible to rest. 
         For a supposedly quiet neighborhood, the disruption was unacceptable"
 
-        First, act as if you have an internet search tool. Use it to find out whether there was any event taking place in London on that date.
+        First, use the events tool to find out whether there was any event taking place in London on that date.
 
         Then, based on that information, draft a short, empathetic apology email to the guest.
     """
-    response = agent.run(input)
+    # Event lookups for the date and place in the review start right away
+    with prefetch_run(input) as prefetch:
+        response = agent.run(input)
     response.pretty_print()
+    print(f"Prefetch: {prefetch.summary()}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
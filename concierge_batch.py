@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Concierge Batch Mode
+--------------------
+Answers a whole file of reviews (by default the lab corpus) and writes one
+JSON line per review:
+
+  1. every review is scored locally by review_triage.py, in vectorised
+     batches (thousands of reviews per second, no LLM call)
+  2. reviews below the negative / severity thresholds that the seed
+     lexicons do not flag get a template response in their language
+  3. the rest are grouped into complaint clusters (complaint_clusters.py:
+     same hotel, same time window, similar text); a cluster of several
+     reviews is researched by the agent once, then every guest gets a
+     cheap, tool-free run that adapts the findings to their review
+  4. reviews that cluster with no other get a full agent run
+
+  {"index": 12, "title": "...", "language": "en", "route": "cluster", "cluster": 3,
+   "triage": {"p_negative": 0.93, "p_severe": 0.41, "flagged": true}, "response": "..."}
+
+Input is either the corpus format (Title:/Review: blocks) or JSON lines
+with "review", and optionally "title", "hotel" and "received" (ISO 8601 or
+epoch seconds) so complaint waves can be told apart in time.
+
+Usage:
+  python concierge_batch.py --dry-run                  # triage and clusters only, no agent runs
+  python concierge_batch.py --limit 200 --workers 4 --out responses.jsonl
+  python concierge_batch.py --input incoming.jsonl --cluster-window-hours 48
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from complaint_clusters import CLUSTER_THRESHOLD, DEFAULT_WINDOW, cluster_complaints, cluster_prompt, personalise_prompt
+from concierge_service import build_prompt
+from rag_cache import default_cache
+from review_corpus import CORPUS_FILE, load_reviews
+from review_triage import NEGATIVE_THRESHOLD, SEVERITY_THRESHOLD, default_model, review_text, template_response
+from tool_prefetch import prefetch_run
+
+DEFAULT_WORKERS = 4
+ROUTE_AGENT = "agent"
+ROUTE_CLUSTER = "cluster"
+ROUTE_TEMPLATE = "template"
+
+
+class AgentRunner:
+    """Concierge agents on worker threads, one agent and event loop per thread."""
+
+    def __init__(self, workers):
+        self._local = threading.local()
+        self._setup_lock = threading.Lock()
+        self._synced = False
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-agent",
+                                            initializer=self._init_thread)
+
+    def _init_thread(self):
+        # Imported lazily: concierge_agent validates its environment at import time.
+        import concierge_agent
+
+        # Agent.run calls run_until_complete on the thread's loop.
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        with self._setup_lock:
+            self._local.agent = concierge_agent.build_agent(setup=not self._synced)
+            self._synced = True
+
+    def _run(self, prompt, prefetch_text):
+        with prefetch_run(prefetch_text or "", enabled=prefetch_text is not None):
+            return self._local.agent.run(prompt, delete_session=True).final_output
+
+    def submit(self, prompt, prefetch_text=None):
+        """Run `prompt` on a free agent; prefetch_text enables search prefetching for it."""
+        return self._executor.submit(self._run, prompt, prefetch_text)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def record(review, route, scores, position, response, cluster=None):
+    return {"index": review.index, "title": review.title, "language": review.language, "route": route,
+            "cluster": cluster, "triage": scores.to_dict(position), "response": response}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a file of reviews, escalating only the ones that need it")
+    parser.add_argument("--input", default=CORPUS_FILE, help="Corpus-format reviews, or a .jsonl file")
+    parser.add_argument("--out", default="responses.jsonl")
+    parser.add_argument("--limit", type=int, help="Only the first N reviews")
+    parser.add_argument("--model", help="Saved triage model (trained on the corpus if omitted)")
+    parser.add_argument("--threshold", type=float, default=NEGATIVE_THRESHOLD,
+                        help="p_negative at which a review goes to the agent")
+    parser.add_argument("--severity-threshold", type=float, default=SEVERITY_THRESHOLD,
+                        help="p_severe at which a review goes to the agent")
+    parser.add_argument("--no-cluster", action="store_true", help="Research every escalated review separately")
+    parser.add_argument("--cluster-threshold", type=float, default=CLUSTER_THRESHOLD,
+                        help="Similarity at which a review joins a complaint cluster")
+    parser.add_argument("--cluster-window-hours", type=float, default=DEFAULT_WINDOW / 3600,
+                        help="Reviews further apart than this never share a cluster")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Agent runs in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="Triage, cluster and write templates; skip agent runs")
+    args = parser.parse_args()
+
+    reviews, hotels, received = (values[:args.limit] for values in load_reviews(args.input))
+    model = default_model(args.model)
+    started = time.perf_counter()
+    scores = model.score_many([review_text(r) for r in reviews])
+    escalate = scores.escalate(args.threshold, args.severity_threshold)
+    escalated = [int(p) for p in escalate.nonzero()[0]]
+    print(f"📊 Triaged {len(reviews)} reviews in {time.perf_counter() - started:.2f}s: "
+          f"{len(escalated)} for the agent, {len(reviews) - len(escalated)} templated")
+
+    # --no-cluster: no similarity reaches the threshold, so every review is its own cluster.
+    clusters = cluster_complaints([reviews[p].text for p in escalated], [received[p] for p in escalated],
+                                  [hotels[p] for p in escalated],
+                                  threshold=float("inf") if args.no_cluster else args.cluster_threshold,
+                                  window=args.cluster_window_hours * 3600)
+    for c in clusters:
+        c.members = [escalated[m] for m in c.members]
+    if not args.no_cluster:
+        shared = [c for c in clusters if len(c) > 1]
+        print(f"🧩 {len(clusters)} incident(s): {len(shared)} cluster(s) covering "
+              f"{sum(map(len, shared))} reviews, {len(clusters) - len(shared)} on their own")
+
+    failed = 0
+    with open(args.out, "w", encoding="utf-8") as out:
+        def write(entry):
+            out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        for position, review in enumerate(reviews):
+            if not escalate[position]:
+                write(record(review, ROUTE_TEMPLATE, scores, position,
+                             template_response(review, float(scores.p_negative[position]))))
+        if args.dry_run:
+            for cluster, c in enumerate(clusters):
+                for position in c.members:
+                    route = ROUTE_CLUSTER if len(c) > 1 else ROUTE_AGENT
+                    write(record(reviews[position], route, scores, position, None, cluster))
+
+        elif clusters:
+            runner = AgentRunner(args.workers)
+            # Research runs first; a cluster's personalised runs follow once its research is in.
+            pending = {}
+            for cluster, c in enumerate(clusters):
+                texts = [reviews[p].text for p in c.members]
+                if len(c) == 1:
+                    future = runner.submit(build_prompt({"review": texts[0]}), prefetch_text=texts[0])
+                    pending[future] = (cluster, c.members[0])
+                else:
+                    future = runner.submit(cluster_prompt(texts, c.name), prefetch_text="\n".join(texts))
+                    pending[future] = (cluster, None)
+            # Successful runs only
+            singles = researched = personalised = 0
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        cluster, position = pending.pop(future)
+                        c = clusters[cluster]
+                        try:
+                            response = future.result()
+                        except Exception as e:
+                            # A failed research run leaves its whole cluster unanswered.
+                            failed += 1 if position is not None else len(c)
+                            what = f"review {reviews[position].index}" if position is not None else "research"
+                            print(f"⚠️  Cluster {cluster} {what} failed: {e}")
+                            continue
+                        if position is not None:
+                            if len(c) > 1:
+                                personalised += 1
+                            else:
+                                singles += 1
+                            write(record(reviews[position], ROUTE_CLUSTER if len(c) > 1 else ROUTE_AGENT,
+                                         scores, position, response, cluster))
+                            continue
+                        researched += 1
+                        for member in c.members:
+                            pending[runner.submit(personalise_prompt(reviews[member].text, response))] = (cluster, member)
+            finally:
+                runner.shutdown()
+            print(f"   {singles + researched + personalised} successful agent runs: {singles} for single reviews, "
+                  f"{researched} cluster research, {personalised} personalised")
+            rag = default_cache().stats()
+            if rag["hits"] + rag["misses"] + rag["shared"]:
+                print(f"   Knowledge base searches: {rag['misses']} retrieved, "
+                      f"{rag['hits'] + rag['shared']} from the cache ({rag['hit_rate']:.0%})")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Wrote {len(reviews) - failed} responses to {args.out} in {elapsed:.1f}s "
+          f"({(~escalate).mean():.0%} of reviews templated, {failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
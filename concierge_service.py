@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Concierge HTTP Service
+----------------------
+Puts the hotel concierge agent (concierge_agent.py) behind a small asyncio
+HTTP service for the guest-relations portal.
+
+  POST /v1/concierge   {"review": "...", "query": "...", "deadline_ms": 60000, "stream": false}
+  GET  /health         queue depth, in-flight runs, counters
+
+Requests go into a bounded queue served by a fixed pool of warm agents.
+Each agent lives on its own thread with its own event loop (Agent.run
+drives one), so the number of agent threads never grows with load:
+
+  - queue full           -> 429 with a Retry-After estimate, nothing queued
+  - deadline passes      -> 504; queued requests past their deadline are
+                            dropped without ever reaching an agent
+  - "stream": true       -> chunked NDJSON events (queued, started, tool,
+                            answer, done) as the run progresses
+  - "guest_id": "..."    -> follow-ups continue the guest's agent session
+                            (see session_manager.py); GET /v1/sessions/<id>
+                            shows its size
+  - likely event lookups (the date and place in the review, answered from
+    event_store.py) are prefetched while the first LLM turn runs (see
+    tool_prefetch.py)
+  - near-duplicate reviews of the same hotel ("hotel" or a hotel named in
+    the review) reuse the semantic cache (see answer_cache.py): a
+    near-verbatim copy gets the cached answer adapted by a tool-free run, a
+    similar review runs with the cached research as a lead
+  - with RAG_ENDPOINT_ID set, knowledge base searches go through the
+    retrieval cache (see rag_cache.py); GET /health shows its hit rate
+
+Usage:
+  python concierge_service.py --port 8080 --workers 4 --queue-size 32
+  curl -s localhost:8080/health
+  curl -s localhost:8080/v1/concierge -d '{"review": "The pool was closed all week"}'
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from answer_cache import (DEFAULT_TTL, DRAFT_THRESHOLD, MODE_DRAFT, RESEARCH_THRESHOLD, SemanticCache,
+                          research_prompt)
+from complaint_clusters import personalise_prompt
+import rag_cache
+from session_manager import DEFAULT_IDLE_TTL, DEFAULT_MAX_SESSIONS, SessionManager
+from tool_prefetch import prefetch_run
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_DEADLINE = 120.0
+MAX_DEADLINE = 600.0
+MAX_BODY_BYTES = 64 * 1024
+HEADER_TIMEOUT = 10.0
+# Queue fill ratio above which /health reports "degraded"
+DEGRADED_RATIO = 0.8
+MAX_SESSION_KEY = 128
+
+REVIEW_PROMPT = """
+    A guest shared the following review:
+
+    "{review}"
+
+    {task}
+"""
+REVIEW_TASK = ("Use the review search, events and web search tools to find out what may have caused the guest's "
+               "experience, then draft a short, empathetic response to the guest.")
+
+
+class HttpError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def session_key(payload):
+    """The conversation a request belongs to, if any."""
+    key = payload.get("guest_id") or payload.get("thread_id")
+    if key is None:
+        return None
+    if not isinstance(key, str) or not 0 < len(key) <= MAX_SESSION_KEY:
+        raise HttpError(400, f"'guest_id' must be a string of at most {MAX_SESSION_KEY} characters")
+    return key
+
+
+def build_prompt(payload):
+    """Agent input for a request payload: a guest review, a staff query, or both."""
+    if not isinstance(payload, dict):
+        raise HttpError(400, "Body must be a JSON object")
+    for field in ("review", "query"):
+        if not isinstance(payload.get(field) or "", str):
+            raise HttpError(400, f"'{field}' must be a string")
+    review = (payload.get("review") or "").strip()
+    query = (payload.get("query") or "").strip()
+    if not review and not query:
+        raise HttpError(400, "Provide a 'review' and/or a 'query'")
+    if not review:
+        return query
+    return REVIEW_PROMPT.format(review=review, task=query or REVIEW_TASK)
+
+
+class Job:
+    """One request on its way through the queue to an agent."""
+
+    def __init__(self, prompt, payload, deadline, stream):
+        self.prompt = prompt
+        self.payload = payload
+        self.deadline = deadline
+        self.events = asyncio.Queue() if stream else None
+        self.future = asyncio.get_running_loop().create_future()
+        self.session_key = session_key(payload)
+        self.cache_hit = None
+        self.enqueued = time.monotonic()
+        self.started = None
+        self.abandoned = False
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def emit(self, event, **fields):
+        if self.events is not None:
+            self.events.put_nowait({"event": event, **fields})
+
+
+class ServiceStats:
+    def __init__(self):
+        self.accepted = 0
+        self.served = 0
+        self.rejected = 0
+        self.expired = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.cached = 0
+        self.prefetch_served = 0
+        self.prefetch_wasted = 0
+        self.prefetch_saved = 0.0
+        self.run_seconds = 0.0
+
+    @property
+    def average_run(self):
+        return self.run_seconds / self.served if self.served else 0.0
+
+
+class AgentPool:
+    """Warm agents, each pinned to its own thread and event loop."""
+
+    def __init__(self, agent_factory, size):
+        self.agent_factory = agent_factory
+        self.size = size
+        self._local = threading.local()
+        self._executors = []
+        self._janitor = None
+
+    def _init_thread(self, index):
+        # Agent.run calls run_until_complete on the thread's loop.
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        self._local.agent = self.agent_factory(index)
+
+    async def start(self):
+        """Create every agent up front, so the first requests don't pay for it."""
+        loop = asyncio.get_running_loop()
+        for index in range(self.size):
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"agent-{index}",
+                                          initializer=self._init_thread, initargs=(index,))
+            self._executors.append(executor)
+        # Agent 0 syncs the tools to the endpoint; the rest start once it is done.
+        await loop.run_in_executor(self._executors[0], lambda: None)
+        await asyncio.gather(*(loop.run_in_executor(e, lambda: None) for e in self._executors[1:]))
+        # One more agent, off the serving path, deletes evicted sessions.
+        self._janitor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-janitor",
+                                           initializer=self._init_thread, initargs=(self.size,))
+
+    def run(self, index, job, loop, session_id=None, keep_session=False):
+        """Run a job on agent `index` (called on that agent's thread).
+
+        One-off runs delete their session afterwards; guest sessions are kept
+        for follow-ups.
+        """
+
+        def on_action(required_action, _performed_action):
+            name = required_action.function_call.name
+            loop.call_soon_threadsafe(lambda: job.emit("tool", name=name))
+
+        # A tool-free adaptation of a cached draft needs no searches; a research lead may.
+        drafting = job.cache_hit is not None and job.cache_hit.mode == MODE_DRAFT
+        with prefetch_run(job.payload.get("review") or job.prompt, enabled=not drafting) as prefetch:
+            if prefetch.prefetches:
+                loop.call_soon_threadsafe(lambda: job.emit(
+                    "prefetch", queries=[p.kwargs for p in prefetch.prefetches]))
+            response = self._local.agent.run(job.prompt, session_id=session_id, delete_session=not keep_session,
+                                             on_fulfilled_required_action=on_action)
+        return {"answer": response.final_output, "session_id": response.session_id, "prefetch": prefetch.summary()}
+
+    def _delete_session(self, session_id):
+        try:
+            self._local.agent.delete_session(session_id)
+        except Exception as e:
+            print(f"⚠️  Failed to delete session {session_id}: {e}")
+
+    def delete_session(self, session_id):
+        """Delete a session on the endpoint in the background."""
+        if self._janitor is not None:
+            self._janitor.submit(self._delete_session, session_id)
+
+    def executor(self, index):
+        return self._executors[index]
+
+    def shutdown(self):
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if self._janitor is not None:
+            # Let queued session deletes finish so the endpoint isn't left with them.
+            self._janitor.shutdown(wait=True)
+
+
+class ConciergeService:
+    """Bounded queue in front of an AgentPool."""
+
+    def __init__(self, pool, queue_size=DEFAULT_QUEUE_SIZE, default_deadline=DEFAULT_DEADLINE, sessions=None,
+                 cache=None):
+        self.pool = pool
+        # None disables the semantic cache
+        self.cache = cache
+        self.queue_size = queue_size
+        self.default_deadline = default_deadline
+        self.sessions = sessions if sessions is not None else SessionManager()
+        self.sessions.on_evict = lambda session: pool.delete_session(session.session_id)
+        self.stats = ServiceStats()
+        self.in_flight = 0
+        self.ready = False
+        self._queue = None
+        self._workers = []
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        await self.pool.start()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.pool.size)]
+        self._workers.append(asyncio.create_task(self._sweeper()))
+        self.ready = True
+
+    async def stop(self):
+        self.ready = False
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self.sessions.close()
+        self.pool.shutdown()
+
+    async def _sweeper(self):
+        interval = max(1.0, min(60.0, self.sessions.idle_ttl / 4))
+        while True:
+            await asyncio.sleep(interval)
+            self.sessions.sweep()
+
+    def _run(self, index, job, loop):
+        """Run a job, continuing its guest's session (on the agent's thread)."""
+        if job.session_key is None:
+            return self.pool.run(index, job, loop)
+        session = self.sessions.acquire(job.session_key)
+        try:
+            with session.lock:
+                result = self.pool.run(index, job, loop, session_id=session.session_id, keep_session=True)
+                self.sessions.record(session, result["session_id"], job.prompt, result["answer"])
+                return {**result, "guest_id": session.key, "turn": len(session.turns)}
+        finally:
+            self.sessions.release(session)
+
+    # ---- dispatch ----
+    def retry_after(self):
+        """Seconds until a queue slot is likely to free up."""
+        per_run = self.stats.average_run or 5.0
+        return max(1, round(per_run * (self._queue.qsize() + 1) / self.pool.size))
+
+    def submit(self, prompt, payload, stream=False):
+        deadline_ms = payload.get("deadline_ms")
+        try:
+            seconds = float(deadline_ms) / 1000 if deadline_ms is not None else self.default_deadline
+        except (TypeError, ValueError):
+            raise HttpError(400, "'deadline_ms' must be a number")
+        if seconds <= 0:
+            raise HttpError(400, "'deadline_ms' must be positive")
+        job = Job(prompt, payload, time.monotonic() + min(seconds, MAX_DEADLINE), stream)
+        if not self.ready:
+            raise HttpError(503, "Service is starting", {"Retry-After": "5"})
+        self._apply_cache(job)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise HttpError(429, "Concierge is at capacity, retry later", {"Retry-After": str(self.retry_after())})
+        self.stats.accepted += 1
+        job.emit("queued", position=self._queue.qsize())
+        return job
+
+    def _cacheable(self, payload):
+        if not isinstance(payload.get("hotel") or "", str):
+            raise HttpError(400, "'hotel' must be a string")
+        # Only plain review triage: a custom query asks for a different answer.
+        return (self.cache is not None and payload.get("cache", True) and payload.get("review")
+                and not payload.get("query"))
+
+    def _apply_cache(self, job):
+        """Rewrite the prompt of a near-duplicate review to reuse a cached answer.
+
+        A draft match is adapted to this guest by a cheap, tool-free run (the
+        cached text answers another guest's wording); a weaker match gets the
+        cached research as a lead to check.
+        """
+        if not self._cacheable(job.payload):
+            return
+        hit = self.cache.lookup(job.payload["review"], job.payload.get("hotel"))
+        if hit is None:
+            return
+        job.cache_hit = hit
+        if hit.mode == MODE_DRAFT:
+            self.stats.cached += 1
+            job.prompt = personalise_prompt(job.payload["review"], hit.entry.answer)
+        else:
+            job.prompt = research_prompt(job.payload["review"], hit)
+
+    async def _worker(self, index):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.abandoned or job.remaining() <= 0:
+                    # The caller has already been told 504; don't spend an agent on it.
+                    self.stats.expired += 1
+                    if not job.future.done():
+                        job.future.set_exception(HttpError(504, "Deadline expired while queued"))
+                    continue
+                job.started = time.monotonic()
+                job.emit("started", queued_ms=round((job.started - job.enqueued) * 1000))
+                self.in_flight += 1
+                try:
+                    result = await loop.run_in_executor(self.pool.executor(index), self._run, index, job, loop)
+                    self.stats.served += 1
+                    self.stats.run_seconds += time.monotonic() - job.started
+                    prefetch = result.get("prefetch") or {}
+                    self.stats.prefetch_served += prefetch.get("served", 0)
+                    self.stats.prefetch_wasted += prefetch.get("wasted", 0)
+                    self.stats.prefetch_saved += prefetch.get("saved_s", 0.0)
+                    if job.cache_hit is not None:
+                        result["cached"] = job.cache_hit.to_dict()
+                    elif self._cacheable(job.payload):
+                        # Only fully researched answers become cache entries.
+                        self.cache.store(job.payload["review"], result["answer"], job.payload.get("hotel"))
+                    if not job.future.done():
+                        job.future.set_result(result)
+                except Exception as e:
+                    self.stats.failed += 1
+                    if not job.future.done():
+                        job.future.set_exception(HttpError(502, f"Agent run failed: {e}"))
+                finally:
+                    self.in_flight -= 1
+            finally:
+                self._queue.task_done()
+
+    async def result(self, job):
+        """Wait for a job within its deadline."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), max(job.remaining(), 0))
+        except asyncio.TimeoutError:
+            job.abandoned = True
+            self.stats.timed_out += 1
+            raise HttpError(504, "Deadline exceeded")
+
+    def health(self):
+        depth = self._queue.qsize() if self._queue else 0
+        if not self.ready:
+            status = "starting"
+        elif depth >= self.queue_size * DEGRADED_RATIO:
+            status = "degraded"
+        else:
+            status = "ok"
+        s = self.stats
+        return {
+            "status": status,
+            "workers": self.pool.size,
+            "in_flight": self.in_flight,
+            "queue_depth": depth,
+            "queue_capacity": self.queue_size,
+            "accepted": s.accepted,
+            "served": s.served,
+            "adapted_from_cache": s.cached,
+            "rejected": s.rejected,
+            "expired_in_queue": s.expired,
+            "timed_out": s.timed_out,
+            "failed": s.failed,
+            "average_run_ms": round(s.average_run * 1000),
+            "prefetch": {"served": s.prefetch_served, "wasted": s.prefetch_wasted,
+                         "saved_s": round(s.prefetch_saved, 1)},
+            "sessions": self.sessions.stats(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "rag_cache": rag_cache.default_cache().stats(),
+        }
+
+
+# ---- HTTP ----
+async def read_request(reader):
+    """Parse one HTTP/1.1 request: (method, path, headers, body)."""
+    request_line = await asyncio.wait_for(reader.readline(), HEADER_TIMEOUT)
+    if not request_line:
+        return None
+    try:
+        method, target, _version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await asyncio.wait_for(reader.readline(), HEADER_TIMEOUT)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, f"Body larger than {MAX_BODY_BYTES} bytes")
+    body = await asyncio.wait_for(reader.readexactly(length), HEADER_TIMEOUT) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_json(writer, status, data, headers=None):
+    body = json.dumps(data).encode("utf-8")
+    head = {"Content-Type": "application/json", "Content-Length": len(body), "Connection": "close",
+            **(headers or {})}
+    writer.write(_head(status, head) + body)
+    await writer.drain()
+
+
+async def send_stream(writer, service, job):
+    """Stream a job's events as chunked NDJSON until it finishes or times out."""
+    writer.write(_head(200, {"Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked",
+                             "Connection": "close"}))
+
+    async def chunk(event):
+        data = (json.dumps(event) + "\n").encode("utf-8")
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    result = asyncio.ensure_future(service.result(job))
+    try:
+        while True:
+            next_event = asyncio.ensure_future(job.events.get())
+            done, _ = await asyncio.wait({next_event, result}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event in done:
+                await chunk(next_event.result())
+                continue
+            next_event.cancel()
+            while not job.events.empty():
+                await chunk(job.events.get_nowait())
+            try:
+                await chunk({"event": "answer", **result.result()})
+                await chunk({"event": "done"})
+            except HttpError as e:
+                await chunk({"event": "error", "status": e.status, "error": e.message})
+            break
+    finally:
+        result.cancel()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def handle_connection(service, reader, writer):
+    try:
+        try:
+            request = await read_request(reader)
+            if request is None:
+                return
+            method, path, headers, body = request
+            if path == "/health" and method == "GET":
+                health = service.health()
+                await send_json(writer, 200 if service.ready else 503, health)
+                return
+            if path.startswith("/v1/sessions/") and method == "GET":
+                session = service.sessions.get(path[len("/v1/sessions/"):])
+                if session is None:
+                    raise HttpError(404, "No live session for that guest")
+                await send_json(writer, 200, session)
+                return
+            if path != "/v1/concierge":
+                raise HttpError(404, f"No route for {path}")
+            if method != "POST":
+                raise HttpError(405, "Use POST", {"Allow": "POST"})
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise HttpError(400, "Body is not valid JSON")
+            prompt = build_prompt(payload)
+            stream = bool(payload.get("stream")) or "application/x-ndjson" in headers.get("accept", "")
+            job = service.submit(prompt, payload, stream=stream)
+            if stream:
+                await send_stream(writer, service, job)
+                return
+            result = await service.result(job)
+            await send_json(writer, 200, {
+                **result,
+                "queued_ms": round((job.started - job.enqueued) * 1000),
+                "run_ms": round((time.monotonic() - job.started) * 1000),
+            })
+        except HttpError as e:
+            await send_json(writer, e.status, {"error": e.message}, e.headers)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            await send_json(writer, 400, {"error": "Incomplete or malformed request"})
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+def concierge_agent_factory(index):
+    # Imported lazily: concierge_agent validates its environment at import time.
+    import concierge_agent
+    return concierge_agent.build_agent(setup=index == 0)
+
+
+async def serve(args, agent_factory=concierge_agent_factory):
+    sessions = SessionManager(max_sessions=args.max_sessions, idle_ttl=args.session_ttl,
+                              max_bytes=int(args.session_memory_mb * 1024 * 1024))
+    cache = None if args.no_cache else SemanticCache(
+        draft_threshold=args.draft_threshold, research_threshold=args.research_threshold, ttl=args.cache_ttl)
+    service = ConciergeService(AgentPool(agent_factory, args.workers), args.queue_size, args.deadline, sessions, cache)
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(service, r, w), args.host, args.port, backlog=args.queue_size * 4)
+    print(f"🔄 Warming up {args.workers} agent(s)...")
+    await service.start()
+    print(f"✅ Concierge service on http://{args.host}:{args.port} "
+          f"({args.workers} agent(s), queue of {args.queue_size})")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    async with server:
+        await stop.wait()
+    print("🛑 Shutting down...")
+    await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hotel concierge HTTP service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Warm agents (concurrent runs)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Requests waiting for an agent before new ones get 429")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE,
+                        help="Default per-request deadline in seconds (payload deadline_ms overrides)")
+    parser.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS,
+                        help="Guest sessions kept live; least recently used are evicted beyond this")
+    parser.add_argument("--session-ttl", type=float, default=DEFAULT_IDLE_TTL,
+                        help="Seconds a guest session may sit idle before it is evicted")
+    parser.add_argument("--session-memory-mb", type=float, default=64,
+                        help="Memory budget for session transcripts")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the semantic answer cache")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL, help="Seconds a cached answer stays usable")
+    parser.add_argument("--draft-threshold", type=float, default=DRAFT_THRESHOLD,
+                        help="Similarity at which a cached draft is returned as-is")
+    parser.add_argument("--research-threshold", type=float, default=RESEARCH_THRESHOLD,
+                        help="Similarity at which a cached answer replaces the research tool calls")
+    args = parser.parse_args()
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,66 @@
-import oci
-import time
-from oci.retry import RetryStrategyBuilder
+import os
+import sys
+
+from identity_executor import IdentityExecutor
+from policy_planner import shard_policies
+from tenancy_snapshot import TenancySnapshot, created_for_lab
+
+# Shared client factory lives one level up, next to setup.py/cleanup.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from oci_clients import ClientFactory  # noqa: E402
 # -------------------------------
 # Config and client
 # -------------------------------
-config = oci.config.from_file()
-identity_client = oci.identity.IdentityClient(config)
-# Simple retry strategy (5 max attempts)
-retry_strategy = RetryStrategyBuilder().add_max_attempts(5).get_retry_strategy()
-
-# Identity client with retry
-identity_client = oci.identity.IdentityClient(config, retry_strategy=retry_strategy)
+clients = ClientFactory()
+config = clients.config
+# Retries and throttling are handled by the executor (adaptive backoff on
+# 429), so the client itself does not retry.
+identity_client = clients.identity(retries=False)
+executor = IdentityExecutor()
+snapshot = TenancySnapshot(identity_client, config["tenancy"], executor)
 # -------------------------------
 # Helper functions
 # -------------------------------
 def get_group_by_name(group_name):
-    groups = identity_client.list_groups(compartment_id=config["tenancy"]).data
-    return next((g for g in groups if g.name == group_name), None)
+    return snapshot.group(group_name)
 
 def list_user_group_memberships(group_id):
-    return identity_client.list_user_group_memberships(compartment_id=config["tenancy"], group_id=group_id).data
+    return list(snapshot.group_memberships(group_id).values())
 
 def remove_user_from_group(user_id, group_id):
-    memberships = list_user_group_memberships(group_id)
-    membership = next((m for m in memberships if m.user_id == user_id), None)
+    membership = snapshot.group_memberships(group_id).get(user_id)
     if membership:
-        identity_client.remove_user_from_group(user_group_membership_id=membership.id)
+        executor.call("membership", identity_client.remove_user_from_group,
+                      user_group_membership_id=membership.id)
+        snapshot.remove_membership(user_id, group_id)
         print(f"Removed user {user_id} from group {group_id}")
 
 def delete_user(user_id, user_name):
-    identity_client.delete_user(user_id)
+    executor.call("user", identity_client.delete_user, user_id)
+    snapshot.remove_user(user_name)
     print(f"Deleted user {user_name}")
 
 def delete_compartment(compartment_name):
-    compartments = identity_client.list_compartments(
-        compartment_id=config["tenancy"],
-        compartment_id_in_subtree=True,
-        lifecycle_state=oci.identity.models.Compartment.LIFECYCLE_STATE_ACTIVE
-    ).data
-    comp = next((c for c in compartments if c.name == compartment_name), None)
+    comp = snapshot.compartment(compartment_name)
     if comp:
-        identity_client.delete_compartment(comp.id)
+        executor.call("compartment", identity_client.delete_compartment, comp.id)
+        snapshot.remove_compartment(compartment_name)
         print(f"Deleted compartment {compartment_name}")
 
 def delete_policy(policy_name):
-    policies = identity_client.list_policies(compartment_id=config["tenancy"]).data
-    policy = next((p for p in policies if p.name == policy_name), None)
+    policy = snapshot.policy(policy_name)
     if policy:
-        identity_client.delete_policy(policy.id)
+        executor.call("policy", identity_client.delete_policy, policy.id)
+        snapshot.remove_policy(policy_name)
         print(f"Deleted policy {policy_name}")
 
 def delete_lab_compartments(lab_name):
-    compartments = identity_client.list_compartments(
-        compartment_id=config["tenancy"],
-        compartment_id_in_subtree=True,
-        lifecycle_state=oci.identity.models.Compartment.LIFECYCLE_STATE_ACTIVE
-    ).data
-
-    for comp in compartments:
-        if lab_name in comp.name:
-            try:
-                identity_client.delete_compartment(comp.id)
-                print(f"Deleted compartment {comp.name}")
-            except oci.exceptions.ServiceError as e:
-                print(f"Failed to delete compartment {comp.name}: {e}")
+    names = [name for name in snapshot.compartments if lab_name in name]
+    executor.run_per_user(names, delete_compartment, "Lab compartments")
+
+def compartment_name_for(user_name):
+    # Assumes compartments are named like "<username>Compartment"
+    return user_name.split("@")[0].replace("+", "_") + "Compartment"
 
 # -------------------------------
 # Main cleanup
@@ -81,52 +78,47 @@ if not group:
 
 print(f"Found group: {group.name}, OCID: {group.id}")
 
-# Remove users from group and delete users
+# Remove users from the group; delete the ones the lab setup created
 memberships = list_user_group_memberships(group.id)
 
+# Resolve member names from the (already paged) user index instead of a
+# get_user call per member
+users_by_id = {u.id: u for u in snapshot.users.values()}
 users_info = []
-
 for membership in memberships:
-    try:
-        user = identity_client.get_user(membership.user_id).data
-        users_info.append({"id": user.id, "name": user.name})
-    except oci.exceptions.ServiceError as e:
-        if e.status == 404:
-            print(f"User {membership.user_id} not found, skipping...")
-        else:
-            raise
-
-# Delete per-user compartments
-# Assumes compartments are named like "<username>Compartment"
-# for membership in memberships:
-#     user_name = identity_client.get_user(membership.user_id).data.name
-#     comp_name = user_name.split("@")[0].replace("+", "_") + "Compartment"
-#     delete_compartment(comp_name)
-
-
-for membership in memberships:
-    user_name = identity_client.get_user(membership.user_id).data.name
-    comp_name = user_name.split("@")[0].replace("+", "_") + "Compartment"
-    try:
-        delete_compartment(comp_name)
-        time.sleep(1)  # wait 1 second to avoid throttling
-    except oci.exceptions.ServiceError as e:
-        print(f"Error deleting compartment {comp_name}: {e}")
-
-# Delete policies
+    user = users_by_id.get(membership.user_id)
+    if user is None:
+        print(f"User {membership.user_id} not found, skipping...")
+        continue
+    users_info.append({"id": user.id, "name": user.name, "created": created_for_lab(user, lab_group_name)})
+
+user_ids = {u["name"]: u["id"] for u in users_info}
+created_users = {u["name"] for u in users_info if u["created"]}
+
+def offboard_user(user_name):
+    comp_name = compartment_name_for(user_name)
+    delete_compartment(comp_name)
+    # Delete per-user policies (assumes same naming as creation)
+    delete_policy(f"{lab_group_name}-{comp_name}-Policy")
+    # The group can only be deleted once it has no members
+    remove_user_from_group(user_ids[user_name], group.id)
+    # Users that existed before the lab (setup reused them) are only removed from the group
+    if user_name in created_users:
+        delete_user(user_ids[user_name], user_name)
+    else:
+        print(f"Kept user {user_name}: not created by the lab setup")
+
+# Delete per-user compartments and policies
+snapshot.load("compartments")
+snapshot.policies()
+executor.run_per_user([u["name"] for u in users_info], offboard_user, "Offboarding users")
+
+# Delete policies (every shard of the base policy)
 base_policy_name = f"{lab_group_name}-BasePolicy"
-delete_policy(base_policy_name)
-
-# Delete per-user policies (assumes same naming as creation)
-for membership in memberships:
-    user_name = identity_client.get_user(membership.user_id).data.name
-    comp_name = user_name.split("@")[0].replace("+", "_") + "Compartment"
-    policy_name = f"{lab_group_name}-{comp_name}-Policy"
-    delete_policy(policy_name)
+for policy in shard_policies(base_policy_name, snapshot.policies()):
+    delete_policy(policy.name)
 
 # Delete the group itself
-identity_client.delete_group(group.id)
+executor.call("group", identity_client.delete_group, group.id)
 print(f"Deleted group {lab_group_name}")
-
-
-
+clients.print_summary()
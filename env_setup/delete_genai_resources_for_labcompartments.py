@@ -1,89 +1,61 @@
-import oci
-from oci.oda import OdaClient
-from oci.ai_service_language import AIServiceLanguageClient
+import argparse
+import os
+import sys
+import time
 
-# -------------------------------
-# Config and clients
-# -------------------------------
-config = oci.config.from_file()
-identity_client = oci.identity.IdentityClient(config)
+from genai_sweeper import GenAiSweeper, discover, summarize
+from identity_executor import IdentityExecutor
+from tenancy_snapshot import TenancySnapshot
 
-# Digital Assistant client (Agents / KnowledgeBases)
-oda_client = OdaClient(config)
-
-# Generative AI client (Tools / Endpoints)
-ai_client = AIServiceLanguageClient(config)
+# Shared client factory lives one level up, next to setup.py/cleanup.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from oci_clients import ClientFactory  # noqa: E402
 
 # -------------------------------
-# Resource cleanup functions
+# Config and clients
 # -------------------------------
-def delete_agents(compartment_id):
-    try:
-        agents = oda_client.list_odas(compartment_id=compartment_id).data
-        for agent in agents:
-            print(f"Deleting Agent {agent.display_name}")
-            oda_client.delete_oda(agent.id)
-    except oci.exceptions.ServiceError as e:
-        print(f"No Agents or error: {e}")
+clients = ClientFactory()
+config = clients.config
+# Deletes retry through the executor, so the identity client doesn't; the
+# agent client keeps the shared retry policy for the sweeper's status polls.
+identity_client = clients.identity(retries=False)
 
-def delete_knowledgebases(compartment_id):
-    try:
-        kbs = oda_client.list_knowledge_bases(compartment_id=compartment_id).data
-        for kb in kbs:
-            print(f"Deleting KnowledgeBase {kb.display_name}")
-            oda_client.delete_knowledge_base(kb.id)
-    except oci.exceptions.ServiceError as e:
-        print(f"No KnowledgeBases or error: {e}")
+# Generative AI Agents client (Agents / Knowledge Bases / Tools / Endpoints)
+agent_client = clients.genai_agent()
 
-def delete_tools(compartment_id):
-    try:
-        tools = ai_client.list_tools(compartment_id=compartment_id).data
-        for tool in tools:
-            print(f"Deleting Tool {tool.display_name}")
-            ai_client.delete_tool(tool.id)
-    except oci.exceptions.ServiceError as e:
-        print(f"No Tools or error: {e}")
-
-def delete_endpoints(compartment_id):
-    try:
-        endpoints = ai_client.list_endpoints(compartment_id=compartment_id).data
-        for ep in endpoints:
-            print(f"Deleting Endpoint {ep.display_name}")
-            ai_client.delete_endpoint(ep.id)
-    except oci.exceptions.ServiceError as e:
-        print(f"No Endpoints or error: {e}")
+executor = IdentityExecutor()
+snapshot = TenancySnapshot(identity_client, config["tenancy"], executor)
 
 # -------------------------------
 # Delete compartments and resources
 # -------------------------------
-def delete_lab_compartments(lab_group_name):
-    compartments = identity_client.list_compartments(
-        compartment_id=config["tenancy"],
-        compartment_id_in_subtree=True,
-        lifecycle_state=oci.identity.models.Compartment.LIFECYCLE_STATE_ACTIVE
-    ).data
-
+def delete_lab_compartments(lab_group_name, dry_run=False):
     # Filter compartments by lab group name
-    lab_compartments = [c for c in compartments if lab_group_name.lower() in c.name.lower()]
+    lab_compartments = [
+        c for name, c in snapshot.compartments.items() if lab_group_name.lower() in name.lower()
+    ]
+    if not lab_compartments:
+        print(f"No compartments matching '{lab_group_name}'")
+        return
 
-    for comp in lab_compartments:
-        print(f"\nCleaning resources in compartment {comp.name} (OCID: {comp.id})...")
+    started = time.monotonic()
+    print(f"\nDiscovering GenAI resources in {len(lab_compartments)} compartment(s)...")
+    resources = discover(agent_client, lab_compartments, executor)
+    print(f"Found {len(resources) - len(lab_compartments)} resource(s); deleting in dependency order...")
 
-        # Delete resources
-        delete_agents(comp.id)
-        delete_knowledgebases(comp.id)
-        delete_tools(comp.id)
-        delete_endpoints(comp.id)
-
-        # Delete the compartment itself
-        try:
-            identity_client.delete_compartment(comp.id)
-            print(f"Deleted compartment {comp.name}")
-        except oci.exceptions.ServiceError as e:
-            print(f"Error deleting compartment {comp.name}: {e}")
+    # Endpoints/tools -> agents -> knowledge bases -> compartment, across
+    # all compartments at once, each delete tracked to completion
+    sweeper = GenAiSweeper(agent_client, identity_client, executor, dry_run=dry_run)
+    failures = sweeper.sweep(resources)
+    summarize(resources, failures, time.monotonic() - started, dry_run=dry_run)
 
 # -------------------------------
 # Main
 # -------------------------------
+parser = argparse.ArgumentParser(description="Delete the GenAI resources and compartments of a lab group")
+parser.add_argument("--dry-run", action="store_true", help="Discover and print what would be deleted")
+args = parser.parse_args()
+
 lab_group_name = input("Enter Lab Group Name to delete resources from: ").strip()
-delete_lab_compartments(lab_group_name)
+delete_lab_compartments(lab_group_name, dry_run=args.dry_run)
+clients.print_summary()
@@ -0,0 +1,215 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import oci
+
+from identity_executor import IdentityExecutor
+
+# Shared waiters live one level up, next to setup.py/cleanup.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from oci_waiter import wait_for_deletion  # noqa: E402
+
+# -------------------------------
+# GenAI agent resource sweeper
+# -------------------------------
+# Discovers every Generative AI Agent resource (endpoints, tools, agents,
+# data sources, knowledge bases) in a set of compartments, builds a
+# dependency graph between them and deletes across compartments
+# concurrently with bounded parallelism:
+#
+#   endpoints + tools -> agent ------------------> compartment
+#   data sources -----> knowledge base ----------> compartment
+#   tools ------------> knowledge base (RAG tools reference it)
+#
+# Each delete is tracked to completion through its work request (or by
+# polling the resource until it is gone) with oci_waiter.wait_for_deletion.
+# The clients are passed in, so the sweeper runs unchanged against a local
+# fake of the control-plane API.
+
+MAX_WORKERS = 16
+DELETE_TIMEOUT = 30 * 60
+
+# kind -> (list call, delete call, get call)
+RESOURCE_KINDS = {
+    "endpoint": ("list_agent_endpoints", "delete_agent_endpoint", "get_agent_endpoint"),
+    "tool": ("list_tools", "delete_tool", "get_tool"),
+    "agent": ("list_agents", "delete_agent", "get_agent"),
+    "data_source": ("list_data_sources", "delete_data_source", "get_data_source"),
+    "knowledge_base": ("list_knowledge_bases", "delete_knowledge_base", "get_knowledge_base"),
+}
+
+
+class SweepResource:
+    """A resource to delete and the resources that must be gone first."""
+
+    def __init__(self, kind, resource_id, compartment_id, name, parent_id=None):
+        self.kind = kind
+        self.id = resource_id
+        self.compartment_id = compartment_id
+        self.name = name
+        self.parent_id = parent_id
+        self.deps = set()
+        self.error = None
+        self.seconds = None
+
+    @property
+    def label(self):
+        return f"{self.kind} {self.name}"
+
+
+def _list_items(client, list_name, executor, compartment_id):
+    items = []
+    page = None
+    while True:
+        response = executor.call("genai-read", getattr(client, list_name),
+                                 compartment_id=compartment_id, page=page)
+        data = response.data
+        items.extend(data.items if hasattr(data, "items") else data)
+        page = response.next_page
+        if not page:
+            return items
+
+
+def discover(agent_client, compartments, executor, max_workers=MAX_WORKERS):
+    """List every GenAI resource kind in every compartment, concurrently.
+
+    `compartments` is a list of objects with .id and .name. Returns a dict of
+    resource id -> SweepResource, with dependencies filled in.
+    """
+    jobs = [(c, kind) for c in compartments for kind in RESOURCE_KINDS]
+    resources = {}
+
+    def list_kind(job):
+        compartment, kind = job
+        items = _list_items(agent_client, RESOURCE_KINDS[kind][0], executor, compartment.id)
+        found = []
+        for item in items:
+            if getattr(item, "lifecycle_state", None) in ("DELETED", "DELETING"):
+                continue
+            parent = getattr(item, "agent_id", None) or getattr(item, "knowledge_base_id", None)
+            name = getattr(item, "display_name", None) or getattr(item, "description", None) or item.id
+            found.append(SweepResource(kind, item.id, compartment.id, name, parent))
+        return found
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for found in pool.map(list_kind, jobs):
+            for resource in found:
+                resources[resource.id] = resource
+
+    for compartment in compartments:
+        resources[compartment.id] = SweepResource("compartment", compartment.id, compartment.id, compartment.name)
+
+    by_compartment = {}
+    for resource in resources.values():
+        if resource.kind != "compartment":
+            by_compartment.setdefault(resource.compartment_id, []).append(resource)
+
+    for resource in resources.values():
+        if resource.kind in ("endpoint", "tool", "data_source") and resource.parent_id in resources:
+            resources[resource.parent_id].deps.add(resource.id)
+        if resource.kind == "tool":
+            # RAG tools reference knowledge bases in the same compartment.
+            for other in by_compartment.get(resource.compartment_id, []):
+                if other.kind == "knowledge_base":
+                    other.deps.add(resource.id)
+        if resource.kind == "compartment":
+            resource.deps.update(r.id for r in by_compartment.get(resource.id, []))
+    return resources
+
+
+class GenAiSweeper:
+    """Deletes a discovered resource graph with bounded parallelism."""
+
+    def __init__(self, agent_client, identity_client=None, executor=None,
+                 max_workers=MAX_WORKERS, delete_compartments=True, dry_run=False):
+        self.agent_client = agent_client
+        self.identity_client = identity_client
+        self.executor = executor or IdentityExecutor(max_workers=max_workers)
+        self.max_workers = max_workers
+        self.delete_compartments = delete_compartments
+        self.dry_run = dry_run
+        self._print_lock = threading.Lock()
+
+    def _log(self, message):
+        with self._print_lock:
+            print(message)
+
+    def _delete(self, resource):
+        started = time.monotonic()
+        try:
+            if self.dry_run:
+                self._log(f"📝 Would delete {resource.label}")
+                return
+            if resource.kind == "compartment":
+                client = self.identity_client
+                delete_fn, get_fn = client.delete_compartment, client.get_compartment
+            else:
+                _, delete_name, get_name = RESOURCE_KINDS[resource.kind]
+                client = self.agent_client
+                delete_fn, get_fn = getattr(client, delete_name), getattr(client, get_name)
+
+            try:
+                response = self.executor.call("genai-delete", delete_fn, resource.id)
+            except oci.exceptions.ServiceError as e:
+                if e.status != 404:
+                    raise
+                response = None
+            wait_for_deletion(client, response, get_fn, resource.id, resource.label, timeout=DELETE_TIMEOUT)
+        finally:
+            resource.seconds = time.monotonic() - started
+
+    def sweep(self, resources):
+        """Delete every resource once its dependencies are gone.
+
+        A failed delete blocks only the resources that depend on it. Returns
+        the list of resources that failed or were blocked.
+        """
+        if not self.delete_compartments:
+            resources = {rid: r for rid, r in resources.items() if r.kind != "compartment"}
+        remaining = dict(resources)
+        done, failed = set(), set()
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while remaining or pending:
+                for rid, resource in list(remaining.items()):
+                    deps = resource.deps & set(resources)
+                    if deps & failed:
+                        resource.error = "blocked by a failed dependency"
+                        failed.add(rid)
+                        del remaining[rid]
+                    elif deps <= done:
+                        pending[pool.submit(self._delete, resource)] = resource
+                        del remaining[rid]
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    resource = pending.pop(future)
+                    if future.exception() is not None:
+                        resource.error = future.exception()
+                        failed.add(resource.id)
+                        self._log(f"❌ Failed to delete {resource.label}: "
+                                  f"{getattr(resource.error, 'message', resource.error)}")
+                    else:
+                        done.add(resource.id)
+
+        return [resources[rid] for rid in failed]
+
+
+def summarize(resources, failures, elapsed, dry_run=False):
+    counts = {}
+    for resource in resources.values():
+        counts[resource.kind] = counts.get(resource.kind, 0) + 1
+    print("\nSweep summary")
+    print("-" * 40)
+    for kind, count in sorted(counts.items()):
+        print(f"   {kind:<16} {count}")
+    outcome = "would be deleted" if dry_run else "deleted"
+    print(f"   {len(resources) - len(failures)} {outcome}, {len(failures)} failed/blocked in {elapsed:.1f}s")
+    for resource in failures:
+        print(f"   ❌ {resource.label} ({resource.compartment_id}): "
+              f"{getattr(resource.error, 'message', resource.error)}")
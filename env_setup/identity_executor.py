@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import oci
+
+# -------------------------------
+# Throttle-aware identity executor
+# -------------------------------
+# Runs per-user identity work concurrently while keeping each API family
+# under its own request rate. Every family has a token bucket; a 429 halves
+# that family's rate and retries with jittered backoff, and each success
+# nudges the rate back up towards its ceiling (AIMD), so a run settles at
+# the highest rate the Identity service currently accepts.
+
+# Requests per second per API family (ceiling, starting rate).
+API_FAMILY_RATES = {
+    "read": (20.0, 10.0),
+    "compartment": (2.0, 1.0),
+    "user": (10.0, 5.0),
+    "group": (10.0, 5.0),
+    "membership": (10.0, 5.0),
+    "policy": (2.0, 1.0),
+    "genai-read": (20.0, 10.0),
+    "genai-delete": (10.0, 5.0),
+}
+DEFAULT_RATE = (5.0, 2.0)
+MIN_RATE = 0.2
+RATE_INCREASE = 0.1
+MAX_ATTEMPTS = 8
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+MAX_WORKERS = 16
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Thread-safe token bucket with an adjustable refill rate."""
+
+    def __init__(self, rate, max_rate, burst=None):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.burst = burst or max(1.0, max_rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self):
+        """Multiplicative decrease after a 429."""
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def succeeded(self):
+        """Additive increase after a successful call."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+
+class IdentityExecutor:
+    """Rate-limited, retrying, concurrent runner for identity operations."""
+
+    def __init__(self, max_workers=MAX_WORKERS, rates=None):
+        self.max_workers = max_workers
+        self.buckets = {}
+        for family, (max_rate, rate) in (rates or API_FAMILY_RATES).items():
+            self.buckets[family] = TokenBucket(rate, max_rate)
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def _bucket(self, family):
+        with self._lock:
+            if family not in self.buckets:
+                max_rate, rate = DEFAULT_RATE
+                self.buckets[family] = TokenBucket(rate, max_rate)
+            return self.buckets[family]
+
+    def call(self, family, fn, *args, **kwargs):
+        """Call an identity API under the family's rate limit, retrying 429/5xx."""
+        bucket = self._bucket(family)
+        delay = RETRY_DELAY
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            bucket.acquire()
+            try:
+                result = fn(*args, **kwargs)
+                bucket.succeeded()
+                return result
+            except oci.exceptions.ServiceError as e:
+                if e.status not in RETRYABLE_STATUSES or attempt == MAX_ATTEMPTS:
+                    raise
+                if e.status == 429:
+                    bucket.throttled()
+                    with self._lock:
+                        self.throttled += 1
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def run_per_user(self, users, task, label):
+        """Run task(user) for every user concurrently.
+
+        Prints one progress line per user and a failure summary at the end.
+        Returns (results, failures) where results maps user -> task result
+        and failures maps user -> exception.
+        """
+        results, failures = {}, {}
+        total = len(users)
+        if not total:
+            return results, failures
+
+        started = time.monotonic()
+        print(f"\n{label}: {total} user(s), up to {self.max_workers} in parallel")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(task, user): user for user in users}
+            for done, future in enumerate(as_completed(futures), start=1):
+                user = futures[future]
+                try:
+                    results[user] = future.result()
+                    print(f"[{done}/{total}] ✅ {user}")
+                except Exception as e:
+                    failures[user] = e
+                    print(f"[{done}/{total}] ❌ {user}: {getattr(e, 'message', e)}")
+
+        elapsed = time.monotonic() - started
+        print(f"{label}: {len(results)} succeeded, {len(failures)} failed "
+              f"in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} users/s, "
+              f"{self.throttled} throttled call(s) so far)")
+        for user, error in failures.items():
+            print(f"   ❌ {user}: {getattr(error, 'message', error)}")
+        return results, failures
@@ -0,0 +1,129 @@
+import re
+
+import oci
+
+# -------------------------------
+# Policy sharding
+# -------------------------------
+# A single IAM policy holds at most MAX_STATEMENTS_PER_POLICY statements,
+# so a large cohort's per-compartment statements cannot all live in one
+# "<group>-BasePolicy". The planner spreads the desired statements over
+# numbered shards:
+#
+#   <group>-BasePolicy, <group>-BasePolicy-2, <group>-BasePolicy-3, ...
+#
+# and diffs them against what already exists: statements stay in the shard
+# they are already in, stale ones are dropped, and new ones go into the
+# shard(s) with the most free room before any new shard is created. A cohort
+# that grows by a handful of users therefore updates a single policy.
+
+MAX_STATEMENTS_PER_POLICY = 50
+
+
+def normalize_statement(statement):
+    """Compare statements case- and whitespace-insensitively, like IAM does."""
+    return re.sub(r"\s+", " ", statement.strip()).lower()
+
+
+def shard_name(base_name, index):
+    return base_name if index == 1 else f"{base_name}-{index}"
+
+
+def is_shard(base_name, policy_name):
+    return policy_name == base_name or re.fullmatch(rf"{re.escape(base_name)}-\d+", policy_name) is not None
+
+
+def shard_policies(base_name, policies):
+    """Existing shard policies for `base_name`, ordered by shard number."""
+    shards = [p for name, p in policies.items() if is_shard(base_name, name)]
+
+    def number(policy):
+        return 1 if policy.name == base_name else int(policy.name.rsplit("-", 1)[1])
+
+    return sorted(shards, key=number)
+
+
+class PolicyAction:
+    """A create or update needed to bring one shard in line with the plan."""
+
+    def __init__(self, kind, name, statements, policy=None):
+        self.kind = kind
+        self.name = name
+        self.statements = statements
+        self.policy = policy
+
+    def __repr__(self):
+        return f"PolicyAction({self.kind}, {self.name}, {len(self.statements)} statement(s))"
+
+
+def plan_policies(base_name, desired_statements, policies, limit=MAX_STATEMENTS_PER_POLICY):
+    """Return the PolicyActions needed so the shards hold exactly `desired_statements`."""
+    desired = {}
+    for statement in desired_statements:
+        desired.setdefault(normalize_statement(statement), statement)
+
+    shards = shard_policies(base_name, policies)
+    placed = set()
+    layout = []  # (name, existing policy or None, [statements])
+    for policy in shards:
+        keep = []
+        for statement in policy.statements:
+            key = normalize_statement(statement)
+            if key in desired and key not in placed:
+                keep.append(statement)
+                placed.add(key)
+        layout.append([policy.name, policy, keep])
+
+    missing = [statement for key, statement in desired.items() if key not in placed]
+
+    # Fill the emptiest shards first so new statements land in as few
+    # policies as possible.
+    for entry in sorted(layout, key=lambda e: len(e[2])):
+        room = limit - len(entry[2])
+        if room > 0 and missing:
+            entry[2].extend(missing[:room])
+            missing = missing[room:]
+
+    used = {entry[0] for entry in layout}
+    index = 1
+    while missing:
+        name = shard_name(base_name, index)
+        index += 1
+        if name in used:
+            continue
+        layout.append([name, None, missing[:limit]])
+        missing = missing[limit:]
+
+    actions = []
+    for name, policy, statements in layout:
+        if policy is None:
+            actions.append(PolicyAction("create", name, statements))
+        elif not statements:
+            actions.append(PolicyAction("delete", name, [], policy))
+        elif [normalize_statement(s) for s in statements] != [normalize_statement(s) for s in policy.statements]:
+            actions.append(PolicyAction("update", name, statements, policy))
+    return actions
+
+
+def apply_policy_plan(identity_client, executor, snapshot, compartment_id, actions):
+    """Execute a plan through the rate-limited executor and keep the snapshot current."""
+    for action in actions:
+        if action.kind == "create":
+            details = oci.identity.models.CreatePolicyDetails(
+                compartment_id=compartment_id,
+                name=action.name,
+                description=f"Policy for {action.name}",
+                statements=action.statements
+            )
+            policy = executor.call("policy", identity_client.create_policy, details).data
+            snapshot.add_policy(policy)
+            print(f"Created policy: {policy.name} ({len(action.statements)} statements), OCID: {policy.id}")
+        elif action.kind == "update":
+            details = oci.identity.models.UpdatePolicyDetails(statements=action.statements)
+            policy = executor.call("policy", identity_client.update_policy, action.policy.id, details).data
+            snapshot.add_policy(policy)
+            print(f"Updated policy: {policy.name} ({len(action.statements)} statements)")
+        elif action.kind == "delete":
+            executor.call("policy", identity_client.delete_policy, action.policy.id)
+            snapshot.remove_policy(action.name, compartment_id)
+            print(f"Deleted empty policy: {action.name}")
@@ -1,14 +1,34 @@
 import oci
+import os
 import re
+import sys
+
+from identity_executor import IdentityExecutor
+from policy_planner import apply_policy_plan, plan_policies
+from tenancy_snapshot import LAB_USER_TAG, TenancySnapshot
+
+# Shared client factory lives one level up, next to setup.py/cleanup.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from oci_clients import ClientFactory  # noqa: E402
 
 # -------------------------------
 # Config and clients
 # -------------------------------
-config = oci.config.from_file()  # Default: ~/.oci/config
-identity_client = oci.identity.IdentityClient(config)
+# Config is parsed once and clients share connections; retries and
+# throttling are handled by the executor, so the client itself does not retry.
+clients = ClientFactory()  # Default: ~/.oci/config
+config = clients.config
+identity_client = clients.identity(retries=False)
 
 tenancy_id = config["tenancy"]
 
+# Each identity collection is listed (fully paginated) once and then
+# looked up / updated locally for every user.
+# Per-user work (and the snapshot's listings) runs under per-API-family rate limits.
+executor = IdentityExecutor()
+
+snapshot = TenancySnapshot(identity_client, tenancy_id, executor)
+
 # -------------------------------
 # Validation and sanitization
 # -------------------------------
@@ -51,8 +71,7 @@ users_file = "users.txt"  # TXT file with one email per line
 # Group functions
 # -------------------------------
 def get_or_create_group(group_name):
-    groups = identity_client.list_groups(compartment_id=config["tenancy"]).data
-    existing_group = next((g for g in groups if g.name == group_name), None)
+    existing_group = snapshot.group(group_name)
     if existing_group:
         print(f"Group '{group_name}' already exists. Using existing group.")
         return existing_group.id
@@ -62,7 +81,8 @@ def get_or_create_group(group_name):
         name=group_name,
         description=f"Lab group {group_name}"
     )
-    group = identity_client.create_group(request).data
+    group = executor.call("group", identity_client.create_group, request).data
+    snapshot.add_group(group)
     print(f"Created group: {group.name}, OCID: {group.id}")
     return group.id
 
@@ -89,12 +109,7 @@ users = read_users(users_file)
 # Compartment functions
 # -------------------------------
 def get_or_create_compartment(name):
-    compartments = identity_client.list_compartments(
-        compartment_id=config["tenancy"],
-        compartment_id_in_subtree=True,
-        lifecycle_state=oci.identity.models.Compartment.LIFECYCLE_STATE_ACTIVE
-    ).data
-    existing = next((c for c in compartments if c.name == name), None)
+    existing = snapshot.compartment(name)
     if existing:
         print(f"Compartment '{name}' already exists. Using existing compartment.")
         return existing.id
@@ -104,22 +119,24 @@ def get_or_create_compartment(name):
         name=name,
         description=f"Compartment for {name}"
     )
-    compartment = identity_client.create_compartment(request).data
+    compartment = executor.call("compartment", identity_client.create_compartment, request).data
+    snapshot.add_compartment(compartment)
     print(f"Created compartment: {compartment.name}, OCID: {compartment.id}")
     return compartment.id
 
-user_compartments = {}
-for user in users:
-    comp_name = sanitize_compartment_name(user)
-    user_compartments[user] = get_or_create_compartment(comp_name)
+snapshot.load("compartments")  # list once before fanning out
+user_compartments, compartment_failures = executor.run_per_user(
+    users,
+    lambda user: get_or_create_compartment(sanitize_compartment_name(user)),
+    "Compartments"
+)
 
 # -------------------------------
 # User functions
 # -------------------------------
 def get_or_create_user(email):
     """Create the user if it does not exist."""
-    users_list = identity_client.list_users(compartment_id=config["tenancy"]).data
-    user_obj = next((u for u in users_list if u.name == email), None)
+    user_obj = snapshot.user(email)
     if user_obj:
         print(f"User '{email}' already exists. Using existing user.")
         return user_obj.id
@@ -128,9 +145,12 @@ def get_or_create_user(email):
         compartment_id=config["tenancy"],
         name=email,
         description=f"Lab user {email}",
-        email=email  # primary email MUST be set
+        email=email,  # primary email MUST be set
+        # Marks the user as the lab's own, so cleanup may delete it
+        freeform_tags={LAB_USER_TAG: lab_group_name}
     )
-    user_obj = identity_client.create_user(request).data
+    user_obj = executor.call("user", identity_client.create_user, request).data
+    snapshot.add_user(user_obj)
     print(f"Created user: {email}, OCID: {user_obj.id}")
     return user_obj.id
 
@@ -140,24 +160,18 @@ def add_user_to_group(user_id, group_id, tenancy_id):
     Skips if the user is already a member of the group.
     """
     try:
-        # Must provide tenancy_id as compartment_id
-        memberships = oci.pagination.list_call_get_all_results(
-            identity_client.list_user_group_memberships,
-            tenancy_id,
-            user_id=user_id
-        ).data
-
-        for membership in memberships:
-            if membership.group_id == group_id:
-                print(f"User {user_id} is already in group {group_id}, skipping.")
-                return
+        # Group members are listed once per group, not once per user
+        if snapshot.is_member(user_id, group_id):
+            print(f"User {user_id} is already in group {group_id}, skipping.")
+            return
 
         # If not already in the group, add them
         details = oci.identity.models.AddUserToGroupDetails(
             user_id=user_id,
             group_id=group_id
         )
-        identity_client.add_user_to_group(details)
+        membership = executor.call("membership", identity_client.add_user_to_group, details).data
+        snapshot.add_membership(membership)
         print(f"✅ Added user {user_id} to group {group_id}")
 
     except oci.exceptions.ServiceError as e:
@@ -168,27 +182,6 @@ def add_user_to_group(user_id, group_id, tenancy_id):
 
 
 
-# -------------------------------
-# Policy functions
-# -------------------------------
-def create_policy(policy_name, statements, compartment_id=config["tenancy"]):
-    if not validate_name(policy_name):
-        print(f"Skipping invalid policy name: {policy_name}")
-        return None
-    policies = identity_client.list_policies(compartment_id=compartment_id).data
-    if any(p.name == policy_name for p in policies):
-        print(f"Policy '{policy_name}' already exists. Skipping.")
-        return None
-    policy_details = oci.identity.models.CreatePolicyDetails(
-        compartment_id=compartment_id,
-        name=policy_name,
-        description=f"Policy for {policy_name}",
-        statements=statements
-    )
-    policy = identity_client.create_policy(policy_details).data
-    print(f"Created policy: {policy.name}, OCID: {policy.id}")
-    return policy.id
-
 # -------------------------------
 # Create base policy (same as group)
 # -------------------------------
@@ -204,19 +197,39 @@ base_statements = [
     f"allow group '{lab_group_name}' to manage genai-agent-family in tenancy"
 ]
 
-# Add all per-user compartments to the same policy
+# One statement per user compartment (sharded across policies below)
 for user in users:
     comp_name = sanitize_compartment_name(user)
     base_statements.append(f"allow group '{lab_group_name}' to manage all-resources in compartment {comp_name}")
 
-# Create a single policy for the group
-create_policy(f"{lab_group_name}-BasePolicy", base_statements)
+# Spread the statements over as few policies as the per-policy statement
+# limit allows, updating only the shards that actually change
+base_policy_name = f"{lab_group_name}-BasePolicy"
+if validate_name(base_policy_name):
+    policy_actions = plan_policies(base_policy_name, base_statements, snapshot.policies(tenancy_id))
+    if policy_actions:
+        apply_policy_plan(identity_client, executor, snapshot, tenancy_id, policy_actions)
+    else:
+        print(f"Policies '{base_policy_name}*' already up to date. Skipping.")
+else:
+    print(f"Skipping invalid policy name: {base_policy_name}")
 
 # -------------------------------
 # Create users and add to group
 # -------------------------------
-for user_email in users:
+def onboard_user(user_email):
     user_id = get_or_create_user(user_email)
-    add_user_to_group(user_id, group_id,tenancy_id)
-
-print("Lab group setup completed successfully!")
+    add_user_to_group(user_id, group_id, tenancy_id)
+    return user_id
+
+# Warm the indexes once so worker threads only do lookups
+snapshot.load("users")
+snapshot.group_memberships(group_id)
+onboarded, user_failures = executor.run_per_user(users, onboard_user, "Users")
+
+failed = set(compartment_failures) | set(user_failures)
+if failed:
+    print(f"Lab group setup finished with {len(failed)} failed user(s): {', '.join(sorted(failed))}")
+else:
+    print(f"Lab group setup completed successfully! ({snapshot.list_calls} identity listing(s) for {len(users)} user(s))")
+clients.print_summary()
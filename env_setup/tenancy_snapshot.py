@@ -0,0 +1,170 @@
+import threading
+
+import oci
+
+# -------------------------------
+# Tenancy snapshot
+# -------------------------------
+# Pages each identity collection (compartments, users, groups, policies,
+# group memberships) once, builds name -> resource hash indexes and keeps
+# them up to date as the lab scripts create resources, so onboarding N
+# users costs O(N) create calls instead of O(N) full listings. With an
+# executor, every page is fetched under its "read" rate limit and retries.
+
+# Freeform tag set on users the lab setup creates (value: the lab group), so
+# offboarding deletes those and leaves users that already existed alone.
+LAB_USER_TAG = "lab-group"
+
+
+def created_for_lab(user, lab_group_name):
+    """Whether `user` was created by the lab setup for `lab_group_name`."""
+    return (user.freeform_tags or {}).get(LAB_USER_TAG) == lab_group_name
+
+
+def list_all(list_fn, *args, **kwargs):
+    """Return every item of a paginated list call."""
+    return oci.pagination.list_call_get_all_results(list_fn, *args, **kwargs).data
+
+
+class TenancySnapshot:
+    """Lazily loaded, locally updated name -> resource indexes for a tenancy."""
+
+    def __init__(self, identity_client, tenancy_id, executor=None):
+        self.identity_client = identity_client
+        self.tenancy_id = tenancy_id
+        self.executor = executor
+        self._lock = threading.RLock()
+        self._compartments = None
+        self._users = None
+        self._groups = None
+        self._policies = {}
+        self._group_members = {}
+        self.list_calls = 0
+
+    def _index(self, items):
+        index = {}
+        for item in items:
+            # Keep the first match, like the next(...) lookups this replaces.
+            index.setdefault(item.name, item)
+        return index
+
+    def _list(self, list_fn, *args, **kwargs):
+        self.list_calls += 1
+        if self.executor is None:
+            return list_all(list_fn, *args, **kwargs)
+        # Page by hand: each page goes through the executor's "read" family.
+        response = self.executor.call("read", list_fn, *args, **kwargs)
+        items = list(response.data)
+        while response.has_next_page:
+            response = self.executor.call("read", list_fn, *args, page=response.next_page, **kwargs)
+            items.extend(response.data)
+        return items
+
+    def load(self, *collections):
+        """List the given collections now (default: all three), e.g. before fanning out to workers."""
+        for name in collections or ("compartments", "users", "groups"):
+            getattr(self, name)
+
+    # ---- compartments ----
+    @property
+    def compartments(self):
+        with self._lock:
+            if self._compartments is None:
+                self._compartments = self._index(self._list(
+                    self.identity_client.list_compartments,
+                    compartment_id=self.tenancy_id,
+                    compartment_id_in_subtree=True,
+                    lifecycle_state=oci.identity.models.Compartment.LIFECYCLE_STATE_ACTIVE
+                ))
+            return self._compartments
+
+    def compartment(self, name):
+        return self.compartments.get(name)
+
+    def add_compartment(self, compartment):
+        with self._lock:
+            self.compartments[compartment.name] = compartment
+
+    def remove_compartment(self, name):
+        with self._lock:
+            self.compartments.pop(name, None)
+
+    # ---- users ----
+    @property
+    def users(self):
+        with self._lock:
+            if self._users is None:
+                self._users = self._index(self._list(
+                    self.identity_client.list_users, compartment_id=self.tenancy_id))
+            return self._users
+
+    def user(self, name):
+        return self.users.get(name)
+
+    def add_user(self, user):
+        with self._lock:
+            self.users[user.name] = user
+
+    def remove_user(self, name):
+        with self._lock:
+            self.users.pop(name, None)
+
+    # ---- groups ----
+    @property
+    def groups(self):
+        with self._lock:
+            if self._groups is None:
+                self._groups = self._index(self._list(
+                    self.identity_client.list_groups, compartment_id=self.tenancy_id))
+            return self._groups
+
+    def group(self, name):
+        return self.groups.get(name)
+
+    def add_group(self, group):
+        with self._lock:
+            self.groups[group.name] = group
+
+    # ---- policies ----
+    def policies(self, compartment_id=None):
+        compartment_id = compartment_id or self.tenancy_id
+        with self._lock:
+            if compartment_id not in self._policies:
+                self._policies[compartment_id] = self._index(self._list(
+                    self.identity_client.list_policies, compartment_id=compartment_id))
+            return self._policies[compartment_id]
+
+    def policy(self, name, compartment_id=None):
+        return self.policies(compartment_id).get(name)
+
+    def add_policy(self, policy):
+        with self._lock:
+            self.policies(policy.compartment_id)[policy.name] = policy
+
+    def remove_policy(self, name, compartment_id=None):
+        with self._lock:
+            self.policies(compartment_id).pop(name, None)
+
+    # ---- group memberships ----
+    def group_memberships(self, group_id):
+        """user_id -> membership for every member of a group."""
+        with self._lock:
+            if group_id not in self._group_members:
+                memberships = self._list(
+                    self.identity_client.list_user_group_memberships,
+                    compartment_id=self.tenancy_id,
+                    group_id=group_id
+                )
+                self._group_members[group_id] = {m.user_id: m for m in memberships}
+            return self._group_members[group_id]
+
+    def is_member(self, user_id, group_id):
+        return user_id in self.group_memberships(group_id)
+
+    def add_membership(self, membership):
+        with self._lock:
+            self.group_memberships(membership.group_id)[membership.user_id] = membership
+
+    def remove_membership(self, user_id, group_id):
+        with self._lock:
+            self.group_memberships(group_id).pop(user_id, None)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Event Store
+-----------
+"Was there an event in London on August 15th?" is the concierge's most
+common research question, and every time it went through an advanced
+Tavily search. This module answers it from a local SQLite store keyed on
+(city, date):
+
+  events:   one row per event (city, date, name, url, snippet, source)
+  lookups:  one row per (city, date) that has been filled, with when and
+            from where, so a date known to have no events is a hit too
+
+The store is filled from web_search results (concierge_agent records the
+event searches it runs), from imported event feeds, and by lookup() itself
+on a miss. Entries go stale after a TTL: a long one for past dates (what
+happened does not change), a short one for today and upcoming dates.
+
+Dates are ISO (2024-08-15) or as written in reviews ("15 August 2024",
+"August 15th"); a date without a year is its most recent occurrence.
+
+Usage:
+  python event_store.py import events.jsonl     # {"city", "date", "name", "url"?, "description"?}
+  python event_store.py query London 2024-08-15 --end 2024-08-17
+  python event_store.py stats
+
+  store = default_store()
+  result = store.lookup("London", "2024-08-15", search=web_search)
+"""
+
+import argparse
+import functools
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from inventory import parse_duration
+from text_embedding import normalize
+from tool_prefetch import MONTHS, extract_dates, extract_locations
+
+EVENTS_FILE = "event_store.db"
+PAST_TTL = 30 * 86400.0
+UPCOMING_TTL = 12 * 3600.0
+# Dates older than this many days use PAST_TTL
+SETTLED_AFTER_DAYS = 2
+MAX_RANGE_DAYS = 31
+# Missing dates of one lookup that may fall back to web searches
+MAX_SEARCHES = 7
+SEARCH_WORKERS = 4
+MAX_EVENTS_PER_DATE = 10
+SNIPPET_CHARS = 400
+
+SOURCE_WEB = "web_search"
+SOURCE_FEED = "feed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    city        TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    url         TEXT NOT NULL DEFAULT '',
+    snippet     TEXT NOT NULL DEFAULT '',
+    source      TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    PRIMARY KEY (city, date, name, url)
+);
+CREATE TABLE IF NOT EXISTS lookups (
+    city        TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    PRIMARY KEY (city, date)
+);
+"""
+
+_EVENT_QUERY_RE = re.compile(r"\b(events?|festivals?|concerts?|matches|match|games?|parades?|marathon|what'?s on)\b",
+                             re.IGNORECASE)
+
+
+def city_key(city):
+    return " ".join(normalize(city).split())
+
+
+def parse_date(value, today=None):
+    """ISO or review-style date -> datetime.date (year-less dates: the latest one not after today)."""
+    today = today or date.today()
+    value = str(value).strip()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    found = extract_dates(value)
+    if not found:
+        raise ValueError(f"Unrecognised date: {value!r} (use YYYY-MM-DD)")
+    parts = found[0].split()
+    day, month = int(parts[0]), MONTHS.index(parts[1].lower()) + 1
+    if len(parts) == 3:
+        return date(int(parts[2]), month, day)
+    year = today.year if (month, day) <= (today.month, today.day) else today.year - 1
+    return date(year, month, day)
+
+
+def event_query(city, day):
+    return f"events in {city.title()} on {day.strftime('%d %B %Y').lstrip('0')}"
+
+
+def _web_events(response):
+    """Event rows from a Tavily search response: (name, url, snippet)."""
+    if not isinstance(response, dict):
+        return []
+    return [(r.get("title") or r.get("url") or "", r.get("url") or "", (r.get("content") or "")[:SNIPPET_CHARS])
+            for r in response.get("results", [])[:MAX_EVENTS_PER_DATE]]
+
+
+class EventStore:
+    """Thread-safe (city, date) event cache on SQLite."""
+
+    def __init__(self, path=EVENTS_FILE, past_ttl=PAST_TTL, upcoming_ttl=UPCOMING_TTL, clock=time.time):
+        self.path = path
+        self.past_ttl = past_ttl
+        self.upcoming_ttl = upcoming_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.searches = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._db:
+            return self._db.execute(sql, params).fetchall()
+
+    def ttl(self, day):
+        settled = day < date.today() - timedelta(days=SETTLED_AFTER_DAYS)
+        return self.past_ttl if settled else self.upcoming_ttl
+
+    # ---- filling ----
+    def record(self, city, day, events, source, fetched_at=None):
+        """Replace the events of (city, day); events are (name, url, snippet) tuples."""
+        key, iso = city_key(city), day.isoformat()
+        fetched_at = self.clock() if fetched_at is None else fetched_at
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM events WHERE city = ? AND date = ? AND source = ?", (key, iso, source))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO events (city, date, name, url, snippet, source, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key, iso, name, url or "", snippet or "", source, fetched_at) for name, url, snippet in events])
+            self._db.execute("INSERT OR REPLACE INTO lookups (city, date, source, fetched_at) VALUES (?, ?, ?, ?)",
+                             (key, iso, source, fetched_at))
+
+    def record_search(self, query, response):
+        """Keep the results of an event web search ("events in London on 15 August 2024")."""
+        if not _EVENT_QUERY_RE.search(query):
+            return False
+        cities, dates = extract_locations(query), extract_dates(query)
+        if len(cities) != 1 or len(dates) != 1 or not isinstance(response, dict):
+            return False
+        try:
+            day = parse_date(dates[0])
+        except ValueError:
+            # Matches the date pattern but does not exist ("30 February").
+            return False
+        self.record(cities[0], day, _web_events(response), SOURCE_WEB)
+        return True
+
+    def import_feed(self, path):
+        """Import JSON lines of {"city", "date", "name", "url"?, "description"?}; returns (events, dates)."""
+        grouped = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                day = parse_date(item["date"])
+                grouped.setdefault((item["city"], day), []).append(
+                    (item["name"], item.get("url", ""), (item.get("description") or "")[:SNIPPET_CHARS]))
+        for (city, day), events in grouped.items():
+            self.record(city, day, events, SOURCE_FEED)
+        return sum(map(len, grouped.values())), len(grouped)
+
+    # ---- queries ----
+    def _fresh_dates(self, key, start, end):
+        now = self.clock()
+        rows = self._execute("SELECT date, fetched_at FROM lookups WHERE city = ? AND date BETWEEN ? AND ?",
+                             (key, start.isoformat(), end.isoformat()))
+        return {row["date"] for row in rows if now - row["fetched_at"] <= self.ttl(date.fromisoformat(row["date"]))}
+
+    def events(self, city, start, end=None):
+        """Stored events of a city between two dates (inclusive), fresh or not."""
+        end = end or start
+        rows = self._execute("SELECT date, name, url, snippet, source FROM events "
+                             "WHERE city = ? AND date BETWEEN ? AND ? ORDER BY date, source, name",
+                             (city_key(city), start.isoformat(), end.isoformat()))
+        return [dict(row) for row in rows]
+
+    def lookup(self, city, start, end=None, search=None):
+        """Events in `city` from `start` to `end` (inclusive).
+
+        Dates missing from the store (or stale) are searched with
+        search(query) -> Tavily-style response, at most MAX_SEARCHES of them,
+        and recorded; without `search` they are reported as unknown.
+        """
+        try:
+            start = parse_date(start)
+            end = parse_date(end) if end else start
+        except ValueError as e:
+            return {"error": str(e)}
+        if end < start:
+            start, end = end, start
+        if (end - start).days >= MAX_RANGE_DAYS:
+            return {"error": f"Ranges are limited to {MAX_RANGE_DAYS} days"}
+        key = city_key(city)
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        fresh = self._fresh_dates(key, start, end)
+        missing = [day for day in days if day.isoformat() not in fresh]
+        with self._lock:
+            self.hits += len(days) - len(missing)
+            self.misses += len(missing)
+
+        searched = []
+        if search is not None and missing:
+            to_search = missing[:MAX_SEARCHES]
+            with ThreadPoolExecutor(max_workers=min(SEARCH_WORKERS, len(to_search))) as pool:
+                responses = list(pool.map(lambda day: search(event_query(city, day)), to_search))
+            for day, response in zip(to_search, responses):
+                # Errors come back as strings: leave the date unknown rather than cache "no events".
+                if isinstance(response, dict):
+                    self.record(city, day, _web_events(response), SOURCE_WEB)
+                    searched.append(day)
+            with self._lock:
+                self.searches += len(to_search)
+        unknown = [day.isoformat() for day in missing if day not in searched]
+        return {
+            "city": city,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "events": self.events(city, start, end),
+            "from_cache": len(days) - len(missing),
+            "searched": [day.isoformat() for day in searched],
+            "unknown_dates": unknown,
+        }
+
+    def stats(self):
+        (events,) = self._execute("SELECT COUNT(*) FROM events")[0]
+        (dates,) = self._execute("SELECT COUNT(*) FROM lookups")[0]
+        (cities,) = self._execute("SELECT COUNT(DISTINCT city) FROM lookups")[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"events": events, "dates": dates, "cities": cities, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0, "searches": self.searches}
+
+
+@functools.lru_cache(maxsize=None)
+def default_store(path=EVENTS_FILE):
+    return EventStore(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local (city, date) event store")
+    parser.add_argument("--db", default=EVENTS_FILE)
+    parser.add_argument("--ttl", help="TTL of past dates, e.g. 30d (upcoming dates use --upcoming-ttl)")
+    parser.add_argument("--upcoming-ttl", help="TTL of today and upcoming dates, e.g. 12h")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Import an events feed (JSON lines)")
+    imp.add_argument("file")
+    query = sub.add_parser("query", help="Stored events of a city and date range (no web search)")
+    query.add_argument("city")
+    query.add_argument("date")
+    query.add_argument("--end")
+    sub.add_parser("stats", help="Store size")
+    args = parser.parse_args()
+
+    store = EventStore(args.db, past_ttl=parse_duration(args.ttl) if args.ttl else PAST_TTL,
+                       upcoming_ttl=parse_duration(args.upcoming_ttl) if args.upcoming_ttl else UPCOMING_TTL)
+    if args.command == "import":
+        events, dates = store.import_feed(args.file)
+        print(f"✅ Imported {events} events for {dates} (city, date) pairs into {args.db}")
+    elif args.command == "query":
+        started = time.perf_counter()
+        result = store.lookup(args.city, args.date, args.end)
+        elapsed = (time.perf_counter() - started) * 1000
+        if "error" in result:
+            store.close()
+            parser.error(result["error"])
+        print(f"📅 {result['city']} {result['start']}..{result['end']}: {len(result['events'])} event(s), "
+              f"{result['from_cache']} date(s) cached, {len(result['unknown_dates'])} unknown ({elapsed:.1f} ms)")
+        for event in result["events"]:
+            print(f"   {event['date']}  {event['name'][:70]}  [{event['source']}] {event['url']}")
+    else:
+        for key, value in store.stats().items():
+            print(f"   {key:<10}{value}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
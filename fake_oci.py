@@ -0,0 +1,649 @@
+"""
+Fake OCI Control Plane
+----------------------
+An in-process stand-in for the Object Storage, Generative AI Agent and
+Identity calls made by setup.py, cleanup.py and the env_setup scripts, so
+their orchestration can be run, timed and regression-tested without a
+tenancy.
+
+The fake returns real SDK models and oci.response.Response objects and
+raises real oci.exceptions.ServiceError, so the scripts run unchanged:
+
+  - lifecycle transitions: CREATING -> ACTIVE, DELETING -> DELETED, data
+    ingestion IN_PROGRESS -> SUCCEEDED (with file statistics),
+    deletes tracked through work requests
+  - pagination: opc-next-page for list calls, next_start_with for objects
+  - 409s where the service returns them: duplicate names, non-empty
+    buckets and compartments, agents that still have endpoints or tools,
+    mutating a resource that is not ACTIVE yet
+  - 429s from per-client token buckets (read and write limits)
+  - latency: every call sleeps a jittered round trip, every transition
+    takes a per-kind duration; `scale` compresses all of it (and the rate
+    limits) so long provisioning runs can be simulated in seconds
+
+Usage:
+  plane = FakeControlPlane(latency=Latency(scale=0.01))
+  clients = FakeClientFactory(plane)      # drop-in for oci_clients.ClientFactory
+  os_client = clients.object_storage()
+"""
+
+import itertools
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+import oci
+
+from oci_clients import RETRY_STRATEGY, CallStats
+
+PAGE_SIZE = 100
+
+# Seconds (before scaling) for (kind, action) to complete.
+TRANSITIONS = {
+    ("knowledge_base", "create"): 60.0,
+    ("knowledge_base", "delete"): 60.0,
+    ("data_source", "create"): 15.0,
+    ("data_source", "delete"): 15.0,
+    ("data_ingestion_job", "create"): 30.0,
+    ("agent", "create"): 30.0,
+    ("agent", "delete"): 30.0,
+    ("tool", "create"): 10.0,
+    ("tool", "delete"): 10.0,
+    ("agent_endpoint", "create"): 300.0,
+    ("agent_endpoint", "delete"): 120.0,
+    ("compartment", "delete"): 120.0,
+}
+INGESTION_SECONDS_PER_FILE = 0.5
+
+# Requests per second (before scaling) per client, split by reads and writes.
+RATE_LIMITS = {
+    "ObjectStorage": {"read": 1000.0, "write": 1000.0},
+    "GenerativeAiAgent": {"read": 100.0, "write": 20.0},
+    "Identity": {"read": 50.0, "write": 20.0},
+}
+MAX_POLICY_STATEMENTS = 50
+WRITE_PREFIXES = ("create_", "delete_", "update_", "put_", "add_", "remove_", "abort_")
+
+GENAI_MODELS = {
+    "knowledge_base": oci.generative_ai_agent.models.KnowledgeBase,
+    "data_source": oci.generative_ai_agent.models.DataSource,
+    "data_ingestion_job": oci.generative_ai_agent.models.DataIngestionJob,
+    "agent": oci.generative_ai_agent.models.Agent,
+    "tool": oci.generative_ai_agent.models.Tool,
+    "agent_endpoint": oci.generative_ai_agent.models.AgentEndpoint,
+}
+GENAI_COLLECTIONS = {
+    "knowledge_base": oci.generative_ai_agent.models.KnowledgeBaseCollection,
+    "data_source": oci.generative_ai_agent.models.DataSourceCollection,
+    "data_ingestion_job": oci.generative_ai_agent.models.DataIngestionJobCollection,
+    "agent": oci.generative_ai_agent.models.AgentCollection,
+    "tool": oci.generative_ai_agent.models.ToolCollection,
+    "agent_endpoint": oci.generative_ai_agent.models.AgentEndpointCollection,
+}
+IDENTITY_MODELS = {
+    "compartment": oci.identity.models.Compartment,
+    "user": oci.identity.models.User,
+    "group": oci.identity.models.Group,
+    "policy": oci.identity.models.Policy,
+    "membership": oci.identity.models.UserGroupMembership,
+}
+
+
+def service_error(status, code, message):
+    return oci.exceptions.ServiceError(status, code, {}, message)
+
+
+def _details(model):
+    """Attributes set on an SDK *Details model, as a plain dict."""
+    return {name: getattr(model, name) for name in model.swagger_types if getattr(model, name) is not None}
+
+
+def _page(items, page, limit):
+    start = int(page or 0)
+    end = start + (limit or PAGE_SIZE)
+    return items[start:end], (str(end) if end < len(items) else None)
+
+
+class Latency:
+    """Per-call round trip and per-transition durations, compressed by `scale`."""
+
+    def __init__(self, call=0.05, jitter=0.5, transitions=None, scale=1.0):
+        self.call = call
+        self.jitter = jitter
+        self.transitions = dict(TRANSITIONS, **(transitions or {}))
+        self.scale = scale
+
+    def round_trip(self):
+        return self.call * self.scale * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def transition(self, kind, action):
+        return self.transitions.get((kind, action), 0.0) * self.scale
+
+
+class Resource:
+    """One fake resource and its lifecycle timeline."""
+
+    def __init__(self, kind, resource_id, fields, ready_at, pending_state="CREATING", ready_state="ACTIVE"):
+        self.kind = kind
+        self.id = resource_id
+        self.fields = fields
+        self.created = datetime.now(timezone.utc)
+        self.started_at = time.monotonic()
+        self.ready_at = ready_at
+        self.pending_state = pending_state
+        self.ready_state = ready_state
+        self.deleting_at = None
+        self.deleted_at = None
+
+    @property
+    def compartment_id(self):
+        return self.fields.get("compartment_id")
+
+    def state(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.deleted_at is not None:
+            return "DELETED" if now >= self.deleted_at else "DELETING"
+        return self.ready_state if now >= self.ready_at else self.pending_state
+
+    @property
+    def live(self):
+        return self.state() not in ("DELETING", "DELETED")
+
+    def progress(self, now=None):
+        now = time.monotonic() if now is None else now
+        span = self.ready_at - self.started_at
+        return 1.0 if span <= 0 else min(1.0, max(0.0, (now - self.started_at) / span))
+
+
+class TokenBucket:
+    """Non-blocking token bucket: take() is False when the caller should get a 429."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = max(1.0, rate)
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class FakeControlPlane:
+    """Shared state behind all fake clients."""
+
+    def __init__(self, tenancy_id="ocid1.tenancy.oc1..fake", namespace="fakenamespace",
+                 latency=None, rate_limits=None, page_size=PAGE_SIZE):
+        self.tenancy_id = tenancy_id
+        self.namespace = namespace
+        self.latency = latency or Latency()
+        self.rate_limits = rate_limits if rate_limits is not None else RATE_LIMITS
+        self.page_size = page_size
+        self.resources = {}
+        self.buckets = {}
+        self.work_requests = {}
+        self.stats = CallStats()
+        self.throttled = 0
+        self.lock = threading.RLock()
+        self._ids = itertools.count(1)
+
+    def new_id(self, kind):
+        return f"ocid1.{kind.replace('_', '')}.oc1..fake{next(self._ids):08d}"
+
+    def ready_in(self, kind, action):
+        return time.monotonic() + self.latency.transition(kind, action)
+
+    def add(self, resource):
+        with self.lock:
+            self.resources[resource.id] = resource
+        return resource
+
+    def get(self, kind, resource_id):
+        resource = self.resources.get(resource_id)
+        if resource is None or resource.kind != kind:
+            raise service_error(404, "NotAuthorizedOrNotFound", f"{kind} {resource_id} not found")
+        return resource
+
+    def live(self, kind, **match):
+        return [r for r in list(self.resources.values())
+                if r.kind == kind and r.live and all(r.fields.get(k) == v for k, v in match.items())]
+
+    def start_delete(self, resource, seconds):
+        resource.deleting_at = time.monotonic()
+        resource.deleted_at = resource.deleting_at + seconds
+        work_request_id = self.new_id("workrequest")
+        self.work_requests[work_request_id] = resource
+        return work_request_id
+
+    def work_request(self, work_request_id, model):
+        resource = self.work_requests.get(work_request_id)
+        if resource is None:
+            raise service_error(404, "NotAuthorizedOrNotFound", f"work request {work_request_id} not found")
+        now = time.monotonic()
+        span = resource.deleted_at - resource.deleting_at
+        percent = 100.0 if span <= 0 else min(100.0, 100.0 * (now - resource.deleting_at) / span)
+        return model(id=work_request_id, operation_type="DELETE", compartment_id=resource.compartment_id,
+                     status="SUCCEEDED" if now >= resource.deleted_at else "IN_PROGRESS",
+                     percent_complete=percent)
+
+    def object_storage(self, retries=True):
+        return FakeObjectStorageClient(self, retries)
+
+    def genai_agent(self, retries=True):
+        return FakeGenerativeAiAgentClient(self, retries)
+
+    def identity(self, retries=True):
+        return FakeIdentityClient(self, retries)
+
+
+class _FakeClient:
+    """Routes public calls to _op_<name> with latency, rate limiting and stats."""
+
+    service = None
+
+    def __init__(self, plane, retries=True):
+        self.plane = plane
+        self.retries = retries
+        limits = plane.rate_limits.get(self.service, {})
+        self._buckets = {family: TokenBucket(rate / plane.latency.scale) for family, rate in limits.items()}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        op = getattr(type(self), f"_op_{name}", None)
+        if op is None:
+            raise AttributeError(name)
+        family = "write" if name.startswith(WRITE_PREFIXES) else "read"
+
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                time.sleep(self.plane.latency.round_trip())
+                bucket = self._buckets.get(family)
+                if bucket is not None:
+                    with self._lock:
+                        allowed = bucket.take()
+                    if not allowed:
+                        with self.plane.lock:
+                            self.plane.throttled += 1
+                        raise service_error(429, "TooManyRequests", "Too many requests for the tenancy")
+                with self.plane.lock:
+                    result = op(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self.plane.stats.record(f"{self.service}.{name}", time.perf_counter() - started, failed)
+
+        if self.retries:
+            return lambda *args, **kwargs: RETRY_STRATEGY.make_retrying_call(call, *args, **kwargs)
+        return call
+
+    @staticmethod
+    def _response(data, status=200, headers=None):
+        return oci.response.Response(status, headers or {}, data, None)
+
+    def _list_response(self, items, page, limit, wrap=None):
+        items, next_page = _page(items, page, limit or self.plane.page_size)
+        headers = {"opc-next-page": next_page} if next_page else {}
+        return self._response(wrap(items) if wrap else items, headers=headers)
+
+
+class FakeObjectStorageClient(_FakeClient):
+    service = "ObjectStorage"
+
+    def _bucket(self, bucket_name):
+        bucket = self.plane.buckets.get(bucket_name)
+        if bucket is None:
+            raise service_error(404, "BucketNotFound", f"Bucket {bucket_name} does not exist")
+        return bucket
+
+    def _op_get_namespace(self, **kwargs):
+        return self._response(self.plane.namespace)
+
+    def _op_get_bucket(self, namespace_name, bucket_name, **kwargs):
+        bucket = self._bucket(bucket_name)
+        return self._response(oci.object_storage.models.Bucket(
+            name=bucket_name, namespace=namespace_name, compartment_id=bucket["compartment_id"],
+            versioning="Disabled", approximate_count=len(bucket["objects"])))
+
+    def _op_create_bucket(self, namespace_name, create_bucket_details, **kwargs):
+        name = create_bucket_details.name
+        if name in self.plane.buckets:
+            raise service_error(409, "BucketAlreadyExists", f"Bucket {name} already exists")
+        self.plane.buckets[name] = {"compartment_id": create_bucket_details.compartment_id,
+                                    "objects": {}, "uploads": {}}
+        return self._op_get_bucket(namespace_name, name)
+
+    def _op_delete_bucket(self, namespace_name, bucket_name, **kwargs):
+        bucket = self._bucket(bucket_name)
+        if bucket["objects"] or bucket["uploads"]:
+            raise service_error(409, "BucketNotEmpty", f"Bucket {bucket_name} is not empty")
+        del self.plane.buckets[bucket_name]
+        return self._response(None, status=204)
+
+    def _op_put_object(self, namespace_name, bucket_name, object_name, put_object_body, **kwargs):
+        bucket = self._bucket(bucket_name)
+        body = put_object_body.read() if hasattr(put_object_body, "read") else put_object_body
+        bucket["objects"][object_name] = {"size": len(body), "metadata": kwargs.get("opc_meta") or {}}
+        return self._response(None)
+
+    def _op_list_objects(self, namespace_name, bucket_name, prefix=None, start=None, limit=None, **kwargs):
+        names = sorted(n for n in self._bucket(bucket_name)["objects"] if not prefix or n.startswith(prefix))
+        if start:
+            names = [n for n in names if n >= start]
+        limit = limit or 1000
+        page, rest = names[:limit], names[limit:]
+        return self._response(oci.object_storage.models.ListObjects(
+            objects=[oci.object_storage.models.ObjectSummary(name=n) for n in page],
+            next_start_with=rest[0] if rest else None))
+
+    def _op_list_object_versions(self, namespace_name, bucket_name, page=None, limit=None, **kwargs):
+        names = sorted(self._bucket(bucket_name)["objects"])
+        versions = [oci.object_storage.models.ObjectVersionSummary(name=n, version_id="1") for n in names]
+        return self._list_response(
+            versions, page, limit,
+            wrap=lambda items: oci.object_storage.models.ObjectVersionCollection(items=items))
+
+    def _op_delete_object(self, namespace_name, bucket_name, object_name, **kwargs):
+        objects = self._bucket(bucket_name)["objects"]
+        if object_name not in objects:
+            raise service_error(404, "ObjectNotFound", f"Object {object_name} not found")
+        del objects[object_name]
+        return self._response(None, status=204)
+
+    def _op_list_multipart_uploads(self, namespace_name, bucket_name, page=None, limit=None, **kwargs):
+        uploads = [oci.object_storage.models.MultipartUpload(object=name, upload_id=upload_id)
+                   for upload_id, name in sorted(self._bucket(bucket_name)["uploads"].items())]
+        return self._list_response(uploads, page, limit)
+
+    def _op_abort_multipart_upload(self, namespace_name, bucket_name, object_name, upload_id, **kwargs):
+        uploads = self._bucket(bucket_name)["uploads"]
+        if uploads.pop(upload_id, None) is None:
+            raise service_error(404, "NoSuchUpload", f"Upload {upload_id} not found")
+        return self._response(None, status=204)
+
+
+class FakeGenerativeAiAgentClient(_FakeClient):
+    service = "GenerativeAiAgent"
+
+    def _model(self, resource):
+        fields = dict(resource.fields)
+        if resource.kind == "data_ingestion_job":
+            files = fields.pop("files", 0)
+            ingested = int(files * resource.progress())
+            fields["data_ingestion_job_statistics"] = oci.generative_ai_agent.models.DataIngestionJobStatistics(
+                number_of_ingested_files=ingested, number_of_failed_files=0)
+        return GENAI_MODELS[resource.kind](id=resource.id, lifecycle_state=resource.state(),
+                                           time_created=resource.created, **fields)
+
+    def _require_active(self, kind, resource_id):
+        resource = self.plane.get(kind, resource_id)
+        if resource.state() != "ACTIVE":
+            raise service_error(409, "IncorrectState", f"{kind} {resource_id} is {resource.state()}")
+        return resource
+
+    def _create(self, kind, details, **extra):
+        fields = dict(_details(details), **extra)
+        resource = Resource(kind, self.plane.new_id(kind), fields, self.plane.ready_in(kind, "create"))
+        return self._response(self._model(self.plane.add(resource)))
+
+    def _get(self, kind, resource_id):
+        return self._response(self._model(self.plane.get(kind, resource_id)))
+
+    def _list(self, kind, compartment_id, page=None, limit=None, **filters):
+        match = {k: v for k, v in filters.items() if k in ("agent_id", "knowledge_base_id", "data_source_id") and v}
+        items = [self._model(r) for r in list(self.plane.resources.values())
+                 if r.kind == kind and r.compartment_id == compartment_id and r.state() != "DELETED"
+                 and all(r.fields.get(k) == v for k, v in match.items())]
+        return self._list_response(items, page, limit, wrap=lambda page_items: GENAI_COLLECTIONS[kind](items=page_items))
+
+    def _delete(self, kind, resource_id):
+        resource = self.plane.get(kind, resource_id)
+        if resource.state() == "DELETED":
+            raise service_error(404, "NotAuthorizedOrNotFound", f"{kind} {resource_id} not found")
+        if resource.state() != "ACTIVE":
+            raise service_error(409, "IncorrectState", f"{kind} {resource_id} is {resource.state()}")
+        work_request_id = self.plane.start_delete(resource, self.plane.latency.transition(kind, "delete"))
+        return self._response(None, status=202, headers={"opc-work-request-id": work_request_id})
+
+    # ---- knowledge bases ----
+    def _op_create_knowledge_base(self, details, **kwargs):
+        return self._create("knowledge_base", details)
+
+    def _op_get_knowledge_base(self, knowledge_base_id, **kwargs):
+        return self._get("knowledge_base", knowledge_base_id)
+
+    def _op_list_knowledge_bases(self, compartment_id=None, **kwargs):
+        return self._list("knowledge_base", compartment_id, **kwargs)
+
+    def _op_delete_knowledge_base(self, knowledge_base_id, **kwargs):
+        for tool in self.plane.live("tool"):
+            configs = (tool.fields.get("tool_config") or {}).get("knowledgeBaseConfigs", [])
+            if any(c.get("knowledgeBaseId") == knowledge_base_id for c in configs):
+                raise service_error(409, "Conflict", f"Knowledge base is used by tool {tool.id}")
+        response = self._delete("knowledge_base", knowledge_base_id)
+        # Data sources and their ingestion jobs go with the knowledge base.
+        kb = self.plane.resources[knowledge_base_id]
+        for kind in ("data_source", "data_ingestion_job"):
+            for child in self.plane.live(kind, knowledge_base_id=knowledge_base_id):
+                self.plane.start_delete(child, kb.deleted_at - kb.deleting_at)
+        return response
+
+    # ---- data sources and ingestion ----
+    def _op_create_data_source(self, details, **kwargs):
+        self._require_active("knowledge_base", details.knowledge_base_id)
+        return self._create("data_source", details)
+
+    def _op_get_data_source(self, data_source_id, **kwargs):
+        return self._get("data_source", data_source_id)
+
+    def _op_list_data_sources(self, compartment_id=None, **kwargs):
+        return self._list("data_source", compartment_id, **kwargs)
+
+    def _op_delete_data_source(self, data_source_id, **kwargs):
+        return self._delete("data_source", data_source_id)
+
+    def _op_create_data_ingestion_job(self, details, **kwargs):
+        data_source = self._require_active("data_source", details.data_source_id)
+        files = 0
+        for prefix in data_source.fields["data_source_config"].object_storage_prefixes:
+            bucket = self.plane.buckets.get(prefix.bucket_name, {"objects": {}})
+            files += sum(1 for name in bucket["objects"] if name.startswith(prefix.prefix or ""))
+        seconds = (self.plane.latency.transition("data_ingestion_job", "create")
+                   + files * INGESTION_SECONDS_PER_FILE * self.plane.latency.scale)
+        fields = dict(_details(details), knowledge_base_id=data_source.fields["knowledge_base_id"], files=files)
+        resource = Resource("data_ingestion_job", self.plane.new_id("dataingestionjob"), fields,
+                            time.monotonic() + seconds, pending_state="IN_PROGRESS", ready_state="SUCCEEDED")
+        return self._response(self._model(self.plane.add(resource)))
+
+    def _op_get_data_ingestion_job(self, data_ingestion_job_id, **kwargs):
+        return self._get("data_ingestion_job", data_ingestion_job_id)
+
+    # ---- agents, tools and endpoints ----
+    def _op_create_agent(self, details, **kwargs):
+        return self._create("agent", details)
+
+    def _op_get_agent(self, agent_id, **kwargs):
+        return self._get("agent", agent_id)
+
+    def _op_list_agents(self, compartment_id=None, **kwargs):
+        return self._list("agent", compartment_id, **kwargs)
+
+    def _op_delete_agent(self, agent_id, **kwargs):
+        if self.plane.live("agent_endpoint", agent_id=agent_id) or self.plane.live("tool", agent_id=agent_id):
+            raise service_error(409, "Conflict", f"Agent {agent_id} still has endpoints or tools")
+        return self._delete("agent", agent_id)
+
+    def _op_create_tool(self, details, **kwargs):
+        self._require_active("agent", details.agent_id)
+        return self._create("tool", details)
+
+    def _op_get_tool(self, tool_id, **kwargs):
+        return self._get("tool", tool_id)
+
+    def _op_list_tools(self, compartment_id=None, **kwargs):
+        return self._list("tool", compartment_id, **kwargs)
+
+    def _op_delete_tool(self, tool_id, **kwargs):
+        return self._delete("tool", tool_id)
+
+    def _op_create_agent_endpoint(self, details, **kwargs):
+        self._require_active("agent", details.agent_id)
+        return self._create("agent_endpoint", details)
+
+    def _op_get_agent_endpoint(self, agent_endpoint_id, **kwargs):
+        return self._get("agent_endpoint", agent_endpoint_id)
+
+    def _op_list_agent_endpoints(self, compartment_id=None, **kwargs):
+        return self._list("agent_endpoint", compartment_id, **kwargs)
+
+    def _op_delete_agent_endpoint(self, agent_endpoint_id, **kwargs):
+        return self._delete("agent_endpoint", agent_endpoint_id)
+
+    def _op_get_work_request(self, work_request_id, **kwargs):
+        return self._response(self.plane.work_request(work_request_id, oci.generative_ai_agent.models.WorkRequest))
+
+
+class FakeIdentityClient(_FakeClient):
+    service = "Identity"
+
+    def _model(self, resource):
+        return IDENTITY_MODELS[resource.kind](id=resource.id, lifecycle_state=resource.state(),
+                                              time_created=resource.created, **resource.fields)
+
+    def _create(self, kind, fields, unique=("name",)):
+        key = {k: fields[k] for k in unique}
+        if kind == "compartment":
+            key["compartment_id"] = fields["compartment_id"]
+        if self.plane.live(kind, **key):
+            raise service_error(409, "EntityAlreadyExists", f"{kind} {key} already exists")
+        resource = Resource(kind, self.plane.new_id(kind), fields, time.monotonic())
+        return self._response(self._model(self.plane.add(resource)))
+
+    def _list(self, kind, page=None, limit=None, lifecycle_state=None, **match):
+        items = [self._model(r) for r in list(self.plane.resources.values())
+                 if r.kind == kind and r.state() != "DELETED"
+                 and (lifecycle_state is None or r.state() == lifecycle_state)
+                 and all(r.fields.get(k) == v for k, v in match.items())]
+        return self._list_response(items, page, limit)
+
+    def _delete(self, kind, resource_id, seconds=0.0):
+        resource = self.plane.get(kind, resource_id)
+        if not resource.live:
+            raise service_error(404, "NotAuthorizedOrNotFound", f"{kind} {resource_id} not found")
+        work_request_id = self.plane.start_delete(resource, seconds)
+        return self._response(None, status=202 if seconds else 204,
+                              headers={"opc-work-request-id": work_request_id} if seconds else {})
+
+    # ---- compartments ----
+    def _op_create_compartment(self, details, **kwargs):
+        return self._create("compartment", _details(details))
+
+    def _op_get_compartment(self, compartment_id, **kwargs):
+        return self._response(self._model(self.plane.get("compartment", compartment_id)))
+
+    def _op_list_compartments(self, compartment_id, compartment_id_in_subtree=False, **kwargs):
+        if compartment_id_in_subtree:
+            return self._list("compartment", **kwargs)
+        return self._list("compartment", compartment_id=compartment_id, **kwargs)
+
+    def _op_delete_compartment(self, compartment_id, **kwargs):
+        occupied = any(r.live and r.compartment_id == compartment_id and r.kind in GENAI_MODELS
+                       for r in self.plane.resources.values())
+        occupied = occupied or any(b["compartment_id"] == compartment_id for b in self.plane.buckets.values())
+        if occupied:
+            raise service_error(409, "CompartmentNotEmpty", f"Compartment {compartment_id} is not empty")
+        return self._delete("compartment", compartment_id, self.plane.latency.transition("compartment", "delete"))
+
+    # ---- users and groups ----
+    def _op_create_user(self, details, **kwargs):
+        return self._create("user", _details(details))
+
+    def _op_get_user(self, user_id, **kwargs):
+        return self._response(self._model(self.plane.get("user", user_id)))
+
+    def _op_list_users(self, compartment_id, **kwargs):
+        return self._list("user", **kwargs)
+
+    def _op_delete_user(self, user_id, **kwargs):
+        return self._delete("user", user_id)
+
+    def _op_create_group(self, details, **kwargs):
+        return self._create("group", _details(details))
+
+    def _op_list_groups(self, compartment_id, **kwargs):
+        return self._list("group", **kwargs)
+
+    def _op_delete_group(self, group_id, **kwargs):
+        if self.plane.live("membership", group_id=group_id):
+            raise service_error(409, "Conflict", f"Group {group_id} still has members")
+        return self._delete("group", group_id)
+
+    def _op_add_user_to_group(self, details, **kwargs):
+        fields = dict(_details(details), compartment_id=self.plane.tenancy_id)
+        return self._create("membership", fields, unique=("user_id", "group_id"))
+
+    def _op_list_user_group_memberships(self, compartment_id, group_id=None, user_id=None, **kwargs):
+        match = {k: v for k, v in (("group_id", group_id), ("user_id", user_id)) if v}
+        return self._list("membership", **match, **kwargs)
+
+    def _op_remove_user_from_group(self, user_group_membership_id, **kwargs):
+        return self._delete("membership", user_group_membership_id)
+
+    # ---- policies ----
+    def _check_statements(self, statements):
+        if len(statements) > MAX_POLICY_STATEMENTS:
+            raise service_error(400, "LimitExceeded",
+                                f"Policy has {len(statements)} statements (max {MAX_POLICY_STATEMENTS})")
+
+    def _op_create_policy(self, details, **kwargs):
+        self._check_statements(details.statements)
+        return self._create("policy", _details(details))
+
+    def _op_get_policy(self, policy_id, **kwargs):
+        return self._response(self._model(self.plane.get("policy", policy_id)))
+
+    def _op_list_policies(self, compartment_id, **kwargs):
+        return self._list("policy", compartment_id=compartment_id, **kwargs)
+
+    def _op_update_policy(self, policy_id, details, **kwargs):
+        self._check_statements(details.statements)
+        policy = self.plane.get("policy", policy_id)
+        policy.fields["statements"] = list(details.statements)
+        return self._response(self._model(policy))
+
+    def _op_delete_policy(self, policy_id, **kwargs):
+        return self._delete("policy", policy_id)
+
+    def _op_get_work_request(self, work_request_id, **kwargs):
+        return self._response(self.plane.work_request(work_request_id, oci.identity.models.WorkRequest))
+
+
+class FakeClientFactory:
+    """Drop-in for oci_clients.ClientFactory backed by a FakeControlPlane."""
+
+    def __init__(self, plane):
+        self.plane = plane
+        self.config = {"tenancy": plane.tenancy_id, "region": "us-chicago-1"}
+        self.stats = plane.stats
+
+    @property
+    def tenancy(self):
+        return self.config["tenancy"]
+
+    def object_storage(self, retries=True):
+        return self.plane.object_storage(retries)
+
+    def genai_agent(self, retries=True):
+        return self.plane.genai_agent(retries)
+
+    def identity(self, retries=True):
+        return self.plane.identity(retries)
+
+    def print_summary(self, title="API calls"):
+        self.stats.print_summary(title)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+API Key Fingerprints
+--------------------
+OCI fingerprints an API signing key as the colon-separated MD5 of the
+DER-encoded public key. setup_user_api_key.py carries a pure-Python MD5 so
+it runs anywhere; this module uses the interpreter's native MD5 when it is
+available (it is not on some FIPS builds) and falls back to the pure-Python
+one otherwise.
+
+  - fingerprint_pem / fingerprint_der for single keys
+  - fingerprint_files to fingerprint many PEM files (public or private)
+  - --check compares both digests on the RFC 1321 test suite and real keys
+    (test_fingerprint.py runs the same checks under pytest)
+  - --benchmark measures keys/s for each backend
+
+Usage:
+  python fingerprint.py ~/.oci/*.pem
+  python fingerprint.py --check
+  python fingerprint.py --benchmark 2000
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.hazmat.primitives import serialization
+
+import setup_user_api_key
+
+PUBLIC_KEY_HEADER = b"-----BEGIN PUBLIC KEY-----"
+
+# (message, digest) from RFC 1321, appendix A.5.
+RFC1321_VECTORS = [
+    (b"", "d41d8cd98f00b204e9800998ecf8427e"),
+    (b"a", "0cc175b9c0f1b6a831c399e269772661"),
+    (b"abc", "900150983cd24fb0d6963f7d28e17f72"),
+    (b"message digest", "f96b697d7cb7938d525a2f31aaf161d0"),
+    (b"abcdefghijklmnopqrstuvwxyz", "c3fcd3d76192e4007dfb496cca67e13b"),
+    (b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789",
+     "d174ab98d277d9f5a5611c2c9f419d9f"),
+    (b"1234567890" * 8, "57edf4a22be3c955ac49da2e2107b67a"),
+]
+
+
+def _native_md5_hex(data):
+    return hashlib.md5(data, usedforsecurity=False).hexdigest()
+
+
+def _pure_md5_hex(data):
+    return setup_user_api_key.md5(data).hexdigest()
+
+
+def _native_available():
+    try:
+        _native_md5_hex(b"")
+        return True
+    except (ValueError, TypeError):
+        # FIPS builds refuse MD5; very old interpreters lack usedforsecurity.
+        return False
+
+
+BACKENDS = {"pure": _pure_md5_hex}
+if _native_available():
+    BACKENDS["native"] = _native_md5_hex
+DEFAULT_BACKEND = "native" if "native" in BACKENDS else "pure"
+
+
+def format_fingerprint(hex_digest):
+    return ":".join(a + b for a, b in zip(hex_digest[::2], hex_digest[1::2]))
+
+
+def public_der_from_pem(pem):
+    """DER bytes of the public key in a PEM file's contents.
+
+    Public keys are decoded directly; private keys (including the ones with
+    the trailing OCI_API_KEY label) go through cryptography.
+    """
+    if PUBLIC_KEY_HEADER in pem:
+        body = pem.split(PUBLIC_KEY_HEADER, 1)[1].split(b"-----END", 1)[0]
+        return base64.b64decode(b"".join(body.split()))
+    private_key = serialization.load_pem_private_key(pem, password=None)
+    return private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo)
+
+
+def fingerprint_der(der, backend=None):
+    return format_fingerprint(BACKENDS[backend or DEFAULT_BACKEND](der))
+
+
+def fingerprint_pem(pem, backend=None):
+    return fingerprint_der(public_der_from_pem(pem), backend)
+
+
+def fingerprint_public_key(public_key, backend=None):
+    """Fingerprint a cryptography public key object."""
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo)
+    return fingerprint_der(der, backend)
+
+
+def fingerprint_files(paths, backend=None, max_workers=8):
+    """Fingerprint many PEM files.
+
+    Returns path -> fingerprint, or path -> exception for files that could
+    not be read or parsed.
+    """
+
+    def one(path):
+        try:
+            with open(path, "rb") as f:
+                return fingerprint_pem(f.read(), backend)
+        except (OSError, ValueError, TypeError) as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(paths, pool.map(one, paths)))
+
+
+def _sample_keys(count):
+    return [setup_user_api_key.generate_key(2048).public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo) for _ in range(count)]
+
+
+def check(key_count=5):
+    """Compare every backend on RFC 1321 vectors and freshly generated keys.
+
+    Returns the number of mismatches.
+    """
+    failures = 0
+    for message, expected in RFC1321_VECTORS:
+        for name, digest in BACKENDS.items():
+            actual = digest(message)
+            if actual != expected:
+                failures += 1
+                print(f"❌ {name} MD5({message[:20]!r}) = {actual}, expected {expected}")
+    print(f"{'✅' if not failures else '❌'} RFC 1321: {len(RFC1321_VECTORS)} vector(s) × {len(BACKENDS)} backend(s)")
+
+    key_failures = 0
+    for der in _sample_keys(key_count):
+        results = {name: fingerprint_der(der, name) for name in BACKENDS}
+        if len(set(results.values())) != 1:
+            key_failures += 1
+            print(f"❌ backends disagree: {results}")
+    failures += key_failures
+    print(f"{'✅' if not key_failures else '❌'} {key_count} RSA-2048 key(s): backends agree")
+    if "native" not in BACKENDS:
+        print("⚠️  Native MD5 unavailable; only the pure-Python backend was checked")
+    return failures
+
+
+def benchmark(count):
+    """Print keys/s per backend over `count` fingerprints of real key sizes."""
+    keys = _sample_keys(min(count, 16))
+    print(f"⏱️  Fingerprinting {count} RSA-2048 key(s) per backend")
+    rates = {}
+    for name in BACKENDS:
+        started = time.perf_counter()
+        for i in range(count):
+            fingerprint_der(keys[i % len(keys)], name)
+        rates[name] = count / (time.perf_counter() - started)
+        print(f"   {name:<8}{rates[name]:12.0f} keys/s")
+    if "native" in rates:
+        print(f"   native is {rates['native'] / rates['pure']:.0f}x faster")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint OCI API keys")
+    parser.add_argument("files", nargs="*", help="PEM files (public or private keys)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--check", action="store_true", help="Run the conformance checks and exit")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark N fingerprints per backend and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(1 if check() else 0)
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    if not args.files:
+        parser.error("no PEM files given")
+
+    failed = 0
+    for path, result in fingerprint_files(args.files, args.backend).items():
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"❌ {path}: {result}", file=sys.stderr)
+        else:
+            print(f"{result}  {os.path.basename(path)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Per-Hotel Review Analytics
+--------------------------
+Aggregate questions ("what do guests complain about most at the Oasis?")
+would otherwise make the agent read and summarise many RAG chunks on every
+request. This job precomputes them into one compact columnar file:
+
+  per review and hotel (one row each, sorted by hotel)
+    hotel code, review index, received time (NaN if undated), language,
+    p_negative and p_severe (review_triage.py), complaint topic bitmask
+  per hotel
+    reviews, negative, severe and per-topic complaint counts
+
+Hotels come from the hotel entity index (hotel_index.py); topics from
+small multilingual keyword lists, counted in negative reviews only.
+
+The job is incremental: the file remembers how much of the corpus it has
+read (and a hash of it). Appended corpus reviews, or dated reviews from a
+JSON lines file (review_corpus.load_reviews), are scored and added, and
+only the hotels they mention have their summary recomputed. A corpus that
+changed in place is rebuilt from scratch. JSON lines files are remembered
+by name and content hash: importing one again is a no-op, and a file that
+changed since its last import replaces its earlier rows.
+
+Usage:
+  python hotel_analytics.py update                      # first run builds, later runs append
+  python hotel_analytics.py update --input incoming.jsonl
+  python hotel_analytics.py show "Oasis" --since 2024-01-01
+  python hotel_analytics.py top --limit 10
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from hotel_index import INDEX_FILE, HotelIndex, default_index, hotel_id
+from review_corpus import CORPUS_FILE, load_reviews, parse_received, parse_reviews
+from review_triage import NEGATIVE_THRESHOLD, POSITIVE_CUTOFF, SEVERITY_THRESHOLD, default_model, review_text
+from text_embedding import tokenize
+
+ANALYTICS_FILE = "hotel_analytics.npz"
+_SEPARATOR_RE = re.compile(r"\n\s*\n")
+LANGUAGES = ["unknown", "en", "vi", "fr", "de", "nl", "it", "es"]
+TOP_TOPICS = 5
+
+# Folded words and bigrams per complaint topic (bit i of the topic mask is TOPICS[i]).
+TOPIC_WORDS = {
+    "noise": {"noise", "noisy", "loud", "karaoke", "music", "traffic", "barking", "on ao", "bruit", "bruyant",
+              "laut", "larm", "lawaai", "rumoroso", "ruidoso"},
+    "construction": {"construction", "building site", "drilling", "renovation", "xay dung", "travaux", "baustelle",
+                     "bouw", "lavori", "obras"},
+    "cleanliness": {"dirty", "filthy", "stained", "stains", "smell", "smelly", "dust", "dusty", "unclean",
+                    "khong sach", "ban thiu", "sale", "pas propre", "schmutzig", "dreckig", "vies", "sporco", "sucio"},
+    "pests": {"cockroach", "cockroaches", "bed bugs", "bedbugs", "ants", "mosquitoes", "rats", "mice", "con gian",
+              "muoi", "cafards", "punaises", "kakerlaken", "wanzen", "kakkerlakken", "scarafaggi", "cucarachas"},
+    "staff": {"rude", "unfriendly", "unhelpful", "staff", "reception", "receptionist", "manager", "thai do",
+              "nhan vien", "personnel", "accueil", "personal", "rezeption", "personeel", "personale"},
+    "food": {"breakfast", "food", "restaurant", "meal", "dinner", "bua sang", "do an", "petit dejeuner", "repas",
+             "fruhstuck", "essen", "ontbijt", "colazione", "desayuno", "comida"},
+    "bathroom": {"shower", "hot water", "toilet", "bathroom", "leak", "leaking", "nuoc nong", "phong tam",
+                 "douche", "dusche", "badezimmer", "doccia", "ducha"},
+    "air_conditioning": {"air con", "aircon", "air conditioning", "air conditioner", "dieu hoa", "climatisation",
+                         "klimaanlage", "airco", "aria condizionata"},
+    "wifi": {"wifi", "internet", "wi fi"},
+    "value": {"expensive", "overpriced", "price", "money", "value", "not worth", "cher", "teuer", "duur", "caro"},
+    "maintenance": {"broken", "worn", "repair", "not working", "did not work", "cu ky", "casse", "kaputt",
+                    "kapot", "rotto", "roto"},
+    "location": {"location", "far", "distance", "taxi", "loin", "lage", "locatie", "posizione", "ubicacion"},
+}
+TOPICS = list(TOPIC_WORDS)
+
+
+def topic_mask(text):
+    """Bitmask of the complaint topics a text mentions."""
+    tokens = tokenize(text)
+    found = set(tokens).union(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    mask = 0
+    for bit, topic in enumerate(TOPICS):
+        if TOPIC_WORDS[topic] & found:
+            mask |= 1 << bit
+    return mask
+
+
+def _prefix_hash(content, length):
+    return hashlib.sha256(content[:length].encode("utf-8")).hexdigest()
+
+
+class Analytics:
+    """Columnar per-review rows plus per-hotel summaries."""
+
+    # source: position in meta["sources"] of the JSON lines file a row came from (-1: the corpus)
+    COLUMNS = {"hotel": np.int32, "review": np.int32, "source": np.int16, "received": np.float64,
+               "language": np.uint8, "p_negative": np.float16, "p_severe": np.float16, "topics": np.uint16}
+
+    def __init__(self, hotel_ids, hotel_names, columns, meta):
+        self.hotel_ids = list(hotel_ids)
+        self.hotel_names = list(hotel_names)
+        self.columns = columns
+        self.meta = meta
+        self._codes = {key: code for code, key in enumerate(self.hotel_ids)}
+        self._sort()
+        self.summary = self._summarise(range(len(self.hotel_ids)))
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], {name: np.zeros(0, dtype) for name, dtype in cls.COLUMNS.items()},
+                   {"corpus_chars": 0, "corpus_hash": _prefix_hash("", 0), "next_review": 0, "sources": []})
+
+    def _sort(self):
+        order = np.argsort(self.columns["hotel"], kind="stable")
+        self.columns = {name: values[order] for name, values in self.columns.items()}
+        # Rows of hotel code c are starts[c]:starts[c + 1].
+        self.starts = np.searchsorted(self.columns["hotel"], np.arange(len(self.hotel_ids) + 1))
+
+    def _summarise(self, codes, summary=None):
+        summary = summary or {"reviews": np.zeros(0, np.int32), "negative": np.zeros(0, np.int32),
+                              "severe": np.zeros(0, np.int32), "topics": np.zeros((0, len(TOPICS)), np.int32)}
+        size = len(self.hotel_ids)
+        for name, values in summary.items():
+            if len(values) < size:
+                grown = np.zeros((size,) + values.shape[1:], values.dtype)
+                grown[:len(values)] = values
+                summary[name] = grown
+        bits = 1 << np.arange(len(TOPICS), dtype=np.uint16)
+        for code in codes:
+            rows = slice(self.starts[code], self.starts[code + 1])
+            negative = self.columns["p_negative"][rows] >= NEGATIVE_THRESHOLD
+            summary["reviews"][code] = rows.stop - rows.start
+            summary["negative"][code] = negative.sum()
+            summary["severe"][code] = (self.columns["p_severe"][rows] >= SEVERITY_THRESHOLD).sum()
+            summary["topics"][code] = ((self.columns["topics"][rows][negative, None] & bits) != 0).sum(axis=0)
+        return summary
+
+    def code(self, key, name):
+        if key not in self._codes:
+            self._codes[key] = len(self.hotel_ids)
+            self.hotel_ids.append(key)
+            self.hotel_names.append(name)
+        return self._codes[key]
+
+    def append(self, rows):
+        """Add rows (dicts of column values); recompute only the hotels they touch. Returns those hotels."""
+        if not rows:
+            return set()
+        for name, dtype in self.COLUMNS.items():
+            added = np.array([row[name] for row in rows], dtype=dtype)
+            self.columns[name] = np.concatenate([self.columns[name], added])
+        self._sort()
+        touched = {row["hotel"] for row in rows}
+        self.summary = self._summarise(sorted(touched), self.summary)
+        return touched
+
+    def remove(self, drop):
+        """Drop rows (boolean mask); recompute only the hotels they touch. Returns those hotels."""
+        if not drop.any():
+            return set()
+        touched = set(self.columns["hotel"][drop].tolist())
+        self.columns = {name: values[~drop] for name, values in self.columns.items()}
+        self._sort()
+        self.summary = self._summarise(sorted(touched), self.summary)
+        return touched
+
+    def save(self, path):
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(tmp, hotel_ids=np.array(self.hotel_ids, dtype=str),
+                            hotel_names=np.array(self.hotel_names, dtype=str), meta=json.dumps(self.meta),
+                            **{f"col_{name}": values for name, values in self.columns.items()},
+                            **{f"sum_{name}": values for name, values in self.summary.items()})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        analytics = cls.__new__(cls)
+        analytics.hotel_ids = [str(v) for v in data["hotel_ids"]]
+        analytics.hotel_names = [str(v) for v in data["hotel_names"]]
+        analytics.meta = json.loads(str(data["meta"]))
+        analytics.columns = {name: data[f"col_{name}"] for name in cls.COLUMNS}
+        analytics.summary = {name[4:]: data[name] for name in data.files if name.startswith("sum_")}
+        analytics._codes = {key: code for code, key in enumerate(analytics.hotel_ids)}
+        analytics.starts = np.searchsorted(analytics.columns["hotel"], np.arange(len(analytics.hotel_ids) + 1))
+        return analytics
+
+    # ---- queries ----
+    def resolve(self, name, index=None):
+        key = hotel_id(name)
+        if key in self._codes:
+            return self._codes[key], []
+        # Hotels only seen in JSON lines reviews are not in the entity index.
+        partial = [code for other, code in self._codes.items() if other.startswith(key + "-")]
+        if len(partial) == 1:
+            return partial[0], []
+        if index is not None:
+            hotel, candidates = index.resolve(name)
+            if hotel is not None and hotel.id in self._codes:
+                return self._codes[hotel.id], []
+            return None, candidates
+        return None, []
+
+    def report(self, code, since=None, until=None):
+        """Counts, sentiment distribution, top complaint topics and monthly trend of one hotel."""
+        rows = slice(self.starts[code], self.starts[code + 1])
+        received = self.columns["received"][rows]
+        dated = ~np.isnan(received)
+        keep = np.ones(len(received), dtype=bool)
+        if since is not None:
+            keep &= dated & (received >= since)
+        if until is not None:
+            keep &= dated & (received < until)
+        p_negative = self.columns["p_negative"][rows][keep].astype(np.float32)
+        p_severe = self.columns["p_severe"][rows][keep].astype(np.float32)
+        topics = self.columns["topics"][rows][keep]
+        negative = p_negative >= NEGATIVE_THRESHOLD
+        if since is None and until is None:
+            topic_counts = self.summary["topics"][code]
+        else:
+            bits = 1 << np.arange(len(TOPICS), dtype=np.uint16)
+            topic_counts = ((topics[negative, None] & bits) != 0).sum(axis=0)
+        ranked = [(TOPICS[i], int(topic_counts[i])) for i in np.argsort(-topic_counts, kind="stable") if topic_counts[i]]
+        languages = np.bincount(self.columns["language"][rows][keep], minlength=len(LANGUAGES))
+
+        months = {}
+        for stamp, is_negative in zip(received[keep], negative):
+            if not np.isnan(stamp):
+                month = datetime.fromtimestamp(stamp, timezone.utc).strftime("%Y-%m")
+                counts = months.setdefault(month, [0, 0])
+                counts[0] += 1
+                counts[1] += int(is_negative)
+        total = int(keep.sum())
+        return {
+            "hotel": {"id": self.hotel_ids[code], "name": self.hotel_names[code]},
+            "reviews": total,
+            "undated_reviews": int((keep & ~dated).sum()),
+            "sentiment": {
+                "positive": int((p_negative < POSITIVE_CUTOFF).sum()),
+                "mixed": int(((p_negative >= POSITIVE_CUTOFF) & ~negative).sum()),
+                "negative": int(negative.sum()),
+                "negative_share": round(float(negative.mean()), 3) if total else 0.0,
+            },
+            "severe_incidents": int((p_severe >= SEVERITY_THRESHOLD).sum()),
+            "top_complaints": [{"topic": t, "negative_reviews": n} for t, n in ranked[:TOP_TOPICS]],
+            "languages": {LANGUAGES[i]: int(n) for i, n in enumerate(languages) if n},
+            "trend": [{"month": m, "reviews": c[0], "negative": c[1]} for m, c in sorted(months.items())],
+        }
+
+    def top(self, limit=10, by="negative"):
+        """Hotels ranked by a summary column."""
+        order = np.argsort(-self.summary[by], kind="stable")[:limit]
+        return [{"hotel": self.hotel_names[c], "reviews": int(self.summary["reviews"][c]),
+                 "negative": int(self.summary["negative"][c]), "severe": int(self.summary["severe"][c])}
+                for c in order if self.summary["reviews"][c]]
+
+
+def _rows(analytics, reviews, hotel_ids, received, model, source=-1):
+    """Analytics rows of reviews: one per (review, hotel)."""
+    scores = model.score_many([review_text(r) for r in reviews])
+    rows = []
+    for position, review in enumerate(reviews):
+        text = review_text(review)
+        mask = topic_mask(text)
+        for key, name in hotel_ids[position]:
+            rows.append({"hotel": analytics.code(key, name), "review": review.index, "source": source,
+                         "received": np.nan if received[position] is None else received[position],
+                         "language": LANGUAGES.index(review.language) if review.language in LANGUAGES else 0,
+                         "p_negative": scores.p_negative[position], "p_severe": scores.p_severe[position],
+                         "topics": mask})
+    return rows
+
+
+def _appended_only(analytics, content):
+    """Whether the corpus only grew by new blocks since the last run."""
+    start = analytics.meta["corpus_chars"]
+    if analytics.meta["corpus_hash"] != _prefix_hash(content, start):
+        return False
+    # Text glued onto the last block (no blank line) changes that review.
+    return start == 0 or not content[start:].strip() or _SEPARATOR_RE.match(content, start) is not None
+
+
+def _external_rows(analytics):
+    """Rows of reviews added from JSON lines (not in the corpus), to carry over a rebuild."""
+    rows = []
+    for position in np.nonzero(analytics.columns["review"] < 0)[0]:
+        row = {name: values[position] for name, values in analytics.columns.items()}
+        row["hotel"] = (analytics.hotel_ids[row["hotel"]], analytics.hotel_names[row["hotel"]])
+        rows.append(row)
+    return rows
+
+
+def _import_jsonl(analytics, index, path, model):
+    """Add the reviews of a JSON lines file once.
+
+    The same content (under any name) is skipped; a file imported before
+    under the same name with different content replaces its earlier rows.
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    name = os.path.basename(path)
+    sources = analytics.meta["sources"]
+    if any(source["hash"] == digest for source in sources):
+        return set()
+    touched = set()
+    known = [position for position, source in enumerate(sources) if source["name"] == name]
+    if known:
+        position = known[0]
+        touched |= analytics.remove(analytics.columns["source"] == position)
+    else:
+        position = len(sources)
+        sources.append(None)
+    extra, hotels, received = load_reviews(path)
+    keys = []
+    for review, hotel in zip(extra, hotels):
+        review.index = -1
+        resolved, _ = index.resolve(hotel) if hotel else (None, [])
+        if resolved is not None:
+            keys.append([(resolved.id, resolved.name)])
+        else:
+            keys.append([(hotel_id(hotel), hotel.strip())] if hotel and hotel_id(hotel) else [])
+    touched |= analytics.append(_rows(analytics, extra, keys, received, model, position))
+    sources[position] = {"name": name, "hash": digest, "reviews": len(extra), "imported_at": time.time()}
+    return touched
+
+
+def update(path=ANALYTICS_FILE, corpus_file=CORPUS_FILE, index_file=INDEX_FILE, jsonl=None, model=None):
+    """Bring the analytics file up to date; returns (analytics, touched hotel ids, rebuilt)."""
+    model = model or default_model()
+    with open(corpus_file, "r", encoding="utf-8") as f:
+        content = f.read()
+    previous = Analytics.load(path) if os.path.exists(path) else None
+    rebuilt = previous is None or not _appended_only(previous, content)
+    analytics = Analytics.empty() if rebuilt else previous
+    index = HotelIndex.load(corpus_file, index_file)
+    hotels_of = {}
+    for hotel in index.hotels.values():
+        for review_index, _offset, _length in hotel.reviews:
+            hotels_of.setdefault(review_index, []).append((hotel.id, hotel.name))
+
+    start = analytics.meta["corpus_chars"]
+    reviews = []
+    for review in parse_reviews(content[start:]):
+        review.index += analytics.meta["next_review"]
+        review.offset += start
+        reviews.append(review)
+    touched = analytics.append(_rows(analytics, reviews, [hotels_of.get(r.index, []) for r in reviews],
+                                     [None] * len(reviews), model))
+    if reviews:
+        analytics.meta["corpus_chars"] = reviews[-1].offset + reviews[-1].length
+        analytics.meta["corpus_hash"] = _prefix_hash(content, analytics.meta["corpus_chars"])
+        analytics.meta["next_review"] = reviews[-1].index + 1
+
+    if rebuilt and previous is not None:
+        carried = _external_rows(previous)
+        for row in carried:
+            row["hotel"] = analytics.code(*row["hotel"])
+        touched |= analytics.append(carried)
+        analytics.meta["sources"] = previous.meta["sources"]
+    if jsonl:
+        touched |= _import_jsonl(analytics, index, jsonl, model)
+    analytics.meta["updated_at"] = time.time()
+    analytics.save(path)
+    return analytics, {analytics.hotel_ids[c] for c in touched}, rebuilt
+
+
+@functools.lru_cache(maxsize=4)
+def _load_cached(path, mtime):
+    return Analytics.load(path)
+
+
+def hotel_report(hotel="", since="", until="", path=ANALYTICS_FILE):
+    """Aggregate report of one hotel (or the hotels with most complaints) from the analytics file."""
+    if not os.path.exists(path):
+        return {"error": "Hotel analytics have not been computed yet (run hotel_analytics.py update)"}
+    analytics = _load_cached(path, os.path.getmtime(path))
+    if not hotel:
+        return {"hotels": analytics.top()}
+    index = default_index() if os.path.exists(INDEX_FILE) else None
+    code, candidates = analytics.resolve(hotel, index)
+    if code is None:
+        return {"error": f"No analytics for hotel '{hotel}'", "candidates": candidates}
+    try:
+        since, until = parse_received(since or None), parse_received(until or None)
+    except ValueError as e:
+        return {"error": f"{e} (dates are YYYY-MM-DD or ISO 8601 date-times)"}
+    return analytics.report(code, since, until)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomputed per-hotel review analytics")
+    parser.add_argument("--file", default=ANALYTICS_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    upd = sub.add_parser("update", help="Build the analytics, or add reviews appended since the last run")
+    upd.add_argument("--corpus", default=CORPUS_FILE)
+    upd.add_argument("--index", default=INDEX_FILE)
+    upd.add_argument("--input", help="JSON lines of extra reviews (review, hotel, received)")
+    upd.add_argument("--model", help="Saved triage model (trained on the corpus if omitted)")
+    show = sub.add_parser("show", help="Report of one hotel")
+    show.add_argument("hotel")
+    show.add_argument("--since", default="")
+    show.add_argument("--until", default="")
+    top = sub.add_parser("top", help="Hotels with the most negative reviews")
+    top.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "update":
+        started = time.perf_counter()
+        analytics, touched, rebuilt = update(args.file, args.corpus, args.index, args.input,
+                                            default_model(args.model))
+        print(f"✅ {'Built' if rebuilt else 'Updated'} {args.file} in {time.perf_counter() - started:.1f}s: "
+              f"{len(touched)} hotel(s) recomputed, {len(analytics.hotel_ids)} hotels, "
+              f"{len(analytics.columns['hotel'])} rows, {os.path.getsize(args.file) / 1024:.0f} KiB")
+        return
+    if args.command == "top":
+        for row in Analytics.load(args.file).top(args.limit):
+            print(f"   {row['negative']:>4} negative / {row['reviews']:>4}  {row['hotel']}")
+        return
+    started = time.perf_counter()
+    report = hotel_report(args.hotel, args.since, args.until, args.file)
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
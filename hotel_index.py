@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Hotel Entity Index
+------------------
+Reviews name their hotel inside free text ("Hana Riverside Quang Ngai
+hotel, located in..."). Finding every review of one hotel through the RAG
+tool means fuzzy semantic queries and paging through results. This module
+resolves the mentions once, offline:
+
+  - mentions come from review_corpus.extract_hotel_mentions
+  - names are accent-folded into canonical ids ("Lâm Tùng" and "Lam Tung"
+    -> "lam-tung"); a multi-word name that starts another one is merged
+    into it ("Hana Riverside" -> "hana-riverside-quang-ngai")
+  - one-word names the corpus mostly uses in lowercase ("Worst",
+    "Prachtig") are common words, not hotels, and are dropped (multi-word
+    names are kept: Vietnamese names are made of everyday syllables)
+  - each hotel maps to the offsets of its reviews in the corpus file
+
+The index is a JSON file next to the corpus, rebuilt when the corpus
+changes. reviews_for_hotel() resolves a name (exactly, then fuzzily) and
+returns a page of reviews sliced straight from the corpus.
+
+Usage:
+  python hotel_index.py build
+  python hotel_index.py list --limit 20
+  python hotel_index.py show "Ben Tre Riverside" --page 2
+"""
+
+import argparse
+import difflib
+import functools
+import json
+import os
+import re
+import time
+from collections import Counter
+
+from review_corpus import CORPUS_FILE, extract_hotel_mentions, iter_reviews, parse_reviews
+from text_embedding import normalize, tokenize
+
+INDEX_FILE = "hotel_index.json"
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+# Share of lowercase uses above which a single capitalised word is a common word
+COMMON_WORD_RATIO = 0.5
+FUZZY_CUTOFF = 0.75
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_POSSESSIVE_RE = re.compile(r"['’]s\b")
+
+
+def hotel_id(name):
+    """Canonical id of a hotel name: 'Bá Linh's' -> 'ba-linh'."""
+    return "-".join(tokenize(_POSSESSIVE_RE.sub("", name)))
+
+
+class Hotel:
+    def __init__(self, hotel_id, name, aliases=None, reviews=None):
+        self.id = hotel_id
+        self.name = name
+        self.aliases = aliases or []
+        # (review index, offset, length) in corpus order
+        self.reviews = reviews or []
+
+    def to_dict(self):
+        return {"name": self.name, "aliases": self.aliases, "reviews": self.reviews}
+
+
+def _common_words(reviews):
+    """Folded words that appear mostly in lowercase: capitalised, they start a sentence, not a name."""
+    lower = Counter()
+    total = Counter()
+    for review in reviews:
+        for word in _WORD_RE.findall(f"{review.title} {review.text}"):
+            folded = normalize(word)
+            total[folded] += 1
+            lower[folded] += word.islower()
+    return {word for word, count in total.items() if lower[word] / count > COMMON_WORD_RATIO}
+
+
+def build_index(corpus_file=CORPUS_FILE):
+    """Resolve the hotel mentions of every review in the corpus; returns (hotels by id, stats)."""
+    reviews = list(iter_reviews(corpus_file))
+    common = _common_words(reviews)
+    mentions = {}
+    names = Counter()
+    dropped = set()
+    for review in reviews:
+        found = []
+        for name in extract_hotel_mentions(f"{review.title}. {review.text}"):
+            key = hotel_id(name)
+            if not key or key in common:
+                dropped.add(key)
+                continue
+            names[(key, name)] += 1
+            found.append(key)
+        mentions[review.index] = found
+
+    # "hana-riverside" -> "hana-riverside-quang-ngai" when only one longer name extends it.
+    keys = {key for key, _ in names}
+    merged = {}
+    for key in keys:
+        if "-" not in key:
+            continue
+        longer = [other for other in keys if other.startswith(key + "-")]
+        if len(longer) == 1:
+            merged[key] = longer[0]
+
+    hotels = {}
+    for (key, name), _count in names.most_common():
+        target = merged.get(key, key)
+        hotel = hotels.setdefault(target, Hotel(target, name))
+        if name not in hotel.aliases:
+            hotel.aliases.append(name)
+    for hotel in hotels.values():
+        # Display the most frequent spelling of the canonical (longest) name.
+        spellings = [n for (k, n), _ in names.most_common() if k == hotel.id]
+        if spellings:
+            hotel.name = spellings[0]
+    for review in reviews:
+        for target in dict.fromkeys(merged.get(key, key) for key in mentions[review.index]):
+            hotels[target].reviews.append((review.index, review.offset, review.length))
+    stats = {"reviews": len(reviews), "with_hotel": sum(1 for m in mentions.values() if m),
+             "hotels": len(hotels), "dropped_common": len(dropped - {""})}
+    return hotels, stats
+
+
+def save_index(hotels, corpus_file=CORPUS_FILE, index_file=INDEX_FILE):
+    stat = os.stat(corpus_file)
+    data = {"corpus": os.path.basename(corpus_file), "corpus_size": stat.st_size, "corpus_mtime": stat.st_mtime,
+            "hotels": {key: hotel.to_dict() for key, hotel in sorted(hotels.items())}}
+    tmp = f"{index_file}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, index_file)
+
+
+class HotelIndex:
+    """Loaded index plus the corpus text its offsets point into."""
+
+    def __init__(self, hotels, content):
+        self.hotels = hotels
+        self.content = content
+        self._aliases = {}
+        for hotel in hotels.values():
+            for alias in [hotel.name] + hotel.aliases:
+                self._aliases.setdefault(hotel_id(alias), hotel.id)
+        self._aliases.update({key: key for key in hotels})
+
+    @classmethod
+    def load(cls, corpus_file=CORPUS_FILE, index_file=INDEX_FILE):
+        """Load the index, rebuilding it first if it is missing or older than the corpus."""
+        stat = os.stat(corpus_file)
+        data = None
+        if os.path.exists(index_file):
+            with open(index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if (data.get("corpus_size"), data.get("corpus_mtime")) != (stat.st_size, stat.st_mtime):
+                data = None
+        if data is None:
+            hotels, _ = build_index(corpus_file)
+            save_index(hotels, corpus_file, index_file)
+        else:
+            hotels = {key: Hotel(key, h["name"], h["aliases"], [tuple(r) for r in h["reviews"]])
+                      for key, h in data["hotels"].items()}
+        with open(corpus_file, "r", encoding="utf-8") as f:
+            return cls(hotels, f.read())
+
+    def resolve(self, name):
+        """(hotel, candidates): the hotel a name refers to, else the closest names."""
+        key = hotel_id(name)
+        if key in self._aliases:
+            return self.hotels[self._aliases[key]], []
+        # Prefix of a longer name, or a longer name that contains one ("Oasis Hotel Ben Tre").
+        partial = {target for alias, target in self._aliases.items()
+                   if alias.startswith(key + "-") or key.startswith(alias + "-")}
+        if len(partial) == 1:
+            return self.hotels[partial.pop()], []
+        close = difflib.get_close_matches(key, list(self._aliases), n=5, cutoff=FUZZY_CUTOFF)
+        targets = list(dict.fromkeys(self._aliases[c] for c in close)) or sorted(partial)
+        if len(targets) == 1:
+            return self.hotels[targets[0]], []
+        return None, [self.hotels[t].name for t in targets]
+
+    def review(self, offset, length):
+        return next(parse_reviews(self.content[offset:offset + length]))
+
+    def page(self, name, page=1, page_size=DEFAULT_PAGE_SIZE):
+        """A page of a hotel's reviews, in corpus order."""
+        hotel, candidates = self.resolve(name)
+        if hotel is None:
+            return {"error": f"No hotel named '{name}' in the review corpus", "candidates": candidates}
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        pages = max(1, -(-len(hotel.reviews) // page_size))
+        page = max(1, min(page, pages))
+        selected = hotel.reviews[(page - 1) * page_size:page * page_size]
+        reviews = []
+        for index, offset, length in selected:
+            review = self.review(offset, length)
+            reviews.append({"review": index, "title": review.title, "text": review.text, "language": review.language})
+        return {"hotel": {"id": hotel.id, "name": hotel.name, "aliases": hotel.aliases},
+                "total": len(hotel.reviews), "page": page, "pages": pages, "page_size": page_size,
+                "reviews": reviews}
+
+
+@functools.lru_cache(maxsize=None)
+def default_index(corpus_file=CORPUS_FILE, index_file=INDEX_FILE):
+    return HotelIndex.load(corpus_file, index_file)
+
+
+def reviews_for_hotel(hotel, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """Exact, paginated reviews of a hotel from the default index."""
+    return default_index().page(hotel, page, page_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hotel entity index over the review corpus")
+    parser.add_argument("--corpus", default=CORPUS_FILE)
+    parser.add_argument("--index", default=INDEX_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Resolve hotel mentions and write the index")
+    listing = sub.add_parser("list", help="Hotels with the most reviews")
+    listing.add_argument("--limit", type=int, default=25)
+    show = sub.add_parser("show", help="A page of one hotel's reviews")
+    show.add_argument("hotel")
+    show.add_argument("--page", type=int, default=1)
+    show.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        hotels, stats = build_index(args.corpus)
+        save_index(hotels, args.corpus, args.index)
+        print(f"✅ Indexed {stats['hotels']} hotels across {stats['with_hotel']} of {stats['reviews']} reviews "
+              f"in {time.perf_counter() - started:.1f}s -> {args.index} "
+              f"({stats['dropped_common']} common words dropped)")
+        return
+
+    index = HotelIndex.load(args.corpus, args.index)
+    if args.command == "list":
+        for hotel in sorted(index.hotels.values(), key=lambda h: -len(h.reviews))[:args.limit]:
+            aliases = ", ".join(a for a in hotel.aliases if a != hotel.name)
+            print(f"   {len(hotel.reviews):>4}  {hotel.id:<32} {hotel.name}" + (f"  ({aliases})" if aliases else ""))
+        return
+
+    started = time.perf_counter()
+    result = index.page(args.hotel, args.page, args.page_size)
+    elapsed = (time.perf_counter() - started) * 1000
+    if "error" in result:
+        print(f"❌ {result['error']}; did you mean: {', '.join(result['candidates']) or 'nothing close'}")
+        return
+    print(f"🏨 {result['hotel']['name']}: {result['total']} reviews, page {result['page']}/{result['pages']} "
+          f"({elapsed:.1f} ms)")
+    for review in result["reviews"]:
+        print(f"   #{review['review']:<5} [{review['language']}] {review['title'][:70]}")
+
+
+if __name__ == "__main__":
+    main()
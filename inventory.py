@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Deployment Inventory
+--------------------
+A SQLite database of every concierge stack setup.py has created, so that
+many deployments can live side by side in one working directory and be
+found again (and reaped) later. It replaces the flat GENERATED_OCIDS.txt.
+
+  deployments: one row per stack (name, compartment, status, created/deleted);
+               PROVISIONING while setup.py runs, then ACTIVE, then DELETED
+  resources:   one row per resource (deployment, key, type, OCID, compartment,
+               created/deleted), indexed by type, compartment and age
+
+Every resource keeps the key it had in GENERATED_OCIDS.txt
+(KNOWLEDGEBASE_ID, HOTEL_CONCIERGE_AGENT_ENDPOINT_ID, ...), so
+Inventory.ocids() returns the same dict cleanup.py always worked with.
+
+Usage:
+  python inventory.py list
+  python inventory.py show [DEPLOYMENT]              # KEY=VALUE, like the old file
+  python inventory.py query --type agent_endpoint --older-than 7d
+  python inventory.py import GENERATED_OCIDS.txt     # adopt a legacy file
+"""
+
+import argparse
+import os
+import re
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+INVENTORY_FILE = "concierge_inventory.db"
+LEGACY_OCIDS_FILE = "GENERATED_OCIDS.txt"
+
+STATUS_PROVISIONING = "PROVISIONING"
+STATUS_ACTIVE = "ACTIVE"
+STATUS_DELETED = "DELETED"
+
+# GENERATED_OCIDS.txt key -> resource type
+RESOURCE_TYPES = {
+    "BUCKET_NAME": "bucket",
+    "KNOWLEDGEBASE_ID": "knowledge_base",
+    "DATASOURCE_ID": "data_source",
+    "DATA_INGESTION_JOB_ID": "data_ingestion_job",
+    "HOTEL_CONCIERGE_AGENT_ID": "agent",
+    "HOTEL_CONCIERGE_AGENT_ENDPOINT_ID": "agent_endpoint",
+    "HOTEL_CONCIERGE_AGENT_RAG_TOOL_ID": "tool",
+    "HOTEL_CONCIERGE_AGENT_ADK_ID": "agent",
+    "HOTEL_CONCIERGE_AGENT_ADK_ENDPOINT_ID": "agent_endpoint",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deployments (
+    name           TEXT PRIMARY KEY,
+    compartment_id TEXT NOT NULL,
+    status         TEXT NOT NULL,
+    created_at     REAL NOT NULL,
+    deleted_at     REAL
+);
+CREATE TABLE IF NOT EXISTS resources (
+    deployment     TEXT NOT NULL REFERENCES deployments(name),
+    key            TEXT NOT NULL,
+    resource_type  TEXT NOT NULL,
+    resource_id    TEXT NOT NULL,
+    compartment_id TEXT NOT NULL,
+    created_at     REAL NOT NULL,
+    deleted_at     REAL,
+    PRIMARY KEY (deployment, key)
+);
+CREATE INDEX IF NOT EXISTS resources_by_type ON resources (resource_type, created_at);
+CREATE INDEX IF NOT EXISTS resources_by_compartment ON resources (compartment_id, resource_type);
+CREATE INDEX IF NOT EXISTS resources_by_id ON resources (resource_id);
+CREATE INDEX IF NOT EXISTS deployments_by_age ON deployments (created_at);
+"""
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_duration(value):
+    """'90s', '15m', '12h', '7d', '2w' (or plain seconds) -> seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", str(value))
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r} (use e.g. 30m, 12h, 7d)")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2) or "s"]
+
+
+def new_deployment_name(prefix="concierge"):
+    return f"{prefix}-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{secrets.token_hex(2)}"
+
+
+def _format_time(timestamp):
+    if timestamp is None:
+        return "-"
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M:%SZ")
+
+
+class Inventory:
+    """Thread-safe access to the deployment inventory database."""
+
+    def __init__(self, path=INVENTORY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._db:
+            return self._db.execute(sql, params).fetchall()
+
+    # ---- deployments ----
+    def create_deployment(self, name, compartment_id, status=STATUS_PROVISIONING, created_at=None):
+        """Register a deployment (idempotent, so resumed runs keep their row and age)."""
+        self._execute(
+            "INSERT INTO deployments (name, compartment_id, status, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET status = excluded.status, deleted_at = NULL",
+            (name, compartment_id, status, created_at or time.time()))
+        return name
+
+    def set_status(self, name, status):
+        self._execute("UPDATE deployments SET status = ? WHERE name = ?", (status, name))
+
+    def deployment(self, name):
+        rows = self._execute("SELECT * FROM deployments WHERE name = ?", (name,))
+        return dict(rows[0]) if rows else None
+
+    def deployments(self, older_than=None, include_deleted=False):
+        """Deployments oldest first, optionally only those created more than `older_than` seconds ago."""
+        sql, params = "SELECT * FROM deployments WHERE 1 = 1", []
+        if not include_deleted:
+            sql += " AND status != ?"
+            params.append(STATUS_DELETED)
+        if older_than is not None:
+            sql += " AND created_at < ?"
+            params.append(time.time() - older_than)
+        return [dict(row) for row in self._execute(sql + " ORDER BY created_at", params)]
+
+    def latest_deployment(self):
+        """Name of the most recently created deployment that has not been deleted."""
+        rows = self._execute(
+            "SELECT name FROM deployments WHERE status != ? ORDER BY created_at DESC LIMIT 1", (STATUS_DELETED,))
+        return rows[0]["name"] if rows else None
+
+    def mark_deployment_deleted(self, name):
+        now = time.time()
+        self._execute("UPDATE deployments SET status = ?, deleted_at = ? WHERE name = ?",
+                      (STATUS_DELETED, now, name))
+        self._execute("UPDATE resources SET deleted_at = ? WHERE deployment = ? AND deleted_at IS NULL",
+                      (now, name))
+
+    # ---- resources ----
+    def record(self, deployment, key, resource_id, compartment_id, resource_type=None, created_at=None):
+        """Record (or replace) one resource of a deployment."""
+        resource_type = resource_type or RESOURCE_TYPES.get(key, key.lower())
+        self._execute(
+            "INSERT INTO resources (deployment, key, resource_type, resource_id, compartment_id, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(deployment, key) DO UPDATE SET resource_id = excluded.resource_id, "
+            "compartment_id = excluded.compartment_id, deleted_at = NULL, "
+            "created_at = CASE WHEN resources.resource_id = excluded.resource_id "
+            "THEN resources.created_at ELSE excluded.created_at END",
+            (deployment, key, resource_type, resource_id, compartment_id, created_at or time.time()))
+
+    def record_all(self, deployment, ocids, compartment_id, created_at=None):
+        for key, resource_id in ocids.items():
+            self.record(deployment, key, resource_id, compartment_id, created_at=created_at)
+
+    def ocids(self, deployment):
+        """KEY -> OCID for the live resources of a deployment."""
+        rows = self._execute(
+            "SELECT key, resource_id FROM resources WHERE deployment = ? AND deleted_at IS NULL", (deployment,))
+        return {row["key"]: row["resource_id"] for row in rows}
+
+    def mark_deleted(self, deployment, key):
+        self._execute("UPDATE resources SET deleted_at = ? WHERE deployment = ? AND key = ?",
+                      (time.time(), deployment, key))
+
+    def query(self, resource_type=None, compartment_id=None, older_than=None, deployment=None,
+              include_deleted=False):
+        """Resources matching every given filter, oldest first.
+
+        e.g. query(resource_type="agent_endpoint", older_than=parse_duration("7d"))
+        """
+        sql, params = "SELECT * FROM resources WHERE 1 = 1", []
+        if resource_type:
+            sql += " AND resource_type = ?"
+            params.append(resource_type)
+        if compartment_id:
+            sql += " AND compartment_id = ?"
+            params.append(compartment_id)
+        if older_than is not None:
+            sql += " AND created_at < ?"
+            params.append(time.time() - older_than)
+        if deployment:
+            sql += " AND deployment = ?"
+            params.append(deployment)
+        if not include_deleted:
+            sql += " AND deleted_at IS NULL"
+        return [dict(row) for row in self._execute(sql + " ORDER BY created_at", params)]
+
+    def import_ocids_file(self, path=LEGACY_OCIDS_FILE, deployment=None, compartment_id=""):
+        """Adopt a legacy GENERATED_OCIDS.txt as a deployment; returns its name.
+
+        The file's modification time stands in for the creation time, so the
+        imported resources age like the rest of the inventory.
+        """
+        ocids = {}
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    ocids[key] = value
+        created_at = os.path.getmtime(path)
+        deployment = deployment or f"legacy-{datetime.fromtimestamp(created_at, timezone.utc):%Y%m%d%H%M%S}"
+        self.create_deployment(deployment, compartment_id, STATUS_ACTIVE, created_at)
+        self.record_all(deployment, ocids, compartment_id, created_at)
+        return deployment
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concierge deployment inventory")
+    parser.add_argument("--db", default=INVENTORY_FILE, help=f"Inventory database (default: {INVENTORY_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_cmd = commands.add_parser("list", help="List deployments")
+    list_cmd.add_argument("--all", action="store_true", help="Include deleted deployments")
+    list_cmd.add_argument("--older-than", help="Only deployments older than this (e.g. 7d)")
+
+    show_cmd = commands.add_parser("show", help="Print a deployment's OCIDs as KEY=VALUE lines")
+    show_cmd.add_argument("deployment", nargs="?", help="Deployment name (default: most recent)")
+
+    query_cmd = commands.add_parser("query", help="Find resources across deployments")
+    query_cmd.add_argument("--type", help=f"Resource type ({', '.join(sorted(set(RESOURCE_TYPES.values())))})")
+    query_cmd.add_argument("--compartment-id")
+    query_cmd.add_argument("--deployment")
+    query_cmd.add_argument("--older-than", help="e.g. 30m, 12h, 7d")
+    query_cmd.add_argument("--include-deleted", action="store_true")
+
+    import_cmd = commands.add_parser("import", help="Adopt a legacy GENERATED_OCIDS.txt")
+    import_cmd.add_argument("file", nargs="?", default=LEGACY_OCIDS_FILE)
+    import_cmd.add_argument("--deployment")
+    import_cmd.add_argument("--compartment-id", default="")
+
+    args = parser.parse_args()
+    inventory = Inventory(args.db)
+
+    if args.command == "list":
+        older_than = parse_duration(args.older_than) if args.older_than else None
+        rows = inventory.deployments(older_than=older_than, include_deleted=args.all)
+        for row in rows:
+            print(f"{row['name']:<40} {row['status']:<12} created {_format_time(row['created_at'])}  "
+                  f"{len(inventory.ocids(row['name']))} live resource(s)  {row['compartment_id']}")
+        print(f"{len(rows)} deployment(s)")
+    elif args.command == "show":
+        name = args.deployment or inventory.latest_deployment()
+        if not name or not inventory.deployment(name):
+            sys.exit(f"❌ No deployment {args.deployment or 'found'}")
+        for key, value in inventory.ocids(name).items():
+            print(f"{key}={value}")
+    elif args.command == "query":
+        older_than = parse_duration(args.older_than) if args.older_than else None
+        rows = inventory.query(args.type, args.compartment_id, older_than, args.deployment, args.include_deleted)
+        for row in rows:
+            print(f"{row['resource_type']:<20} {row['resource_id']:<60} {row['deployment']:<40} "
+                  f"created {_format_time(row['created_at'])}")
+        print(f"{len(rows)} resource(s)")
+    elif args.command == "import":
+        name = inventory.import_ocids_file(args.file, args.deployment, args.compartment_id)
+        print(f"✅ Imported {args.file} as deployment {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Knowledge Base Document Packer
+------------------------------
+Splits the review corpus into Object Storage objects that line up with the
+knowledge base ingestion chunker:
+
+  - every review stays whole (never split between Title: and Review:)
+  - an object never mixes reviews from two different mentioned hotels
+  - objects are kept under MAX_OBJECT_CHARS so each one ingests as a
+    single, self-contained chunk
+
+Each packed object carries hotel/language metadata that setup.py attaches
+as opc-meta-* headers on upload.
+
+Usage (local preview):
+  python kb_packer.py --out-dir packed_reviews
+"""
+
+import argparse
+import os
+from collections import Counter
+
+from review_corpus import CORPUS_FILE, ascii_fold, iter_reviews
+
+# Sized to fit one ingestion chunk with headroom for the chunk overlap.
+MAX_OBJECT_CHARS = 3500
+OBJECT_PREFIX = "reviews/"
+
+
+class PackedObject:
+    """A group of whole reviews uploaded as one Object Storage object."""
+
+    def __init__(self, name, reviews):
+        self.name = name
+        self.reviews = reviews
+
+    @property
+    def body(self):
+        return "\n".join(r.to_text() for r in self.reviews)
+
+    @property
+    def hotel(self):
+        hotels = Counter(h for r in self.reviews for h in r.hotels)
+        return hotels.most_common(1)[0][0] if hotels else None
+
+    @property
+    def languages(self):
+        return sorted({r.language for r in self.reviews})
+
+    @property
+    def metadata(self):
+        """Object metadata, ASCII-only so it can be sent as opc-meta-* headers."""
+        return {
+            "hotel": ascii_fold(self.hotel) if self.hotel else "unknown",
+            "languages": ",".join(self.languages),
+            "review-count": str(len(self.reviews)),
+            "first-review": str(self.reviews[0].index),
+        }
+
+
+def _mentions_hotel(review, hotel):
+    """True if the review names `hotel`, allowing for longer/shorter spellings."""
+    key = hotel.lower()
+    return any(h.lower().startswith(key) or key.startswith(h.lower()) for h in review.hotels)
+
+
+def pack_reviews(reviews, max_chars=MAX_OBJECT_CHARS, prefix=OBJECT_PREFIX):
+    """Group consecutive reviews into PackedObjects.
+
+    The corpus is ordered by hotel, so consecutive reviews usually belong to
+    the same property. A new object is started when the size budget would be
+    exceeded or when a review names a hotel other than the one the current
+    group is about. A single review larger than the budget gets its own object.
+    """
+    packed = []
+    group, group_chars, group_hotel = [], 0, None
+
+    def flush():
+        if group:
+            name = f"{prefix}reviews-{len(packed):05d}.txt"
+            packed.append(PackedObject(name, list(group)))
+
+    for review in reviews:
+        size = len(review.to_text()) + 1
+        hotel = review.hotels[0] if review.hotels else None
+        new_hotel = hotel is not None and group_hotel is not None \
+            and not _mentions_hotel(review, group_hotel)
+        if group and (group_chars + size > max_chars or new_hotel):
+            flush()
+            group, group_chars, group_hotel = [], 0, None
+        group.append(review)
+        group_chars += size
+        group_hotel = group_hotel or hotel
+
+    flush()
+    return packed
+
+
+def pack_corpus(file_path=CORPUS_FILE, max_chars=MAX_OBJECT_CHARS, prefix=OBJECT_PREFIX):
+    """Parse and pack a corpus file in one call."""
+    return pack_reviews(iter_reviews(file_path), max_chars=max_chars, prefix=prefix)
+
+
+def write_packed_objects(objects, out_dir):
+    """Write packed objects to a local directory for inspection."""
+    for obj in objects:
+        path = os.path.join(out_dir, obj.name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(obj.body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the review corpus for KB ingestion")
+    parser.add_argument("--file", default=CORPUS_FILE, help="Corpus file to pack")
+    parser.add_argument("--max-chars", type=int, default=MAX_OBJECT_CHARS,
+                        help="Maximum characters per packed object")
+    parser.add_argument("--out-dir", help="Write the packed objects to this directory")
+    args = parser.parse_args()
+
+    print(f"🔄 Packing reviews from {args.file}...")
+    objects = pack_corpus(args.file, max_chars=args.max_chars)
+    reviews = sum(len(o.reviews) for o in objects)
+    tagged = sum(1 for o in objects if o.hotel)
+    print(f"✅ Packed {reviews} reviews into {len(objects)} object(s) "
+          f"({tagged} tagged with a hotel)")
+
+    if args.out_dir:
+        write_packed_objects(objects, args.out_dir)
+        print(f"✅ Packed objects written to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
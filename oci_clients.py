@@ -0,0 +1,229 @@
+"""
+OCI Client Factory
+------------------
+One place where the control-plane scripts get their OCI clients:
+
+  - the config file is parsed once per (file, profile)
+  - each client is built once and reused, with a connection pool large
+    enough for the scripts' thread pools (mounted on the client's own
+    session, the way the SDK's UploadManager resizes it)
+  - one retry strategy and one circuit breaker per service for all clients;
+    POSTs (creates) are only retried on 5xx when the SDK sent an
+    opc-retry-token with them, so a replay cannot create a duplicate
+  - every API operation is timed and counted (SDK retries included);
+    print_summary() shows what a run cost in API calls
+
+Callers that already retry with their own backoff (the identity executor,
+bucket purges) ask for clients with retries=False so attempts don't multiply.
+
+Usage:
+  clients = ClientFactory()
+  os_client = clients.object_storage()
+  ...
+  clients.print_summary()
+"""
+
+import functools
+import os
+import threading
+import time
+
+import oci
+from oci.base_client import OCIHTTPAdapter
+
+DEFAULT_CONFIG_FILE = "~/.oci/config"
+POOL_MAXSIZE = 32
+
+
+def _retry_strategy(retry_5xx):
+    return oci.retry.RetryStrategyBuilder(
+        max_attempts_check=True,
+        max_attempts=6,
+        total_elapsed_time_check=True,
+        total_elapsed_time_seconds=300,
+        service_error_check=True,
+        service_error_retry_on_any_5xx=retry_5xx,
+        service_error_retry_config={
+            # Rejected before anything changed: safe to replay for any operation.
+            409: ["IncorrectState"],
+            429: [],
+        },
+        backoff_type=oci.retry.BACKOFF_DECORRELATED_JITTER_VALUE,
+    ).get_retry_strategy()
+
+
+class IdempotentRetryStrategy:
+    """Retries 5xx only for calls that are safe to replay.
+
+    A create that timed out or failed with a 5xx may still have succeeded;
+    replaying it without an opc-retry-token creates a second resource. The
+    SDK adds a token to the operations that support one (e.g. create_agent)
+    but not to the others (e.g. create_bucket), so those POSTs only retry
+    throttling and IncorrectState.
+    """
+
+    def __init__(self):
+        self.retrying = _retry_strategy(retry_5xx=True)
+        self.throttle_only = _retry_strategy(retry_5xx=False)
+
+    def add_circuit_breaker_callback(self, circuit_breaker_callback):
+        self.retrying.add_circuit_breaker_callback(circuit_breaker_callback)
+        self.throttle_only.add_circuit_breaker_callback(circuit_breaker_callback)
+
+    def make_retrying_call(self, func_ref, *func_args, **func_kwargs):
+        headers = func_kwargs.get("header_params") or {}
+        if func_kwargs.get("method") == "POST" and "opc-retry-token" not in headers:
+            return self.throttle_only.make_retrying_call(func_ref, *func_args, **func_kwargs)
+        return self.retrying.make_retrying_call(func_ref, *func_args, **func_kwargs)
+
+
+RETRY_STRATEGY = IdempotentRetryStrategy()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config(file_location, profile):
+    config = oci.config.from_file(file_location, profile)
+    oci.config.validate_config(config)
+    return config
+
+
+def load_config(file_location=DEFAULT_CONFIG_FILE, profile=None):
+    """Parsed OCI config; the profile defaults to OCI_CLI_PROFILE, then DEFAULT."""
+    profile = profile or os.environ.get("OCI_CLI_PROFILE") or oci.config.DEFAULT_PROFILE
+    # Copy so callers can't mutate the cached dict.
+    return dict(_load_config(os.path.expanduser(file_location), profile))
+
+
+class OperationStats:
+    """Call count, error count and latency of one API operation."""
+
+    __slots__ = ("calls", "errors", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def average(self):
+        return self.total / self.calls if self.calls else 0.0
+
+
+class CallStats:
+    """Thread-safe per-operation counters shared by every client of a factory."""
+
+    def __init__(self):
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, failed):
+        with self._lock:
+            stats = self.operations.setdefault(operation, OperationStats())
+            stats.calls += 1
+            stats.errors += failed
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+
+    @property
+    def calls(self):
+        return sum(s.calls for s in self.operations.values())
+
+    def print_summary(self, title="API calls"):
+        if not self.operations:
+            return
+        print(f"\n{title}")
+        print("-" * 84)
+        print(f"   {'operation':<46}{'calls':>7}{'errors':>8}{'avg ms':>10}{'max ms':>10}")
+        ordered = sorted(self.operations.items(), key=lambda item: item[1].total, reverse=True)
+        for name, s in ordered:
+            print(f"   {name:<46}{s.calls:>7}{s.errors:>8}{s.average * 1000:>10.0f}{s.max * 1000:>10.0f}")
+        total_time = sum(s.total for s in self.operations.values())
+        print(f"   {self.calls} call(s), {total_time:.1f}s spent waiting on the API")
+
+
+class InstrumentedClient:
+    """Forwards to an OCI client, timing and counting every API operation called on it."""
+
+    def __init__(self, client, stats):
+        self._client = client
+        self._stats = stats
+        self._service = type(client).__name__.replace("Client", "")
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        operation = f"{self._service}.{name}"
+        stats = self._stats
+
+        @functools.wraps(attr)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                response = attr(*args, **kwargs)
+                failed = False
+                return response
+            finally:
+                stats.record(operation, time.perf_counter() - started, failed)
+
+        return timed
+
+
+class ClientFactory:
+    """Builds OCI clients that share config, HTTP connections and policy."""
+
+    def __init__(self, profile=None, config_file=DEFAULT_CONFIG_FILE, config=None,
+                 retry_strategy=RETRY_STRATEGY, pool_maxsize=POOL_MAXSIZE):
+        self.config = config if config is not None else load_config(config_file, profile)
+        self.retry_strategy = retry_strategy
+        self.stats = CallStats()
+        self.pool_maxsize = pool_maxsize
+        self._breakers = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @property
+    def tenancy(self):
+        return self.config["tenancy"]
+
+    def _breaker(self, client_class):
+        # Named strategies share one breaker across every client of a service.
+        name = f"{client_class.__name__}-{id(self)}"
+        if name not in self._breakers:
+            self._breakers[name] = oci.circuit_breaker.CircuitBreakerStrategy(
+                failure_threshold=10, recovery_timeout=30, name=name)
+        return self._breakers[name]
+
+    def _instrument(self, client):
+        # Resize the pool of the client's own session; the SDK replaces that
+        # session on some errors, so it must not be shared between clients.
+        adapter = client.base_client.session.adapters.get("https://")
+        client.base_client.session.mount("https://", OCIHTTPAdapter(
+            pool_connections=getattr(adapter, "_pool_connections", 10), pool_maxsize=self.pool_maxsize))
+        return InstrumentedClient(client, self.stats)
+
+    def client(self, client_class, retries=True):
+        """Shared instance of `client_class` (e.g. oci.identity.IdentityClient)."""
+        key = (client_class, retries)
+        with self._lock:
+            if key not in self._clients:
+                retry_strategy = self.retry_strategy if retries else oci.retry.NoneRetryStrategy()
+                self._clients[key] = self._instrument(client_class(
+                    self.config,
+                    retry_strategy=retry_strategy,
+                    circuit_breaker_strategy=self._breaker(client_class)))
+            return self._clients[key]
+
+    def object_storage(self, retries=True):
+        return self.client(oci.object_storage.ObjectStorageClient, retries)
+
+    def genai_agent(self, retries=True):
+        return self.client(oci.generative_ai_agent.GenerativeAiAgentClient, retries)
+
+    def identity(self, retries=True):
+        return self.client(oci.identity.IdentityClient, retries)
+
+    def print_summary(self, title="API calls"):
+        self.stats.print_summary(title)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+OCI Resource Waiters
+--------------------
+Shared helpers to block until OCI resources reach a usable state, instead
+of firing create_*/delete_* calls and hoping for the best.
+
+  - wait_for_lifecycle():    poll a get_* call until lifecycle_state is a target state
+  - wait_for_deleted():      same, but a 404 also counts as "gone"
+  - wait_for_work_request(): poll a work request until it succeeds, with % progress
+  - wait_for_ingestion_job(): poll a data ingestion job, reporting files and an ETA
+  - wait_for_deletion():     wait on a delete_* call via its work request or lifecycle
+  - wait_for_all():          run many of the above concurrently
+
+Polling uses jittered exponential backoff so that many concurrent waiters
+do not hammer the control plane in lock-step.
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import oci
+
+DEFAULT_TIMEOUT = 30 * 60
+INITIAL_DELAY = 2.0
+MAX_DELAY = 30.0
+
+WORK_REQUEST_SUCCEEDED = ("SUCCEEDED",)
+WORK_REQUEST_FAILED = ("FAILED", "CANCELED")
+INGESTION_SUCCEEDED = ("SUCCEEDED",)
+INGESTION_FAILED = ("FAILED", "CANCELED")
+
+
+class WaitError(Exception):
+    """Raised when a resource ends up in a failed state or the wait times out."""
+
+
+def backoff_delays(initial=None, maximum=None, factor=2.0):
+    """Yield poll delays: exponential growth capped at `maximum`, with +/-50% jitter."""
+    initial = INITIAL_DELAY if initial is None else initial
+    maximum = MAX_DELAY if maximum is None else maximum
+    delay = initial
+    while True:
+        yield min(maximum, delay) * random.uniform(0.5, 1.5)
+        delay = min(maximum, delay * factor)
+
+
+def _format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def _poll(fetch, label, is_done, is_failed, describe, timeout):
+    """Generic backoff polling loop shared by all waiters."""
+    started = time.monotonic()
+    delays = backoff_delays()
+    last_message = None
+    while True:
+        data = fetch()
+        elapsed = time.monotonic() - started
+        if is_failed(data):
+            raise WaitError(f"{label} failed: {describe(data, elapsed)}")
+        if is_done(data):
+            print(f"✅ {label}: {describe(data, elapsed)} after {_format_seconds(elapsed)}")
+            return data
+
+        message = describe(data, elapsed)
+        if message != last_message:
+            print(f"⏳ {label}: {message} ({_format_seconds(elapsed)} elapsed)")
+            last_message = message
+
+        if elapsed > timeout:
+            raise WaitError(f"Timed out after {_format_seconds(elapsed)} waiting for {label}")
+        time.sleep(next(delays))
+
+
+def wait_for_lifecycle(get_fn, resource_id, label, target_states=("ACTIVE",),
+                       failed_states=("FAILED",), timeout=DEFAULT_TIMEOUT):
+    """Poll `get_fn(resource_id)` until its lifecycle_state is in `target_states`."""
+    return _poll(
+        lambda: get_fn(resource_id).data,
+        label,
+        is_done=lambda data: data.lifecycle_state in target_states,
+        is_failed=lambda data: data.lifecycle_state in failed_states,
+        describe=lambda data, _elapsed: data.lifecycle_state,
+        timeout=timeout,
+    )
+
+
+def wait_for_deleted(get_fn, resource_id, label, timeout=DEFAULT_TIMEOUT):
+    """Poll until the resource is DELETED or no longer found."""
+
+    def fetch():
+        try:
+            return get_fn(resource_id).data
+        except oci.exceptions.ServiceError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    return _poll(
+        fetch,
+        label,
+        is_done=lambda data: data is None or data.lifecycle_state == "DELETED",
+        is_failed=lambda data: data is not None and data.lifecycle_state == "FAILED",
+        describe=lambda data, _elapsed: data.lifecycle_state if data else "DELETED",
+        timeout=timeout,
+    )
+
+
+def wait_for_work_request(client, work_request_id, label, timeout=DEFAULT_TIMEOUT):
+    """Poll a work request until it SUCCEEDED, reporting percent complete and an ETA."""
+
+    def describe(data, elapsed):
+        percent = data.percent_complete or 0.0
+        message = f"{data.status} {percent:.0f}%"
+        if 0 < percent < 100:
+            remaining = elapsed * (100 - percent) / percent
+            message += f", ETA {_format_seconds(remaining)}"
+        return message
+
+    return _poll(
+        lambda: client.get_work_request(work_request_id).data,
+        label,
+        is_done=lambda data: data.status in WORK_REQUEST_SUCCEEDED,
+        is_failed=lambda data: data.status in WORK_REQUEST_FAILED,
+        describe=describe,
+        timeout=timeout,
+    )
+
+
+def wait_for_ingestion_job(agent_client, job_id, label="Data ingestion job",
+                           expected_files=None, timeout=DEFAULT_TIMEOUT):
+    """Poll a data ingestion job until it finishes.
+
+    Progress is reported from the job statistics; if `expected_files` is
+    known, an ETA is derived from the ingestion rate so far.
+    """
+
+    def describe(data, elapsed):
+        stats = data.data_ingestion_job_statistics
+        ingested = (stats.number_of_ingested_files or 0) if stats else 0
+        failed = (stats.number_of_failed_files or 0) if stats else 0
+        message = f"{data.lifecycle_state}, {ingested} file(s) ingested"
+        if failed:
+            message += f", {failed} failed"
+        processed = ingested + failed
+        if expected_files and 0 < processed < expected_files:
+            remaining = elapsed * (expected_files - processed) / processed
+            message += f" of {expected_files}, ETA {_format_seconds(remaining)}"
+        return message
+
+    return _poll(
+        lambda: agent_client.get_data_ingestion_job(job_id).data,
+        label,
+        is_done=lambda data: data.lifecycle_state in INGESTION_SUCCEEDED,
+        is_failed=lambda data: data.lifecycle_state in INGESTION_FAILED,
+        describe=describe,
+        timeout=timeout,
+    )
+
+
+def wait_for_all(waits, max_workers=8):
+    """Run several waits concurrently.
+
+    `waits` maps a label to a zero-argument callable (typically a lambda
+    around one of the waiters above). Returns label -> result, or raises a
+    WaitError listing every wait that failed.
+    """
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fn): label for label, fn in waits.items()}
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                results[label] = future.result()
+            except Exception as e:
+                errors[label] = e
+    if errors:
+        details = "; ".join(f"{label}: {e}" for label, e in errors.items())
+        raise WaitError(f"{len(errors)} wait(s) failed: {details}")
+    return results
+
+
+def wait_for_deletion(client, response, get_fn, resource_id, label, timeout=DEFAULT_TIMEOUT):
+    """Wait for a delete_* call to finish.
+
+    Uses the work request returned in the opc-work-request-id header when
+    there is one, and falls back to polling the resource until it is gone.
+    """
+    work_request_id = response.headers.get("opc-work-request-id") if response is not None else None
+    if work_request_id and hasattr(client, "get_work_request"):
+        return wait_for_work_request(client, work_request_id, label, timeout=timeout)
+    return wait_for_deleted(get_fn, resource_id, label, timeout=timeout)
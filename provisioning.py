@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Provisioning Dependency Graph
+-----------------------------
+Runs provisioning steps as a dependency graph on a thread pool, so that
+independent branches (e.g. the two agents and their endpoints vs. the
+bucket upload and ingestion) run concurrently.
+
+Each node is a callable that receives the results of its dependencies as
+positional arguments, in the order the dependencies were declared:
+
+    graph = ProvisioningGraph()
+    graph.add("bucket", lambda: create_bucket(...))
+    graph.add("upload", lambda bucket: upload_file(..., bucket, ...), deps=["bucket"])
+    results = graph.run()
+    graph.print_summary()
+
+Every node records its start/finish time; print_summary() shows per-node
+timings and the critical path that bounded the wall-clock time.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class ProvisioningError(Exception):
+    """Raised when a provisioning node fails; carries the node name."""
+
+    def __init__(self, node_name, cause):
+        super().__init__(f"Step '{node_name}' failed: {cause}")
+        self.node_name = node_name
+        self.cause = cause
+
+
+class Node:
+    """A single provisioning step in the graph."""
+
+    def __init__(self, name, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.result = None
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class ProvisioningGraph:
+    """A DAG of provisioning steps executed by a thread pool."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.started = None
+        self.finished = None
+
+    def add(self, name, func, deps=()):
+        if name in self.nodes:
+            raise ValueError(f"Duplicate step name: {name}")
+        self.nodes[name] = Node(name, func, deps)
+        return self.nodes[name]
+
+    def _validate(self):
+        for node in self.nodes.values():
+            missing = [d for d in node.deps if d not in self.nodes]
+            if missing:
+                raise ValueError(f"Step '{node.name}' depends on unknown step(s): {', '.join(missing)}")
+
+        # Kahn's algorithm: anything left over is part of a cycle.
+        indegree = {name: len(node.deps) for name, node in self.nodes.items()}
+        ready = [name for name, count in indegree.items() if count == 0]
+        seen = 0
+        while ready:
+            current = ready.pop()
+            seen += 1
+            for node in self.nodes.values():
+                if current in node.deps:
+                    indegree[node.name] -= 1
+                    if indegree[node.name] == 0:
+                        ready.append(node.name)
+        if seen != len(self.nodes):
+            cyclic = sorted(name for name, count in indegree.items() if count > 0)
+            raise ValueError(f"Dependency cycle between steps: {', '.join(cyclic)}")
+
+    def _run_node(self, node):
+        node.started = time.monotonic()
+        try:
+            args = [self.nodes[d].result for d in node.deps]
+            node.result = node.func(*args)
+            return node.result
+        except Exception as e:
+            node.error = e
+            raise
+        finally:
+            node.finished = time.monotonic()
+
+    def run(self, max_workers=8):
+        """Execute every node once all of its dependencies have completed.
+
+        Returns a dict of node name -> result. If a node fails, no new nodes
+        are scheduled, in-flight nodes are allowed to finish and a
+        ProvisioningError is raised for the first failure.
+        """
+        self._validate()
+        self.started = time.monotonic()
+        done, pending, failure = set(), {}, None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while True:
+                if failure is None:
+                    for node in self.nodes.values():
+                        if node.name in done or node.name in pending.values():
+                            continue
+                        if all(d in done for d in node.deps):
+                            pending[pool.submit(self._run_node, node)] = node.name
+
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = pending.pop(future)
+                    if future.exception() is not None:
+                        if failure is None:
+                            failure = ProvisioningError(name, future.exception())
+                    else:
+                        done.add(name)
+
+        self.finished = time.monotonic()
+        if failure is not None:
+            raise failure
+        return {name: node.result for name, node in self.nodes.items()}
+
+    def critical_path(self):
+        """Return the chain of nodes that determined the total wall-clock time."""
+        finished = [n for n in self.nodes.values() if n.finished is not None]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda n: n.finished)]
+        while path[-1].deps:
+            deps = [self.nodes[d] for d in path[-1].deps if self.nodes[d].finished is not None]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda n: n.finished))
+        return list(reversed(path))
+
+    def print_summary(self, title="Provisioning timings"):
+        if self.started is None:
+            return
+        wall = (self.finished or time.monotonic()) - self.started
+        serial = sum(n.duration for n in self.nodes.values())
+
+        print(f"\n⏱️  {title}")
+        print("-" * 40)
+        for node in sorted(self.nodes.values(), key=lambda n: (n.started is None, n.started or 0)):
+            if node.started is None:
+                print(f"   • {node.name:<40} skipped")
+                continue
+            offset = node.started - self.started
+            status = "❌" if node.error else "✅"
+            print(f"   {status} {node.name:<40} +{offset:7.2f}s  {node.duration:7.2f}s")
+
+        path = self.critical_path()
+        print(f"\n🧭 Critical path ({sum(n.duration for n in path):.2f}s): "
+              + " → ".join(n.name for n in path))
+        print(f"⏱️  Wall-clock: {wall:.2f}s (serial would be ~{serial:.2f}s)")
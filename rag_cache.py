@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+RAG Retrieval Cache
+-------------------
+The prebuilt AgenticRagTool is a server-side tool: it runs on the agent
+endpoint inside the chat turn, so every retrieval goes to the knowledge
+base, even when the same question was asked a minute earlier (a batch
+run over a complaint wave, the service answering similar reviews). The
+client cannot intercept those calls, so this module does the retrieval in
+a client-side function tool it can cache:
+
+  - a miss asks the RAG endpoint setup.py provisions (Hotel_Concierge_Agent,
+    whose RAG tool searches the same knowledge base) in a throwaway
+    session; identical misses in flight at the same time share one call
+  - answers and citations are kept in memory, keyed on (knowledge base id,
+    normalised query), bounded by entry count and approximate bytes, least
+    recently used first out
+  - a knowledge base's entries are dropped when one of its data ingestion
+    jobs completes, wherever it was started (setup.py, the console, a
+    scheduled job): every CHECK_INTERVAL seconds IngestionPoller asks the
+    control plane for the latest succeeded job of each cached knowledge
+    base's data sources, outside the cache lock
+  - setup.py also records the ingestions it waited on in INGESTIONS_FILE
+    (mark_ingested), a fast path the cache checks with one os.stat per
+    CHECK_INTERVAL
+  - stats() reports hits, misses, hit rate, evictions, invalidations and polls
+
+Usage:
+  python rag_cache.py generation <kb_id>                # latest succeeded ingestion job of a KB
+  python rag_cache.py mark-ingested <kb_id> <job_id>    # invalidate local caches now, without waiting for a poll
+  python rag_cache.py query "noise at Hana Riverside" --endpoint <rag endpoint> --kb <kb_id> --repeat 3
+
+  result = default_cache().get(kb_id, query, lambda: default_retriever(endpoint_id).retrieve(query))
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import oci
+
+from text_embedding import normalize
+
+INGESTIONS_FILE = "rag_ingestions.json"
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+CHECK_INTERVAL = 30.0
+# Citation text kept per source
+SOURCE_CHARS = 500
+RAG_REGION = "us-chicago-1"
+
+EVICT_LRU = "lru"
+EVICT_MEMORY = "memory"
+
+
+def query_key(query):
+    return " ".join(normalize(query).split())
+
+
+def load_ingestions(path=INGESTIONS_FILE):
+    """Knowledge base id -> the last completed ingestion ({"job", "completed_at"})."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def mark_ingested(kb_id, job_id, path=INGESTIONS_FILE):
+    """Record that an ingestion job of `kb_id` completed; caches drop the KB's entries."""
+    ingestions = load_ingestions(path)
+    ingestions[kb_id] = {"job": job_id, "completed_at": time.time()}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(ingestions, f, indent=2)
+    os.replace(tmp, path)
+
+
+class IngestionPoller:
+    """kb_id -> id of the knowledge base's latest succeeded data ingestion job (None if none yet)."""
+
+    def __init__(self, client=None, profile="DEFAULT", region=RAG_REGION):
+        self._client = client
+        self.profile = profile
+        self.region = region
+        self._lock = threading.Lock()
+
+    def client(self):
+        # Built on first use: constructing a cache must not need an OCI config.
+        with self._lock:
+            if self._client is None:
+                config = dict(oci.config.from_file(profile_name=self.profile), region=self.region)
+                self._client = oci.generative_ai_agent.GenerativeAiAgentClient(
+                    config, retry_strategy=oci.retry.DEFAULT_RETRY_STRATEGY)
+            return self._client
+
+    def __call__(self, kb_id):
+        client = self.client()
+        latest = None
+        data_sources = oci.pagination.list_call_get_all_results(
+            client.list_data_sources, knowledge_base_id=kb_id).data
+        for data_source in data_sources:
+            jobs = client.list_data_ingestion_jobs(
+                data_source_id=data_source.id, lifecycle_state="SUCCEEDED",
+                sort_by="timeCreated", sort_order="DESC", limit=1).data.items
+            if jobs and (latest is None or jobs[0].time_created > latest.time_created):
+                latest = jobs[0]
+        return latest.id if latest else None
+
+
+class Entry:
+    __slots__ = ("result", "bytes")
+
+    def __init__(self, result):
+        self.result = result
+        self.bytes = sys.getsizeof(json.dumps(result, ensure_ascii=False))
+
+
+class RetrievalCache:
+    """Thread-safe LRU of retrieval results, invalidated per knowledge base on ingestion.
+
+    `generation(kb_id)` returns a value that changes when the knowledge base
+    is re-ingested (IngestionPoller); None disables polling and leaves only
+    `ingestions_file`.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ingestions_file=INGESTIONS_FILE,
+                 check_interval=CHECK_INTERVAL, clock=time.monotonic, generation=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ingestions_file = ingestions_file
+        self.generation = generation
+        self.check_interval = check_interval
+        self.clock = clock
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.invalidated = 0
+        self.polls = 0
+        self.poll_errors = 0
+        self.evicted = {EVICT_LRU: 0, EVICT_MEMORY: 0}
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._ingested = {}
+        self._polled = {}
+        self._ingestions_mtime = None
+        self._checked_at = None
+        self._polled_at = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._check_ingestions(force=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _check_ingestions(self, force=False):
+        """Drop the entries of knowledge bases whose ingestion job changed (lock held)."""
+        now = self.clock()
+        if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.ingestions_file).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._ingestions_mtime:
+            return
+        self._ingestions_mtime = mtime
+        ingested = {kb: item.get("job") for kb, item in load_ingestions(self.ingestions_file).items()}
+        changed = {kb for kb, job in ingested.items() if self._ingested.get(kb) != job}
+        self._ingested = ingested
+        if changed:
+            self._drop(lambda key: key[0] in changed)
+
+    def _poll(self, kb_ids):
+        """Ask `generation` about each knowledge base (lock not held) and drop the ones that changed."""
+        polled = {}
+        for kb_id in kb_ids:
+            try:
+                polled[kb_id] = self.generation(kb_id)
+            except Exception as e:
+                # Keep the entries; the next poll tries again.
+                print(f"⚠️ rag_cache: could not poll ingestions of {kb_id}: {e}", file=sys.stderr)
+                with self._lock:
+                    self.poll_errors += 1
+        with self._lock:
+            self.polls += len(polled)
+            changed = {kb for kb, job in polled.items() if kb in self._polled and self._polled[kb] != job}
+            self._polled.update(polled)
+            if changed:
+                self._drop(lambda key: key[0] in changed)
+
+    def _poll_due(self):
+        """Poll every cached knowledge base if CHECK_INTERVAL has passed since the last poll."""
+        if self.generation is None:
+            return
+        with self._lock:
+            now = self.clock()
+            if self._polled_at is not None and now - self._polled_at < self.check_interval:
+                return
+            self._polled_at = now
+            kb_ids = {key[0] for key in self._entries} | {key[0] for key in self._inflight}
+        self._poll(kb_ids)
+
+    def _generation(self, kb_id):
+        return self._ingested.get(kb_id), self._polled.get(kb_id)
+
+    def _drop(self, matches):
+        for key in [key for key in self._entries if matches(key)]:
+            self.bytes -= self._entries.pop(key).bytes
+            self.invalidated += 1
+
+    def _store(self, key, result):
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key).bytes
+        entry = Entry(result)
+        self._entries[key] = entry
+        self.bytes += entry.bytes
+        while len(self._entries) > self.max_entries:
+            self.bytes -= self._entries.popitem(last=False)[1].bytes
+            self.evicted[EVICT_LRU] += 1
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            self.bytes -= self._entries.popitem(last=False)[1].bytes
+            self.evicted[EVICT_MEMORY] += 1
+
+    def get(self, kb_id, query, retrieve):
+        """The cached result of `query` on `kb_id`, else retrieve() (called once per concurrent miss)."""
+        key = (kb_id, query_key(query))
+        self._poll_due()
+        with self._lock:
+            self._check_ingestions()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+                baseline = self.generation is not None and kb_id not in self._polled
+            else:
+                self.shared += 1
+        if not owner:
+            return future.result()
+        try:
+            if baseline:
+                # First retrieval from this knowledge base: know its current job before caching.
+                self._poll([kb_id])
+            with self._lock:
+                generation = self._generation(kb_id)
+            result = retrieve()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            self._check_ingestions(force=True)
+            # A retrieval that overlapped an ingestion may have read the old data.
+            if self._generation(kb_id) == generation:
+                self._store(key, result)
+        future.set_result(result)
+        return result
+
+    def invalidate(self, kb_id=None):
+        """Drop every entry (of one knowledge base); returns how many went."""
+        with self._lock:
+            before = self.invalidated
+            self._drop(lambda key: kb_id is None or key[0] == kb_id)
+            return self.invalidated - before
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.shared
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "hit_rate": round((self.hits + self.shared) / lookups, 3) if lookups else 0.0,
+                "evicted": dict(self.evicted),
+                "invalidated": self.invalidated,
+                "polls": self.polls,
+                "poll_errors": self.poll_errors,
+            }
+
+
+class EndpointRetriever:
+    """Retrieval through a RAG agent endpoint, one throwaway session per query."""
+
+    def __init__(self, endpoint_id, profile="DEFAULT", region=RAG_REGION):
+        self.endpoint_id = endpoint_id
+        self.config = dict(oci.config.from_file(profile_name=profile), region=region)
+        self._local = threading.local()
+
+    def _client(self):
+        # One client per thread: batch and service workers retrieve concurrently.
+        if not hasattr(self._local, "client"):
+            self._local.client = oci.generative_ai_agent_runtime.GenerativeAiAgentRuntimeClient(self.config)
+        return self._local.client
+
+    def retrieve(self, query):
+        """{"answer", "citations": [{"title", "url", "text"}]} for a query."""
+        models = oci.generative_ai_agent_runtime.models
+        client = self._client()
+        session = client.create_session(models.CreateSessionDetails(display_name="rag-cache"), self.endpoint_id).data
+        try:
+            chat = client.chat(self.endpoint_id, models.ChatDetails(user_message=query, session_id=session.id,
+                                                                     should_stream=False)).data
+        finally:
+            client.delete_session(self.endpoint_id, session.id)
+        content = chat.message.content if chat.message else None
+        citations = [{"title": c.title, "url": getattr(c.source_location, "url", None),
+                      "text": (c.source_text or "")[:SOURCE_CHARS]} for c in (content.citations or [])] if content else []
+        return {"answer": content.text if content else "", "citations": citations}
+
+
+@functools.lru_cache(maxsize=None)
+def default_cache():
+    return RetrievalCache(generation=IngestionPoller())
+
+
+@functools.lru_cache(maxsize=None)
+def default_retriever(endpoint_id):
+    return EndpointRetriever(endpoint_id)
+
+
+def cached_retrieval(kb_id, endpoint_id, query):
+    """Retrieve `query` from `kb_id` through its RAG endpoint, via the default cache."""
+    return default_cache().get(kb_id, query, lambda: default_retriever(endpoint_id).retrieve(query))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client-side cache of knowledge base retrievals")
+    parser.add_argument("--ingestions", default=INGESTIONS_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    mark = sub.add_parser("mark-ingested", help="Record a completed ingestion job (invalidates the KB's entries)")
+    mark.add_argument("kb_id")
+    mark.add_argument("job_id")
+    generation = sub.add_parser("generation", help="Show the latest succeeded ingestion job of a knowledge base")
+    generation.add_argument("kb_id")
+    query = sub.add_parser("query", help="Retrieve through the cache and show its stats")
+    query.add_argument("query")
+    query.add_argument("--endpoint", default=os.getenv("RAG_ENDPOINT_ID"), help="RAG agent endpoint OCID")
+    query.add_argument("--kb", default=os.getenv("KNOWLEDGE_BASE_ID"), help="Knowledge base OCID")
+    query.add_argument("--repeat", type=int, default=2)
+    query.add_argument("--no-poll", action="store_true", help="Only invalidate through the ingestions file")
+    args = parser.parse_args()
+
+    if args.command == "generation":
+        print(IngestionPoller()(args.kb_id) or "no succeeded ingestion job")
+        return
+
+    if args.command == "mark-ingested":
+        mark_ingested(args.kb_id, args.job_id, args.ingestions)
+        print(f"✅ Recorded ingestion {args.job_id} for {args.kb_id} in {args.ingestions}")
+        return
+
+    if not args.endpoint or not args.kb:
+        parser.error("--endpoint and --kb (or RAG_ENDPOINT_ID and KNOWLEDGE_BASE_ID) are required")
+    cache = RetrievalCache(ingestions_file=args.ingestions, generation=None if args.no_poll else IngestionPoller())
+    retriever = EndpointRetriever(args.endpoint)
+    for attempt in range(1, args.repeat + 1):
+        started = time.perf_counter()
+        result = cache.get(args.kb, args.query, lambda: retriever.retrieve(args.query))
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🔎 #{attempt}: {len(result['citations'])} citation(s) in {elapsed:.1f} ms")
+    print(f"   {result['answer'][:200]}")
+    print(f"📊 {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Review Corpus Helpers
+---------------------
+Parses the TripAdvisor review dump used by the lab into individual reviews.
+
+The dataset is a plain text file made of blocks like:
+
+    Title: <title>
+    Review: <text>
+
+separated by blank lines. Each parsed review keeps its character offset in
+the source file, a best-effort language tag and any hotel names mentioned
+in its text.
+
+Incoming reviews can also come as JSON lines with "review" (or "text"),
+and optionally "title", "hotel" and "received" (ISO 8601 or epoch
+seconds); load_reviews() reads either format.
+"""
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime, timezone
+
+CORPUS_FILE = "TripAdvisorReviewsMultiLangCSV_to_text_small.txt"
+
+# Words that describe a property type. A hotel mention is a run of
+# capitalised words right before or right after one of these.
+PROPERTY_WORDS = (
+    "hotel", "resort", "guesthouse", "guest house", "homestay", "hostel",
+    "villa", "inn", "khách sạn", "nhà nghỉ",
+)
+
+# Capitalised words that commonly precede a property word but are not names.
+NAME_STOPWORDS = {
+    "a", "an", "the", "this", "that", "our", "your", "good", "great", "nice",
+    "lovely", "very", "best", "new", "small", "little", "beautiful", "awesome",
+    "excellent", "extreme", "shabby", "amazing", "perfect", "cheap", "clean",
+    "friendly", "recommended", "recomended", "superbe", "super", "das", "der",
+    "die", "dem", "den", "ein", "eine", "le", "la", "les", "un", "une", "cette",
+    "ce", "cet", "el", "il", "het", "de", "gepflegtes", "schönes", "tolles",
+    "wonderful", "quiet", "budget", "family", "boutique", "big", "homely",
+    "cute", "charming", "stay", "stayed", "in", "at", "from", "to", "of",
+    "fantastic", "average", "terrible", "comfortable", "central", "vietnamese",
+    "dieses", "diese", "dieser", "ce", "ho", "hôtel", "một", "các", "tốt",
+    "chủ", "việt", "khách", "nhà", "là", "và", "ở", "này",
+}
+
+LANGUAGE_STOPWORDS = {
+    "en": {"the", "and", "was", "were", "very", "with", "room", "we", "is", "for"},
+    "de": {"und", "der", "die", "das", "nicht", "sehr", "ist", "wir", "mit", "ein"},
+    "fr": {"et", "le", "la", "les", "est", "très", "nous", "une", "pour", "avec"},
+    "es": {"el", "los", "las", "muy", "con", "que", "una", "por", "habitación", "pero"},
+    "it": {"il", "molto", "con", "che", "una", "per", "della", "camera", "sono", "non"},
+    "nl": {"het", "een", "en", "zeer", "met", "van", "niet", "wij", "kamer", "goed"},
+}
+
+# Letters that only appear in Vietnamese among the languages in the corpus.
+VIETNAMESE_CHARS = set("ăâđêôơưạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịọỏốồổỗộớờởỡợụủứừửữựỳỵỷỹ")
+
+_NAME_TOKEN = r"[A-Z][\w'&\-]*"
+_PROPERTY_ALT = "|".join(re.escape(w) for w in PROPERTY_WORDS)
+_NAME_BEFORE_RE = re.compile(
+    rf"((?:{_NAME_TOKEN}\s+){{1,5}})(?i:{_PROPERTY_ALT})\b"
+)
+_NAME_AFTER_RE = re.compile(
+    rf"\b(?i:{_PROPERTY_ALT})\s+((?:{_NAME_TOKEN}\s*){{1,5}})"
+)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Review:
+    """A single review block parsed from the corpus."""
+
+    __slots__ = ("index", "offset", "length", "title", "text", "language", "hotels")
+
+    def __init__(self, index, offset, length, title, text):
+        self.index = index
+        self.offset = offset
+        self.length = length
+        self.title = title
+        self.text = text
+        self.language = detect_language(f"{title} {text}")
+        self.hotels = extract_hotel_mentions(f"{title}. {text}")
+
+    def to_text(self):
+        """Render the review back into the corpus block format."""
+        return f"Title: {self.title}\nReview: {self.text}\n"
+
+
+def iter_reviews(file_path=CORPUS_FILE):
+    """Yield Review objects from the corpus, in file order."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    yield from parse_reviews(content)
+
+
+def parse_reviews(content):
+    """Yield Review objects from a corpus string."""
+    index = 0
+    offset = 0
+    for block in re.split(r"(\n\s*\n)", content):
+        start = offset
+        offset += len(block)
+        if not block.strip() or not block.lstrip().startswith("Title:"):
+            continue
+        title, sep, text = block.strip().partition("\nReview:")
+        if not sep:
+            continue
+        yield Review(index, start, len(block), title[len("Title:"):].strip(), text.strip())
+        index += 1
+
+
+def parse_received(value):
+    """ISO 8601 string (UTC unless it has an offset) or epoch seconds -> epoch seconds (None stays None)."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def load_reviews(path):
+    """(reviews, hotels, received) from a corpus file or a JSON lines file."""
+    if not path.endswith(".jsonl"):
+        reviews = list(iter_reviews(path))
+        return reviews, [None] * len(reviews), [None] * len(reviews)
+    reviews, hotels, received = [], [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            text = item.get("review") or item.get("text") or ""
+            reviews.append(Review(len(reviews), 0, len(text), item.get("title") or "", text))
+            hotels.append(item.get("hotel"))
+            received.append(parse_received(item.get("received")))
+    return reviews, hotels, received
+
+
+def detect_language(text):
+    """Return a best-effort ISO 639-1 language code for a review."""
+    lowered = text.lower()
+    if sum(1 for ch in lowered if ch in VIETNAMESE_CHARS) >= 3:
+        return "vi"
+
+    words = Counter(_WORD_RE.findall(lowered))
+    scores = {
+        lang: sum(words[w] for w in stopwords)
+        for lang, stopwords in LANGUAGE_STOPWORDS.items()
+    }
+    lang, score = max(scores.items(), key=lambda item: item[1])
+    return lang if score else "unknown"
+
+
+def _clean_name(raw):
+    tokens = raw.split()
+    while tokens and tokens[0].lower() in NAME_STOPWORDS:
+        tokens.pop(0)
+    while tokens and tokens[-1].lower() in NAME_STOPWORDS:
+        tokens.pop()
+    if not tokens or not all(t[0].isupper() for t in tokens):
+        return None
+    name = " ".join(tokens).strip(" .,;:!?'\"")
+    return name if len(name) > 2 else None
+
+
+def extract_hotel_mentions(text):
+    """Return the hotel names mentioned in a piece of text, in order of appearance."""
+    found = []
+    for regex in (_NAME_BEFORE_RE, _NAME_AFTER_RE):
+        for match in regex.finditer(text):
+            name = _clean_name(match.group(1))
+            if name and name not in found:
+                found.append(name)
+    return found
+
+
+def ascii_fold(value):
+    """Strip accents so a value can travel in an HTTP header."""
+    folded = unicodedata.normalize("NFKD", value.replace("đ", "d").replace("Đ", "D"))
+    return folded.encode("ascii", "ignore").decode("ascii")
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Review Triage
+-------------
+Most reviews in the corpus ("Lovely stay", "Good room") need a thank-you,
+not an apology drafted by the concierge agent. This module scores every
+review locally, in vectorised NumPy batches, so only the ones that need
+attention reach agent.run:
+
+  p_negative  how likely the guest is unhappy
+  p_severe    how likely the review reports an incident (hygiene, pests,
+              safety, theft, illness, billing disputes)
+
+The corpus has no ratings, so the model is trained on weak labels:
+
+  1. multilingual seed lexicons (words and negated bigrams, accent-folded)
+     label the reviews they are confident about
+  2. a class-weighted logistic regression per score is fitted on the
+     hashed, IDF-weighted features of text_embedding.py, so it also picks
+     up the words that co-occur with the seeds, and scores reviews that
+     contain no seed word at all
+
+  3. each head is calibrated on the held-out reviews (Platt scaling), so
+     its probability tracks how often such reviews are actually labelled
+     negative / severe instead of hovering around 0.5 when a short review
+     has few features the head has seen
+
+A review is escalated when p_negative >= threshold or p_severe >=
+severity_threshold, and always when the lexicons flag it (an incident
+seed, or more negative than positive seeds): the model adds recall, it
+never overrides a "bed bugs". The others get a template response
+(template_response) in their language.
+
+Usage:
+  python review_triage.py train --out triage_model.npz
+  python review_triage.py score --limit 20
+  python review_triage.py score --model triage_model.npz --threshold 0.6
+
+  model = default_model()
+  scores = model.score_many(texts)              # TriageScores of arrays
+  escalate = scores.escalate(threshold=0.5)     # boolean mask
+"""
+
+import argparse
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from review_corpus import CORPUS_FILE, iter_reviews
+from text_embedding import BATCH_SIZE, HashingEmbedder, default_embedder, tokenize
+
+NEGATIVE_THRESHOLD = 0.5
+SEVERITY_THRESHOLD = 0.5
+# Lexicon score a review needs (either way) to be used as a training label
+LABEL_MARGIN = 2
+EPOCHS = 300
+LEARNING_RATE = 0.5
+L2 = 1e-4
+HOLDOUT = 0.2
+# Scores below this get the warm "thank you" template, the rest the neutral one
+POSITIVE_CUTOFF = 0.2
+
+# Seeds are matched against accent-folded words and word bigrams (not the
+# character n-grams, or "vole" would match "piacevole"), so they are written
+# folded: "thất vọng" -> "that vong".
+POSITIVE_SEEDS = {
+    # en
+    "great", "excellent", "amazing", "wonderful", "lovely", "perfect", "fantastic", "friendly", "helpful",
+    "beautiful", "recommend", "recommended", "comfortable", "clean", "awesome", "superb", "best", "enjoyed",
+    "relaxing", "peaceful", "delicious", "spotless", "outstanding", "gem", "paradise", "highly recommend",
+    "would recommend", "will return", "come back", "good value",
+    # fr
+    "excellent", "magnifique", "superbe", "parfait", "agreable", "charmant", "accueillant", "recommande",
+    "merveilleux", "propre", "tres bien", "genial", "delicieux",
+    # de
+    "toll", "super", "sehr gut", "wunderbar", "empfehlenswert", "freundlich", "sauber", "perfekt",
+    "hervorragend", "ausgezeichnet", "gemutlich",
+    # nl / it / es
+    "prachtig", "geweldig", "aanrader", "vriendelijk", "schoon", "fantastisch",
+    "bellissimo", "ottimo", "consigliato", "pulito", "gentile", "stupendo", "perfetto",
+    "excelente", "maravilloso", "recomendable", "limpio", "amable", "precioso", "perfecto",
+    # vi
+    "tuyet voi", "rat tot", "tot nhat", "sach se", "than thien", "dang yeu", "thoai mai", "xinh dep",
+    "hai long", "nhiet tinh", "yen binh", "tuyet dep", "dang gia", "rat dep", "tuyet hao",
+}
+NEGATIVE_SEEDS = {
+    # en
+    "worst", "terrible", "horrible", "awful", "dirty", "rude", "disappointing", "disappointed", "noisy",
+    "noise", "filthy", "smelly", "smell", "broken", "poor", "avoid", "unacceptable", "disgusting", "unfriendly",
+    "overpriced", "uncomfortable", "complaint", "complained", "mould", "mold", "stained", "cockroach",
+    "cockroaches", "bugs", "never again", "not clean", "not worth", "not recommend", "no hot", "would not",
+    "waste of", "do not", "did not work", "not working",
+    # fr
+    "sale", "bruyant", "bruit", "decevant", "decu", "horrible", "deplorable", "catastrophique", "eviter",
+    "odeur", "pas propre", "pas terrible", "a eviter", "desagreable", "cafards",
+    # de
+    "schmutzig", "laut", "enttauschend", "enttauscht", "unfreundlich", "schrecklich", "katastrophe",
+    "nicht sauber", "nicht empfehlenswert", "dreckig", "kaputt", "schimmel", "larm",
+    # nl / it / es
+    "vies", "lawaai", "teleurstellend", "teleurgesteld", "onvriendelijk",
+    "sporco", "rumoroso", "deludente", "pessimo", "scortese",
+    "sucio", "ruidoso", "decepcionante", "pesimo", "horrible",
+    # vi
+    "that vong", "rat te", "khong sach", "khong tot", "ban thiu", "on ao", "kho ngu", "te nhat",
+    "khong nen", "khong hai long", "lua dao", "khong dang",
+}
+SEVERE_SEEDS = {
+    # en
+    "bed bugs", "bedbugs", "bed bug", "cockroach", "cockroaches", "rats", "mice", "mould", "mold",
+    "food poisoning", "sick", "ill", "vomiting", "diarrhea", "hospital", "injured", "injury", "unsafe",
+    "dangerous", "stolen", "theft", "robbed", "police", "scam", "overcharged", "refund", "fraud", "harassed",
+    "fire", "flood", "flooded", "electric shock", "no water", "no electricity", "lawyer",
+    # fr
+    "punaises", "cafards", "malade", "intoxication", "vole", "arnaque", "remboursement", "dangereux",
+    # de
+    "wanzen", "kakerlaken", "krank", "gestohlen", "betrug", "gefahrlich", "polizei", "schimmel",
+    # nl / it / es
+    "kakkerlakken", "ziek", "gestolen", "scarafaggi", "cimici", "rubato", "truffa",
+    "cucarachas", "chinches", "robado", "estafa", "enfermo",
+    # vi
+    "con gian", "con rep", "ngo doc", "mat trom", "bi trom", "lua dao", "nam moc", "nguy hiem", "cong an",
+}
+
+TEMPLATES = {
+    "en": {
+        "positive": "Dear guest,\n\nThank you so much for your kind review{hotel}. We are delighted you enjoyed "
+                    "your stay, and we look forward to welcoming you back.\n\nWarm regards,\nGuest Relations",
+        "neutral": "Dear guest,\n\nThank you for taking the time to share your feedback{hotel}. We have passed "
+                   "your comments on to the team so we can keep improving.\n\nKind regards,\nGuest Relations",
+    },
+    "fr": {
+        "positive": "Cher client,\n\nMerci beaucoup pour votre avis{hotel}. Nous sommes ravis que votre séjour "
+                    "vous ait plu et espérons vous accueillir à nouveau.\n\nCordialement,\nService clients",
+        "neutral": "Cher client,\n\nMerci d'avoir pris le temps de partager votre avis{hotel}. Vos remarques ont "
+                   "été transmises à l'équipe afin de continuer à nous améliorer.\n\nCordialement,\nService clients",
+    },
+    "de": {
+        "positive": "Liebe Gäste,\n\nvielen Dank für Ihre freundliche Bewertung{hotel}. Es freut uns sehr, dass "
+                    "Ihnen Ihr Aufenthalt gefallen hat.\n\nHerzliche Grüße\nGästeservice",
+        "neutral": "Liebe Gäste,\n\nvielen Dank für Ihr Feedback{hotel}. Wir haben Ihre Anmerkungen an unser Team "
+                   "weitergegeben.\n\nFreundliche Grüße\nGästeservice",
+    },
+    "vi": {
+        "positive": "Kính gửi quý khách,\n\nCảm ơn quý khách đã dành lời khen{hotel}. Chúng tôi rất vui vì quý "
+                    "khách đã có kỳ nghỉ dễ chịu và mong được đón tiếp quý khách lần sau.\n\nTrân trọng,\n"
+                    "Bộ phận chăm sóc khách hàng",
+        "neutral": "Kính gửi quý khách,\n\nCảm ơn quý khách đã chia sẻ nhận xét{hotel}. Chúng tôi đã ghi nhận "
+                   "góp ý của quý khách để cải thiện dịch vụ.\n\nTrân trọng,\nBộ phận chăm sóc khách hàng",
+    },
+}
+_HOTEL_SUFFIX = {"en": " of {}", "fr": " sur {}", "de": " zu {}", "vi": " về {}"}
+
+
+class TriageScores:
+    """Scores of a batch of reviews, one array entry per review."""
+
+    def __init__(self, p_negative, p_severe, flagged=None):
+        self.p_negative = p_negative
+        self.p_severe = p_severe
+        # Reviews the seed lexicons escalate regardless of the model
+        self.flagged = np.zeros(len(p_negative), dtype=bool) if flagged is None else flagged
+
+    def __len__(self):
+        return len(self.p_negative)
+
+    def escalate(self, threshold=NEGATIVE_THRESHOLD, severity_threshold=SEVERITY_THRESHOLD):
+        """Boolean mask of the reviews that need the concierge agent."""
+        return (self.p_negative >= threshold) | (self.p_severe >= severity_threshold) | self.flagged
+
+    def to_dict(self, index):
+        return {"p_negative": round(float(self.p_negative[index]), 3),
+                "p_severe": round(float(self.p_severe[index]), 3),
+                "flagged": bool(self.flagged[index])}
+
+
+def _lexicon_score(text):
+    """(positive minus negative seed score, whether an incident seed appears) of a text."""
+    tokens = tokenize(text)
+    found = set(tokens).union(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    # Negated bigrams ("not clean") outweigh the positive word they contain.
+    negative = sum(2 if " " in seed else 1 for seed in NEGATIVE_SEEDS & found)
+    return len(POSITIVE_SEEDS & found) - negative, bool(SEVERE_SEEDS & found)
+
+
+def seed_labels(texts):
+    """Weak (sentiment, severe) labels from the seed lexicons.
+
+    sentiment is +1 / -1 for reviews whose lexicon score clears LABEL_MARGIN,
+    0 for the ones left unlabelled; severe is True when an incident seed
+    appears in a review that is not clearly positive.
+    """
+    sentiment = np.zeros(len(texts), dtype=np.int8)
+    severe = np.zeros(len(texts), dtype=bool)
+    for i, text in enumerate(texts):
+        score, incident = _lexicon_score(text)
+        if abs(score) >= LABEL_MARGIN:
+            sentiment[i] = 1 if score > 0 else -1
+        severe[i] = incident and score < LABEL_MARGIN
+    return sentiment, severe
+
+
+def lexicon_flags(texts):
+    """Mask of the reviews to escalate whatever the model says.
+
+    A review is flagged for an incident seed (unless it is clearly
+    positive) or for more negative than positive seeds.
+    """
+    flags = np.zeros(len(texts), dtype=bool)
+    for i, text in enumerate(texts):
+        score, incident = _lexicon_score(text)
+        flags[i] = score < 0 or (incident and score < LABEL_MARGIN)
+    return flags
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+def fit_logistic(x, y, epochs=EPOCHS, learning_rate=LEARNING_RATE, l2=L2):
+    """Class-balanced L2 logistic regression by full-batch gradient descent (Adam).
+
+    Returns (weights, bias).
+    """
+    y = y.astype(np.float32)
+    positives = max(float(y.sum()), 1.0)
+    negatives = max(len(y) - positives, 1.0)
+    sample_weight = np.where(y > 0, len(y) / (2 * positives), len(y) / (2 * negatives)).astype(np.float32)
+    weights = np.zeros(x.shape[1], dtype=np.float32)
+    bias = 0.0
+    m = np.zeros_like(weights)
+    v = np.zeros_like(weights)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for step in range(1, epochs + 1):
+        error = (_sigmoid(x @ weights + bias) - y) * sample_weight
+        grad = x.T @ error / len(y) + l2 * weights
+        bias -= learning_rate * 0.1 * float(error.mean())
+        m = beta1 * m + (1 - beta1) * grad
+        v = beta2 * v + (1 - beta2) * grad * grad
+        weights -= learning_rate * 0.01 * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+    return weights, bias
+
+
+def fit_calibration(logits, y, steps=25):
+    """Platt scaling by Newton's method: (scale, offset) with sigmoid(scale * logit + offset) ~ P(y).
+
+    Unweighted, so the probabilities follow the labels' real frequency.
+    Returns (1, 0) when `y` has a single class.
+    """
+    if not 0 < y.sum() < len(y):
+        return 1.0, 0.0
+    x = np.stack([logits, np.ones_like(logits)], axis=1).astype(np.float64)
+    y = y.astype(np.float64)
+    theta = np.array([1.0, 0.0])
+    for _ in range(steps):
+        p = _sigmoid(x @ theta)
+        hessian = x.T @ (x * (p * (1 - p))[:, None]) + 1e-6 * np.eye(2)
+        theta -= np.linalg.solve(hessian, x.T @ (p - y))
+    return float(theta[0]), float(theta[1])
+
+
+class TriageModel:
+    """Two logistic heads (negative, severe) over hashed review embeddings."""
+
+    def __init__(self, embedder, weights, bias):
+        self.embedder = embedder
+        # (dim, 2): column 0 scores negativity, column 1 severity.
+        self.weights = weights
+        self.bias = bias
+        self.report = {}
+
+    @classmethod
+    def train(cls, texts, embedder=None, holdout=HOLDOUT, seed=0):
+        """Fit both heads on the weak labels of `texts`; self.report holds held-out agreement."""
+        embedder = embedder or default_embedder()
+        sentiment, severe = seed_labels(texts)
+        x = embedder.embed_many(texts)
+        rng = np.random.default_rng(seed)
+        test = rng.random(len(texts)) < holdout
+        labelled = (sentiment != 0) & ~test
+        w_neg, b_neg = fit_logistic(x[labelled], sentiment[labelled] < 0)
+        w_sev, b_sev = fit_logistic(x[~test], severe[~test])
+        weights = np.stack([w_neg, w_sev], axis=1)
+        bias = np.array([b_neg, b_sev], dtype=np.float32)
+
+        # Calibrate on reviews neither head was fitted on; the scaling folds into the weights.
+        held_out = sentiment[test] != 0
+        logits = x[test] @ weights + bias
+        scale_neg, offset_neg = fit_calibration(logits[held_out, 0], sentiment[test][held_out] < 0)
+        scale_sev, offset_sev = fit_calibration(logits[:, 1], severe[test])
+        scale = np.array([scale_neg, scale_sev], dtype=np.float32)
+        model = cls(embedder, weights * scale, bias * scale + np.array([offset_neg, offset_sev], dtype=np.float32))
+
+        scores = model._probabilities(x[test])
+        model.report = {
+            "reviews": len(texts),
+            "labelled": int((sentiment != 0).sum()),
+            "weak_negative": int((sentiment < 0).sum()),
+            "weak_severe": int(severe.sum()),
+            "holdout_sentiment_agreement": round(float(
+                ((scores[held_out, 0] >= 0.5) == (sentiment[test][held_out] < 0)).mean()), 3) if held_out.any() else None,
+            "holdout_severe_recall": round(float(
+                (scores[severe[test], 1] >= 0.5).mean()), 3) if severe[test].any() else None,
+        }
+        return model
+
+    def _probabilities(self, x):
+        return _sigmoid(x @ self.weights + self.bias)
+
+    def score_many(self, texts, batch_size=BATCH_SIZE * 4, workers=1):
+        """Score texts in vectorised batches, spread over `workers` processes.
+
+        Feature extraction is per-text Python and takes nearly all of the
+        time, so large batches scale with processes rather than threads.
+        """
+        p = np.empty((len(texts), 2), dtype=np.float32)
+        starts = range(0, len(texts), batch_size)
+        batches = [texts[start:start + batch_size] for start in starts]
+        if workers > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+                results = pool.map(_score_batch, batches)
+                for start, probabilities in zip(starts, results):
+                    p[start:start + len(probabilities)] = probabilities
+        else:
+            for start, batch in zip(starts, batches):
+                p[start:start + len(batch)] = self._probabilities(self.embedder.embed_many(batch))
+        return TriageScores(p[:, 0], p[:, 1], lexicon_flags(texts))
+
+    def score(self, text):
+        scores = self.score_many([text])
+        return scores.to_dict(0)
+
+    def save(self, path):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, dim=self.embedder.dim,
+                            idf=self.embedder.idf if self.embedder.idf is not None else np.zeros(0, np.float32))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        idf = data["idf"] if len(data["idf"]) else None
+        return cls(HashingEmbedder(dim=int(data["dim"]), idf=idf), data["weights"], data["bias"])
+
+
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _score_batch(texts):
+    return _worker_model._probabilities(_worker_model.embedder.embed_many(texts))
+
+
+def review_text(review):
+    return f"{review.title}. {review.text}"
+
+
+@functools.lru_cache(maxsize=None)
+def default_model(path=None, corpus_file=CORPUS_FILE):
+    """The model saved at `path`, else one trained on the corpus (a few seconds)."""
+    if path and os.path.exists(path):
+        return TriageModel.load(path)
+    return TriageModel.train([review_text(r) for r in iter_reviews(corpus_file)])
+
+
+def template_response(review, p_negative):
+    """Template reply for a review that does not need the agent, in its language (English otherwise)."""
+    language = review.language if review.language in TEMPLATES else "en"
+    tone = "positive" if p_negative < POSITIVE_CUTOFF else "neutral"
+    hotel = _HOTEL_SUFFIX[language].format(review.hotels[0]) if review.hotels else ""
+    return TEMPLATES[language][tone].format(hotel=hotel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local sentiment/severity triage of hotel reviews")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="Train on the corpus weak labels and save the model")
+    train.add_argument("--corpus", default=CORPUS_FILE)
+    train.add_argument("--out", default="triage_model.npz")
+    score = sub.add_parser("score", help="Score corpus reviews and show which ones would be escalated")
+    score.add_argument("--corpus", default=CORPUS_FILE)
+    score.add_argument("--model", help="Saved model (trained on the corpus if omitted)")
+    score.add_argument("--threshold", type=float, default=NEGATIVE_THRESHOLD)
+    score.add_argument("--severity-threshold", type=float, default=SEVERITY_THRESHOLD)
+    score.add_argument("--limit", type=int, default=10, help="Escalated reviews to print")
+    score.add_argument("--workers", type=int, default=1, help="Scoring processes")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        started = time.perf_counter()
+        model = TriageModel.train([review_text(r) for r in iter_reviews(args.corpus)])
+        model.save(args.out)
+        print(f"✅ Trained in {time.perf_counter() - started:.1f}s, saved to {args.out}")
+        for key, value in model.report.items():
+            print(f"   {key:<30}{value}")
+        return
+
+    model = default_model(args.model)
+    reviews = list(iter_reviews(args.corpus))
+    started = time.perf_counter()
+    scores = model.score_many([review_text(r) for r in reviews], workers=args.workers)
+    elapsed = time.perf_counter() - started
+    escalate = scores.escalate(args.threshold, args.severity_threshold)
+    print(f"📊 {len(reviews)} reviews scored in {elapsed:.2f}s ({len(reviews) / elapsed:,.0f}/s)")
+    print(f"   {int(escalate.sum())} escalated to the agent, {int((~escalate).sum())} answered from templates "
+          f"({(~escalate).mean():.0%} of agent runs avoided)")
+    order = np.argsort(-np.maximum(scores.p_negative, scores.p_severe))
+    for i in order[:args.limit]:
+        print(f"   neg {scores.p_negative[i]:.2f}  sev {scores.p_severe[i]:.2f}  [{reviews[i].language}] "
+              f"{reviews[i].title[:70]}")
+
+
+if __name__ == "__main__":
+    main()
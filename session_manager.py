@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Concierge Session Manager
+-------------------------
+Maps guest / thread ids to ADK agent sessions, so a follow-up question
+about the same guest continues the conversation the agent already has
+instead of re-sending all of the context in a fresh one.
+
+Live sessions are bounded three ways:
+
+  - max_sessions: least recently used sessions are evicted first
+  - idle_ttl:     sessions idle for longer are evicted by sweep()
+  - max_bytes:    every session keeps a local transcript of its turns and
+                  its approximate size; over the budget, LRU sessions go
+
+A session in use by a running turn is never evicted. Evicted sessions are
+handed to on_evict (the service deletes them on the agent endpoint, which
+caps its own number of sessions too).
+
+Usage:
+  sessions = SessionManager(max_sessions=256, idle_ttl=1800)
+  session = sessions.acquire("guest-1234")
+  try:
+      response = agent.run(prompt, session_id=session.session_id)
+      sessions.record(session, response.session_id, prompt, response.final_output)
+  finally:
+      sessions.release(session)
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_IDLE_TTL = 30 * 60.0
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Turns kept per session; older ones are dropped from the local transcript
+# (the agent endpoint keeps the full conversation).
+MAX_TURNS = 50
+
+EVICT_LRU = "lru"
+EVICT_IDLE = "idle"
+EVICT_MEMORY = "memory"
+EVICT_CLOSED = "closed"
+
+
+class Turn:
+    __slots__ = ("prompt", "answer", "at")
+
+    def __init__(self, prompt, answer, at):
+        self.prompt = prompt
+        self.answer = answer
+        self.at = at
+
+    @property
+    def size(self):
+        return sys.getsizeof(self.prompt) + sys.getsizeof(self.answer or "")
+
+
+class Session:
+    """A guest's conversation: its ADK session id and local transcript."""
+
+    def __init__(self, key, now):
+        self.key = key
+        self.session_id = None
+        self.created = now
+        self.last_used = now
+        self.turns = []
+        self.bytes = sys.getsizeof(key)
+        self.in_use = 0
+        # Turns of one conversation must not interleave on the endpoint.
+        self.lock = threading.Lock()
+
+    def idle_for(self, now):
+        return now - self.last_used
+
+    def summary(self, now):
+        return {
+            "key": self.key,
+            "session_id": self.session_id,
+            "turns": len(self.turns),
+            "bytes": self.bytes,
+            "age_s": round(now - self.created),
+            "idle_s": round(self.idle_for(now)),
+        }
+
+
+class SessionManager:
+    """Thread-safe LRU + idle-TTL store of concierge sessions."""
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS, idle_ttl=DEFAULT_IDLE_TTL, max_bytes=DEFAULT_MAX_BYTES,
+                 on_evict=None, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.clock = clock
+        self.bytes = 0
+        self.created = 0
+        self.reused = 0
+        self.evicted = {EVICT_LRU: 0, EVICT_IDLE: 0, EVICT_MEMORY: 0, EVICT_CLOSED: 0}
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def acquire(self, key):
+        """The session for `key` (new if unknown or evicted), pinned until release()."""
+        evicted = []
+        with self._lock:
+            now = self.clock()
+            session = self._sessions.get(key)
+            if session is not None and session.in_use == 0 and session.idle_for(now) > self.idle_ttl:
+                evicted.append(self._remove(session, EVICT_IDLE))
+                session = None
+            if session is None:
+                session = Session(key, now)
+                self._sessions[key] = session
+                self.bytes += session.bytes
+                self.created += 1
+                evicted += self._evict_over(lambda: len(self._sessions) > self.max_sessions, EVICT_LRU)
+            else:
+                self._sessions.move_to_end(key)
+                self.reused += session.session_id is not None
+            session.in_use += 1
+            session.last_used = now
+        self._notify(evicted)
+        return session
+
+    def record(self, session, session_id, prompt, answer):
+        """Remember a finished turn (and the session id the endpoint assigned)."""
+        evicted = []
+        with self._lock:
+            now = self.clock()
+            session.session_id = session_id
+            session.last_used = now
+            turn = Turn(prompt, answer, now)
+            session.turns.append(turn)
+            delta = turn.size
+            while len(session.turns) > MAX_TURNS:
+                delta -= session.turns.pop(0).size
+            session.bytes += delta
+            if self._sessions.get(session.key) is session:
+                self.bytes += delta
+                evicted = self._evict_over(lambda: self.bytes > self.max_bytes, EVICT_MEMORY)
+        self._notify(evicted)
+
+    def release(self, session):
+        with self._lock:
+            session.in_use -= 1
+            session.last_used = self.clock()
+
+    def sweep(self):
+        """Evict every idle session past the TTL; returns how many went."""
+        with self._lock:
+            now = self.clock()
+            idle = [s for s in self._sessions.values() if s.in_use == 0 and s.idle_for(now) > self.idle_ttl]
+            evicted = [self._remove(s, EVICT_IDLE) for s in idle]
+        self._notify(evicted)
+        return len(evicted)
+
+    def close(self):
+        """Evict every session that is not in use."""
+        with self._lock:
+            evicted = [self._remove(s, EVICT_CLOSED) for s in list(self._sessions.values()) if s.in_use == 0]
+        self._notify(evicted)
+
+    def _remove(self, session, reason):
+        del self._sessions[session.key]
+        self.bytes -= session.bytes
+        self.evicted[reason] += 1
+        return session
+
+    def _evict_over(self, over, reason):
+        """Evict least recently used, unpinned sessions while over() holds."""
+        evicted = []
+        for session in list(self._sessions.values()):
+            if not over():
+                break
+            if session.in_use == 0:
+                evicted.append(self._remove(session, reason))
+        return evicted
+
+    def _notify(self, evicted):
+        if self.on_evict:
+            for session in evicted:
+                if session.session_id:
+                    self.on_evict(session)
+
+    def stats(self, top=5):
+        """Counters plus the largest live sessions."""
+        with self._lock:
+            now = self.clock()
+            largest = sorted(self._sessions.values(), key=lambda s: s.bytes, reverse=True)[:top]
+            return {
+                "live": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "idle_ttl_s": self.idle_ttl,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": dict(self.evicted),
+                "largest": [s.summary(now) for s in largest],
+            }
+
+    def get(self, key):
+        """Summary of one session, or None (does not count as use)."""
+        with self._lock:
+            session = self._sessions.get(key)
+            return session.summary(self.clock()) if session else None
@@ -4,14 +4,28 @@ OCI Generative AI Agent Setup Script (Python SDK version)
 ---------------------------------------------------------
 Creates:
   - Object Storage bucket
-  - Uploads dataset file
+  - Uploads dataset file (packed into per-hotel review objects, see kb_packer.py)
   - Knowledge Base
   - Data Source
   - Agent
   - RAG Tool
   - Agent Endpoint
 
-Outputs all OCIDs into GENERATED_OCIDS.txt
+Independent steps run concurrently as a dependency graph (see
+provisioning.py); a timing summary with the critical path is printed
+at the end.
+
+Every run is a named deployment (--deployment, generated if omitted) and
+records its OCIDs in the inventory database (see inventory.py) as each
+step finishes, so many stacks can be created from the same directory and
+cleanup.py can find every one of them, including half-built ones.
+
+Progress is recorded in .setup_state.<deployment>.json (see state_store.py),
+so rerunning with the same --deployment reuses healthy resources and
+resumes after a partial failure instead of creating duplicates. Use
+--fresh to start over; it is refused while the deployment still has
+recorded resources (run cleanup.py --deployment first), so none of them
+lose their inventory rows.
 
 Prerequisites:
   - Python 3.9+
@@ -22,17 +36,30 @@ Prerequisites:
 
 import argparse
 import oci
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+import secrets
+
+from inventory import INVENTORY_FILE, STATUS_ACTIVE, STATUS_PROVISIONING, Inventory, new_deployment_name
+from kb_packer import pack_corpus
+from oci_clients import ClientFactory
+from oci_waiter import wait_for_all, wait_for_ingestion_job, wait_for_lifecycle
+from provisioning import ProvisioningGraph
+from rag_cache import mark_ingested
+from state_store import STATUS_READY, StateStore, file_digest
 
-OCIDS_FILE = "GENERATED_OCIDS.txt"
 #BUCKET_NAME = "ai-workshop-labs-datasets"
 FILE_TO_UPLOAD = "TripAdvisorReviewsMultiLangCSV_to_text_small.txt"
 
 def generate_unique_bucket_name(base_name="ai-workshop-labs-datasets"):
-    """Generate a unique bucket name using timestamp."""
+    """Generate a unique bucket name using timestamp and a random suffix.
+
+    The suffix keeps stacks created in the same second from colliding.
+    """
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    return f"{base_name}-{timestamp}"
+    return f"{base_name}-{timestamp}-{secrets.token_hex(3)}"
 
 
 def create_bucket(os_client, ns, compartment_id, bucket_name):
@@ -78,6 +105,26 @@ def upload_file(os_client, ns, bucket_name, file_path):
     return object_name
 
 
+def upload_packed_reviews(os_client, ns, bucket_name, file_path, max_workers=8):
+    """Pack the corpus into whole-review objects and upload them under a common prefix."""
+    objects = pack_corpus(file_path)
+    prefix = objects[0].name.rsplit("/", 1)[0] + "/" if objects else ""
+    print(f"🔄 Uploading {len(objects)} packed review object(s) to '{bucket_name}/{prefix}'...")
+
+    def put(obj):
+        os_client.put_object(
+            ns, bucket_name, obj.name, obj.body.encode("utf-8"),
+            content_type="text/plain; charset=utf-8",
+            opc_meta=obj.metadata
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(put, objects))
+
+    print(f"✅ Uploaded {len(objects)} packed object(s) with hotel/language metadata")
+    return prefix
+
+
 def create_knowledge_base(agent_client, compartment_id):
     print("🔄 Creating knowledge base...")
     details = oci.generative_ai_agent.models.CreateKnowledgeBaseDetails(
@@ -134,7 +181,7 @@ def create_data_ingestion_job(agent_client, compartment_id, ds_id, kb_id):
     resp = agent_client.create_data_ingestion_job(details)
     ingestion_job_id = resp.data.id
     print(f"✅ Data ingestion job created (ID: {ingestion_job_id})")
-    print("💡 Data ingestion will run in the background. You can monitor progress in the OCI Console.")
+    print("💡 Data ingestion runs in the background; setup waits for it unless --no-wait is given.")
     
     return ingestion_job_id
 
@@ -184,18 +231,187 @@ def create_agent_endpoint(agent_client, compartment_id, agent_id, display_name):
     return endpoint_id
 
 
-def write_ocids(bucket_name, kb_id, ds_id, ingestion_job_id, agent1_id, agent1_endpoint_id, agent1_tool_id, agent2_id, agent2_endpoint_id):
-    with open(OCIDS_FILE, "w") as f:
-        f.write(f"BUCKET_NAME={bucket_name}\n")
-        f.write(f"KNOWLEDGEBASE_ID={kb_id}\n")
-        f.write(f"DATASOURCE_ID={ds_id}\n")
-        f.write(f"DATA_INGESTION_JOB_ID={ingestion_job_id}\n")
-        f.write(f"HOTEL_CONCIERGE_AGENT_ID={agent1_id}\n")
-        f.write(f"HOTEL_CONCIERGE_AGENT_ENDPOINT_ID={agent1_endpoint_id}\n")
-        f.write(f"HOTEL_CONCIERGE_AGENT_RAG_TOOL_ID={agent1_tool_id}\n")
-        f.write(f"HOTEL_CONCIERGE_AGENT_ADK_ID={agent2_id}\n")
-        f.write(f"HOTEL_CONCIERGE_AGENT_ADK_ENDPOINT_ID={agent2_endpoint_id}\n")
-    print(f"✅ All OCIDs written to {OCIDS_FILE}")
+# Provisioning step -> key the OCID is recorded under in the inventory
+OCID_KEYS = {
+    "bucket": "BUCKET_NAME",
+    "knowledge_base": "KNOWLEDGEBASE_ID",
+    "data_source": "DATASOURCE_ID",
+    "ingestion_job": "DATA_INGESTION_JOB_ID",
+    "agent1": "HOTEL_CONCIERGE_AGENT_ID",
+    "agent1_endpoint": "HOTEL_CONCIERGE_AGENT_ENDPOINT_ID",
+    "agent1_rag_tool": "HOTEL_CONCIERGE_AGENT_RAG_TOOL_ID",
+    "agent2": "HOTEL_CONCIERGE_AGENT_ADK_ID",
+    "agent2_endpoint": "HOTEL_CONCIERGE_AGENT_ADK_ENDPOINT_ID",
+}
+
+
+def state_file_for(deployment):
+    return f".setup_state.{deployment}.json"
+
+
+def resource_alive(get_fn, dead_states=("DELETING", "DELETED", "FAILED", "CANCELING", "CANCELED")):
+    """Health check for reuse: the resource still exists and is not being torn down."""
+    def check(resource_id):
+        try:
+            return get_fn(resource_id).data.lifecycle_state not in dead_states
+        except oci.exceptions.ServiceError as e:
+            if e.status == 404:
+                return False
+            raise
+    return check
+
+
+def bucket_alive(os_client, ns):
+    def check(bucket_name):
+        try:
+            os_client.get_bucket(ns, bucket_name)
+            return True
+        except oci.exceptions.ServiceError as e:
+            if e.status == 404:
+                return False
+            raise
+    return check
+
+
+def count_source_objects(os_client, ns, bucket_name, prefix):
+    """Count the objects a data source will ingest (used for the ingestion ETA)."""
+    objects = oci.pagination.list_call_get_all_results(
+        os_client.list_objects, ns, bucket_name, prefix=prefix
+    ).data.objects
+    return len(objects)
+
+
+def build_provisioning_graph(os_client, agent_client, namespace, compartment_id, upload, state, wait=True,
+                             inventory=None, deployment=None):
+    """Describe the setup as a dependency graph.
+
+    The bucket/upload/ingestion branch and the two agent/endpoint branches
+    only meet at the RAG tool, so endpoint creation (the slowest step)
+    overlaps with everything else. Every resource that a later step builds
+    on is waited for until ACTIVE; with wait=True the graph also waits for
+    the ingestion job and both endpoints, so it finishes when the stack is
+    actually ready to serve.
+
+    Each step goes through the state store: a healthy resource created from
+    the same inputs on a previous run is reused instead of created again.
+    Inputs include the OCIDs of upstream resources, so recreating one step
+    also recreates everything built on top of it.
+
+    With an inventory, every resource is recorded under `deployment` the
+    moment it is created (or reused), before waiting on it.
+    """
+    graph = ProvisioningGraph()
+
+    def remember(name, result):
+        if inventory is not None and name in OCID_KEYS:
+            inventory.record(deployment, OCID_KEYS[name], result, compartment_id)
+        return result
+
+    def tracked(name, inputs, create, get_fn=None, label=None, wait_active=True):
+        is_healthy = resource_alive(get_fn) if get_fn else None
+        result = remember(name, state.resume(name, inputs, create, is_healthy))
+        if get_fn and wait_active:
+            wait_for_lifecycle(get_fn, result, label or name)
+            state.mark(name, STATUS_READY)
+        return result
+
+    # Object Storage and Knowledge Base branch
+    graph.add("bucket", lambda: remember("bucket", state.resume(
+        "bucket", {"compartment_id": compartment_id},
+        lambda: create_bucket(os_client, namespace, compartment_id, generate_unique_bucket_name()),
+        bucket_alive(os_client, namespace))))
+    graph.add("upload", lambda bucket: tracked(
+        "upload",
+        {"bucket": bucket, "file": FILE_TO_UPLOAD, "sha256": file_digest(FILE_TO_UPLOAD), "mode": upload.__name__},
+        lambda: upload(os_client, namespace, bucket, FILE_TO_UPLOAD)),
+              deps=["bucket"])
+    graph.add("knowledge_base", lambda: tracked(
+        "knowledge_base", {"compartment_id": compartment_id},
+        lambda: create_knowledge_base(agent_client, compartment_id),
+        agent_client.get_knowledge_base, "Knowledge base"))
+    graph.add("data_source",
+              lambda kb_id, bucket, object_name: tracked(
+                  "data_source", {"kb_id": kb_id, "bucket": bucket, "prefix": object_name},
+                  lambda: create_data_source(agent_client, compartment_id, kb_id, namespace, bucket, object_name),
+                  agent_client.get_data_source, "Data source"),
+              deps=["knowledge_base", "bucket", "upload"])
+    graph.add("ingestion_job",
+              lambda ds_id, kb_id, _object_name: tracked(
+                  "ingestion_job", {"ds_id": ds_id, "upload": state.get("upload")["inputs_digest"]},
+                  lambda: create_data_ingestion_job(agent_client, compartment_id, ds_id, kb_id),
+                  agent_client.get_data_ingestion_job, wait_active=False),
+              deps=["data_source", "knowledge_base", "upload"])
+
+    # Hotel_Concierge_Agent (with RAG tool)
+    graph.add("agent1", lambda: tracked(
+        "agent1", {"compartment_id": compartment_id, "display_name": "Hotel_Concierge_Agent"},
+        lambda: create_agent(
+            agent_client,
+            compartment_id,
+            "Hotel_Concierge_Agent",
+            "Hotel Concierge Agent for basic interactions with RAG capabilities",
+            "Hello! I'm your Hotel Concierge Agent. I can help you with information from our guest reviews. How can I assist you with your stay today?"
+        ),
+        agent_client.get_agent, "Hotel_Concierge_Agent"))
+    graph.add("agent1_rag_tool",
+              lambda agent_id, kb_id: tracked(
+                  "agent1_rag_tool", {"agent_id": agent_id, "kb_id": kb_id},
+                  lambda: create_rag_tool(agent_client, compartment_id, agent_id, kb_id),
+                  agent_client.get_tool, "RAG tool"),
+              deps=["agent1", "knowledge_base"])
+    graph.add("agent1_endpoint",
+              lambda agent_id, _tool_id: tracked(
+                  "agent1_endpoint", {"agent_id": agent_id},
+                  lambda: create_agent_endpoint(agent_client, compartment_id, agent_id, "Hotel_Concierge_Agent"),
+                  agent_client.get_agent_endpoint, wait_active=False),
+              deps=["agent1", "agent1_rag_tool"])
+
+    # Hotel_Concierge_Agent_ADK (for ADK usage, no RAG tool)
+    graph.add("agent2", lambda: tracked(
+        "agent2", {"compartment_id": compartment_id, "display_name": "Hotel_Concierge_Agent_ADK"},
+        lambda: create_agent(
+            agent_client,
+            compartment_id,
+            "Hotel_Concierge_Agent_ADK",
+            "Hotel Concierge Agent for ADK (Agent Development Kit) usage",
+            "Hello! I'm your Hotel Concierge Agent for ADK. How can I assist you with your stay today?"
+        ),
+        agent_client.get_agent, "Hotel_Concierge_Agent_ADK"))
+    graph.add("agent2_endpoint",
+              lambda agent_id: tracked(
+                  "agent2_endpoint", {"agent_id": agent_id},
+                  lambda: create_agent_endpoint(agent_client, compartment_id, agent_id, "Hotel_Concierge_Agent_ADK"),
+                  agent_client.get_agent_endpoint, wait_active=False),
+              deps=["agent2"])
+
+    if wait:
+        # Readiness gates: the stack is usable once these complete.
+        def wait_for_ingestion(job_id, bucket, prefix, kb_id):
+            job = wait_for_ingestion_job(
+                agent_client, job_id,
+                expected_files=count_source_objects(os_client, namespace, bucket, prefix))
+            state.mark("ingestion_job", STATUS_READY)
+            # Cached retrievals (rag_cache.py) of this knowledge base are now stale.
+            mark_ingested(kb_id, job_id)
+            return job
+
+        def wait_for_endpoints(ep1, ep2):
+            ready = wait_for_all({
+                "agent1_endpoint": lambda: wait_for_lifecycle(
+                    agent_client.get_agent_endpoint, ep1, "Hotel_Concierge_Agent endpoint"),
+                "agent2_endpoint": lambda: wait_for_lifecycle(
+                    agent_client.get_agent_endpoint, ep2, "Hotel_Concierge_Agent_ADK endpoint"),
+            })
+            for name in ready:
+                state.mark(name, STATUS_READY)
+            return ready
+
+        graph.add("ingestion_complete", wait_for_ingestion,
+                  deps=["ingestion_job", "bucket", "upload", "knowledge_base"])
+        graph.add("endpoints_active", wait_for_endpoints,
+                  deps=["agent1_endpoint", "agent2_endpoint"])
+
+    return graph
 
 
 def main():
@@ -204,70 +420,81 @@ def main():
     
     parser = argparse.ArgumentParser(description="OCI Generative AI Agent Setup")
     parser.add_argument("--compartment-id", help="Optional compartment OCID (defaults to tenancy from OCI config)")
+    parser.add_argument("--no-pack", action="store_true", help="Upload the dataset as a single object instead of packed review objects")
+    parser.add_argument("--no-wait", action="store_true", help="Do not wait for ingestion and endpoints to become ready")
+    parser.add_argument("--deployment", help="Deployment name; reuse an existing one to resume it (default: a new name)")
+    parser.add_argument("--inventory", default=INVENTORY_FILE, help=f"Deployment inventory database (default: {INVENTORY_FILE})")
+    parser.add_argument("--state-file", help="Provisioning state file used to resume reruns (default: .setup_state.<deployment>.json)")
+    parser.add_argument("--fresh", action="store_true", help="Ignore previous state and create every resource again "
+                             "(refused for a deployment that still has recorded resources)")
+    parser.add_argument("--max-workers", type=int, default=8, help="Maximum provisioning steps to run concurrently")
     args = parser.parse_args()
 
     # Load config (DEFAULT profile or OCI_CLI_PROFILE if set)
     print("🔄 Loading OCI configuration...")
-    config = oci.config.from_file("~/.oci/config", oci.config.DEFAULT_PROFILE)
-
-    # Default: tenancy from config file
-    compartment_id = args.compartment_id if args.compartment_id else config["tenancy"]
+    clients = ClientFactory()
+
+    inventory = Inventory(args.inventory)
+    deployment = args.deployment or new_deployment_name()
+    existing = inventory.deployment(deployment)
+    if args.fresh and existing:
+        # Recreating would overwrite the recorded OCIDs, leaving the old resources untracked.
+        recorded = inventory.ocids(deployment)
+        if recorded:
+            parser.error(f"deployment {deployment} still has {len(recorded)} recorded resource(s); remove them with "
+                         f"cleanup.py --deployment {deployment}, or omit --deployment to start a new one")
+
+    # Default: the deployment's compartment when resuming, else tenancy from config file
+    compartment_id = args.compartment_id or (existing and existing["compartment_id"]) or clients.tenancy
     print(f"✅ Using compartment ID: {compartment_id}")
+    inventory.create_deployment(deployment, compartment_id, STATUS_PROVISIONING)
+    print(f"✅ Deployment: {deployment} ({'resuming' if existing else 'new'}, recorded in {args.inventory})")
 
     print("🔄 Initializing OCI clients...")
-    os_client = oci.object_storage.ObjectStorageClient(config)
-    agent_client = oci.generative_ai_agent.GenerativeAiAgentClient(config)
+    os_client = clients.object_storage()
+    agent_client = clients.genai_agent()
     namespace = os_client.get_namespace().data
     print(f"✅ Object Storage namespace: {namespace}")
 
-    # Generate a unique bucket name
-    BUCKET_NAME = generate_unique_bucket_name()
+    state_file = args.state_file or state_file_for(deployment)
+    if args.fresh and os.path.exists(state_file):
+        os.remove(state_file)
+    state = StateStore(state_file)
+    if state.steps:
+        print(f"♻️  Resuming from {state_file} ({len(state.steps)} step(s) recorded)")
 
-    print("\n📦 STEP 1: Setting up Object Storage")
-    print("-" * 40)
-    bucket = create_bucket(os_client, namespace, compartment_id, BUCKET_NAME)
-    object_name = upload_file(os_client, namespace, bucket, FILE_TO_UPLOAD)
+    upload = upload_file if args.no_pack else upload_packed_reviews
 
-    print("\n🧠 STEP 2: Creating Knowledge Base and Data Source")
-    print("-" * 40)
-    kb_id = create_knowledge_base(agent_client, compartment_id)
-    ds_id = create_data_source(agent_client, compartment_id, kb_id, namespace, bucket, object_name)
-    
-    print("\n📊 STEP 3: Data Ingestion")
+    print("\n🕸️  Provisioning resources (independent steps run concurrently)")
     print("-" * 40)
-    ingestion_job_id = create_data_ingestion_job(agent_client, compartment_id, ds_id, kb_id)
-
-    print("\n🤖 STEP 4: Creating Agents")
-    print("-" * 40)
-    
-    # Create first agent (Hotel_Concierge_Agent) with RAG tool
-    print("\n🔹 Creating Hotel_Concierge_Agent (with RAG tool)...")
-    agent1_id = create_agent(
-        agent_client, 
-        compartment_id, 
-        "Hotel_Concierge_Agent",
-        "Hotel Concierge Agent for basic interactions with RAG capabilities",
-        "Hello! I'm your Hotel Concierge Agent. I can help you with information from our guest reviews. How can I assist you with your stay today?"
-    )
-    agent1_tool_id = create_rag_tool(agent_client, compartment_id, agent1_id, kb_id)
-    agent1_endpoint_id = create_agent_endpoint(agent_client, compartment_id, agent1_id, "Hotel_Concierge_Agent")
-
-    # Create second agent (Hotel_Concierge_Agent_ADK) without RAG tool
-    print("\n🔹 Creating Hotel_Concierge_Agent_ADK (for ADK usage)...")
-    agent2_id = create_agent(
-        agent_client, 
-        compartment_id, 
-        "Hotel_Concierge_Agent_ADK",
-        "Hotel Concierge Agent for ADK (Agent Development Kit) usage",
-        "Hello! I'm your Hotel Concierge Agent for ADK. How can I assist you with your stay today?"
-    )
-    agent2_endpoint_id = create_agent_endpoint(agent_client, compartment_id, agent2_id, "Hotel_Concierge_Agent_ADK")
-
-    print("\n💾 STEP 5: Saving Configuration")
-    print("-" * 40)
-    write_ocids(bucket, kb_id, ds_id, ingestion_job_id, agent1_id, agent1_endpoint_id, agent1_tool_id, agent2_id, agent2_endpoint_id)
-
-    print("\n🎉 Setup Complete!")
+    graph = build_provisioning_graph(os_client, agent_client, namespace, compartment_id, upload, state,
+                                     wait=not args.no_wait, inventory=inventory, deployment=deployment)
+    try:
+        results = graph.run(max_workers=args.max_workers)
+    except Exception:
+        print(f"\n💡 Resources created so far are recorded under deployment '{deployment}'. "
+              f"Rerun with --deployment {deployment} to resume, or cleanup.py --deployment {deployment} to remove them.")
+        raise
+    finally:
+        graph.print_summary()
+        clients.print_summary()
+
+    bucket = results["bucket"]
+    kb_id = results["knowledge_base"]
+    ds_id = results["data_source"]
+    ingestion_job_id = results["ingestion_job"]
+    agent1_id = results["agent1"]
+    agent1_tool_id = results["agent1_rag_tool"]
+    agent1_endpoint_id = results["agent1_endpoint"]
+    agent2_id = results["agent2"]
+    agent2_endpoint_id = results["agent2_endpoint"]
+
+    inventory.set_status(deployment, STATUS_ACTIVE)
+
+    if args.no_wait:
+        print("\n🎉 Setup Complete! (ingestion and endpoints may still be in progress)")
+    else:
+        print(f"\n🎉 Setup Complete! Stack ready at {datetime.utcnow().isoformat(timespec='seconds')}Z")
     print("=" * 60)
     print("✅ Created resources:")
     print(f"   • Bucket: {bucket}")
@@ -278,7 +505,8 @@ def main():
     print(f"   • Hotel_Concierge_Agent_ADK: {agent2_id}")
     print(f"   • RAG Tool: {agent1_tool_id}")
     print(f"   • Endpoints: {agent1_endpoint_id}, {agent2_endpoint_id}")
-    print(f"\n📄 All OCIDs saved to: {OCIDS_FILE}")
+    print(f"\n📄 All OCIDs saved to {args.inventory} as deployment: {deployment}")
+    print(f"   (python inventory.py show {deployment} prints them as KEY=VALUE lines)")
 
 
 if __name__ == "__main__":
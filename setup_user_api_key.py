@@ -13,6 +13,8 @@ import sys
 import oci
 import shutil
 
+from oci_clients import ClientFactory
+
 DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.oci')
 DEFAULT_CONFIG_LOCATION = os.path.abspath(os.path.join(DEFAULT_DIRECTORY, 'config'))
 DEFAULT_KEY_NAME = 'oci_api_key'
@@ -498,17 +500,9 @@ def write_private_key_to_file(filename, private_key, passphrase, add_private_key
     return True
 
 def public_key_to_fingerprint(public_key):
-    bytes = public_key.public_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo)
-
-    header = b'-----BEGIN PUBLIC KEY-----'
-    footer = b'-----END PUBLIC KEY-----'
-    bytes = bytes.replace(header, b'').replace(footer, b'').replace(b'\n', b'')
-
-    key = base64.b64decode(bytes)
-    fp_plain = md5(key).hexdigest()
-    return ':'.join(a + b for a, b in zip(fp_plain[::2], fp_plain[1::2]))
+    # Imported here: fingerprint.py falls back to the md5 defined above.
+    from fingerprint import fingerprint_public_key
+    return fingerprint_public_key(public_key)
 
 def serialize_key(private_key=None, public_key=None, passphrase=None):
     """
@@ -578,10 +572,8 @@ def get_tenancy_id():
     #     return None
 
 def upload_public_key_to_user(filename, user_id):
-    # Load config from ~/.oci/config (use a profile if not DEFAULT)
-    config = oci.config.from_file()
-
-    identity_client = oci.identity.IdentityClient(config)
+    # Load config from ~/.oci/config (OCI_CLI_PROFILE if not DEFAULT)
+    identity_client = ClientFactory().identity()
 
     # Read your public key file (the PEM you generated earlier)
     with open(filename, "r") as f:
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Provisioning State Store
+------------------------
+A small JSON file that remembers what setup.py already created, so that a
+rerun reuses healthy resources instead of creating duplicates, and resumes
+after a partial failure.
+
+For every step it records:
+  - status:  CREATED (resource exists), READY (waited until usable) or FAILED
+  - inputs:  the values the resource was created from (plus their digest)
+  - result:  the OCID / name returned by the create call
+
+A step is reused only when its inputs are unchanged and an optional health
+check confirms the resource still exists. Writes are atomic (temp file +
+rename) and thread-safe, since provisioning steps run concurrently.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+STATE_FILE = ".setup_state.json"
+STATE_VERSION = 1
+
+STATUS_CREATED = "CREATED"
+STATUS_READY = "READY"
+STATUS_FAILED = "FAILED"
+
+
+def inputs_digest(inputs):
+    """Stable digest of a step's inputs."""
+    encoded = json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_digest(path, block_size=1 << 20):
+    """SHA-256 of a file's content, used as an input for upload steps."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class StateStore:
+    """Thread-safe JSON state file with atomic writes."""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {"version": STATE_VERSION, "steps": {}}
+        with open(self.path, "r") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported state file version in {self.path}: {state.get('version')}")
+        return state
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".state-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._state, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @property
+    def steps(self):
+        with self._lock:
+            return json.loads(json.dumps(self._state["steps"]))
+
+    def get(self, name):
+        with self._lock:
+            step = self._state["steps"].get(name)
+            return dict(step) if step else None
+
+    def record(self, name, status, inputs=None, result=None, error=None):
+        with self._lock:
+            step = self._state["steps"].setdefault(name, {})
+            step["status"] = status
+            step["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            if inputs is not None:
+                step["inputs"] = inputs
+                step["inputs_digest"] = inputs_digest(inputs)
+            if result is not None:
+                step["result"] = result
+            if error is not None:
+                step["error"] = str(error)
+            else:
+                step.pop("error", None)
+            self._save()
+
+    def mark(self, name, status):
+        self.record(name, status)
+
+    def forget(self, name):
+        with self._lock:
+            if self._state["steps"].pop(name, None) is not None:
+                self._save()
+
+    def reusable(self, name, inputs, is_healthy=None):
+        """Return the stored result for `name` if it can be reused, else None."""
+        step = self.get(name)
+        if not step or step.get("result") is None:
+            return None
+        if step.get("status") not in (STATUS_CREATED, STATUS_READY):
+            return None
+        if step.get("inputs_digest") != inputs_digest(inputs):
+            return None
+        if is_healthy is not None and not is_healthy(step["result"]):
+            return None
+        return step["result"]
+
+    def resume(self, name, inputs, create, is_healthy=None):
+        """Reuse a healthy resource from a previous run, or create it now.
+
+        `create` is only called when there is no reusable result; its return
+        value is recorded immediately so that a crash right afterwards does
+        not leak the resource on the next run.
+        """
+        result = self.reusable(name, inputs, is_healthy)
+        if result is not None:
+            print(f"♻️  Reusing {name} from previous run: {result}")
+            return result
+
+        try:
+            result = create()
+        except Exception as e:
+            self.record(name, STATUS_FAILED, inputs=inputs, error=e)
+            raise
+        self.record(name, STATUS_CREATED, inputs=inputs, result=result)
+        return result
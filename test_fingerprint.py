@@ -0,0 +1,73 @@
+"""Tests for fingerprint.py: run with `python -m pytest test_fingerprint.py`."""
+
+import hashlib
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+
+import fingerprint
+import setup_user_api_key
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return setup_user_api_key.generate_key(2048)
+
+
+@pytest.fixture(scope="module")
+def public_der(private_key):
+    return private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo)
+
+
+@pytest.mark.parametrize("backend", sorted(fingerprint.BACKENDS))
+@pytest.mark.parametrize("message, expected", fingerprint.RFC1321_VECTORS)
+def test_rfc1321_vectors(backend, message, expected):
+    assert fingerprint.BACKENDS[backend](message) == expected
+
+
+@pytest.mark.parametrize("length", [55, 56, 63, 64, 65, 1000])
+def test_pure_md5_matches_hashlib_across_block_boundaries(length):
+    message = bytes(range(256)) * (length // 256) + bytes(range(length % 256))
+    expected = hashlib.md5(message, usedforsecurity=False).hexdigest()
+    assert fingerprint.BACKENDS["pure"](message) == expected
+
+
+def test_backends_agree_on_a_real_key(public_der):
+    results = {name: fingerprint.fingerprint_der(public_der, name) for name in fingerprint.BACKENDS}
+    assert len(set(results.values())) == 1
+
+
+def test_fingerprint_is_colon_separated_md5_of_der(public_der):
+    expected = hashlib.md5(public_der, usedforsecurity=False).hexdigest()
+    result = fingerprint.fingerprint_der(public_der)
+    assert result.replace(":", "") == expected
+    assert len(result.split(":")) == 16
+
+
+def test_public_and_private_pem_give_the_same_fingerprint(private_key, public_der):
+    public_pem = setup_user_api_key.serialize_key(public_key=private_key.public_key())
+    private_pem = setup_user_api_key.serialize_key(private_key=private_key)
+    expected = fingerprint.fingerprint_der(public_der)
+    assert fingerprint.fingerprint_pem(public_pem) == expected
+    assert fingerprint.fingerprint_pem(private_pem) == expected
+    assert fingerprint.fingerprint_public_key(private_key.public_key()) == expected
+
+
+def test_fingerprint_files_reports_unreadable_files(private_key, public_der, tmp_path):
+    labelled = tmp_path / "oci_api_key.pem"
+    labelled.write_bytes(setup_user_api_key.serialize_key(private_key=private_key) + b"OCI_API_KEY\n")
+    broken = tmp_path / "broken.pem"
+    broken.write_bytes(b"not a key")
+    missing = tmp_path / "missing.pem"
+
+    results = fingerprint.fingerprint_files([str(labelled), str(broken), str(missing)])
+    assert results[str(labelled)] == fingerprint.fingerprint_der(public_der)
+    assert isinstance(results[str(broken)], ValueError)
+    assert isinstance(results[str(missing)], OSError)
+
+
+def test_check_passes(capsys):
+    assert fingerprint.check(key_count=1) == 0
+    assert "❌" not in capsys.readouterr().out
@@ -0,0 +1,69 @@
+"""Tests for review_triage.py: run with `python -m pytest test_review_triage.py`."""
+
+import numpy as np
+import pytest
+
+import review_triage
+
+SHORT_SEVERE = [
+    "Bed bugs. We got bitten all night by bed bugs",
+    "Rude staff. The receptionist was rude",
+    "Food poisoning. Got sick after dinner",
+    "Stolen. My laptop was stolen from the room",
+    "Punaises de lit. Nous avons été piqués toute la nuit par des punaises",
+    "Wanzen. Wanzen im Bett",
+    "Con rệp. Phòng có con rệp",
+]
+SHORT_POSITIVE = [
+    "Lovely stay. Great staff",
+    "Perfect. Clean room and friendly staff, highly recommend",
+    "Sehr gut. Sauber und freundlich",
+]
+
+
+@pytest.fixture(scope="module")
+def model():
+    return review_triage.default_model()
+
+
+@pytest.mark.parametrize("text", SHORT_SEVERE)
+def test_short_severe_reviews_are_escalated(model, text):
+    scores = model.score_many([text])
+    assert scores.flagged[0]
+    assert scores.escalate()[0]
+
+
+@pytest.mark.parametrize("text", SHORT_POSITIVE)
+def test_short_positive_reviews_get_a_template(model, text):
+    scores = model.score_many([text])
+    assert not scores.escalate()[0]
+    assert scores.p_negative[0] < review_triage.POSITIVE_CUTOFF
+
+
+def test_flags_escalate_whatever_the_thresholds(model):
+    scores = model.score_many(SHORT_SEVERE)
+    assert scores.escalate(threshold=1.1, severity_threshold=1.1).all()
+
+
+def test_lexicon_flags():
+    flags = review_triage.lexicon_flags([
+        "The room was noisy",                               # more negative than positive seeds
+        "Great, friendly and clean, a bit noisy",           # clearly positive overall
+        "There was mould in the bathroom",                  # incident seed
+        "Great, friendly, clean hotel; no mould anywhere",  # incident seed in a clearly positive review
+        "Good room",
+    ])
+    assert flags.tolist() == [True, False, True, False, False]
+
+
+def test_fit_calibration_recovers_a_known_scale():
+    rng = np.random.default_rng(0)
+    logits = rng.normal(0, 2, 20000)
+    y = rng.random(len(logits)) < review_triage._sigmoid(3 * logits - 1)
+    scale, offset = review_triage.fit_calibration(logits, y)
+    assert scale == pytest.approx(3, rel=0.1)
+    assert offset == pytest.approx(-1, abs=0.15)
+
+
+def test_fit_calibration_with_a_single_class():
+    assert review_triage.fit_calibration(np.array([0.5, 1.0]), np.array([False, False])) == (1.0, 0.0)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Local Text Embeddings
+---------------------
+Cheap, deterministic review vectors computed locally with NumPy, for
+comparing reviews without a round trip to an embedding model:
+
+  - words and word bigrams, lowercased and accent-folded
+  - character 4-grams inside words (typos, inflections, mixed languages)
+  - signed feature hashing into DIM buckets (crc32, stable across runs)
+  - IDF weights fitted on the review corpus, then L2 normalisation
+
+Vectors are unit length, so cosine similarity is a dot product.
+
+Usage:
+  embedder = default_embedder()
+  vectors = embedder.embed_many(texts)          # (n, DIM) float32
+  similarity = vectors @ embedder.embed(query)
+"""
+
+import functools
+import itertools
+import os
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+from review_corpus import CORPUS_FILE, iter_reviews
+
+DIM = 1 << 12
+CHAR_NGRAM = 4
+BATCH_SIZE = 1024
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_COMBINING_RE = re.compile(r"[\u0300-\u036f]")
+
+
+def normalize(text):
+    """Lowercase and strip accents (đ included), so 'Khách sạn' ~ 'khach san'."""
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFKD", text.lower().replace("đ", "d")))
+
+
+def tokenize(text):
+    return _WORD_RE.findall(normalize(text))
+
+
+def features(tokens):
+    """Feature strings of a token list."""
+    found = list(tokens)
+    found += [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for token in tokens:
+        if len(token) > CHAR_NGRAM:
+            padded = f"<{token}>"
+            found += [padded[i:i + CHAR_NGRAM] for i in range(len(padded) - CHAR_NGRAM + 1)]
+    return found
+
+
+def feature_hashes(text):
+    """crc32 of every feature of a text (stable across processes, unlike hash())."""
+    return [zlib.crc32(f.encode("utf-8")) for f in features(tokenize(text))]
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder with optional IDF weighting."""
+
+    def __init__(self, dim=DIM, idf=None):
+        self.dim = dim
+        self.idf = idf
+
+    def _counts(self, texts):
+        """Yield (start, signed bucket counts) for batches of texts."""
+        for start in range(0, len(texts), BATCH_SIZE):
+            hashes = [feature_hashes(text) for text in texts[start:start + BATCH_SIZE]]
+            lengths = [len(h) for h in hashes]
+            codes = np.fromiter(itertools.chain.from_iterable(hashes), np.uint32, sum(lengths))
+            rows = np.repeat(np.arange(len(hashes), dtype=np.int64), lengths)
+            # Bucket from the low bits, sign from the top bit.
+            flat = rows * self.dim + (codes % self.dim)
+            signs = np.where(codes >> 31, 1.0, -1.0)
+            counts = np.bincount(flat, weights=signs, minlength=len(hashes) * self.dim)
+            yield start, counts.reshape(len(hashes), self.dim)
+
+    def embed_many(self, texts):
+        """Embed texts into an (n, dim) float32 matrix of unit rows."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start, counts in self._counts(texts):
+            matrix[start:start + len(counts)] = counts
+        # Sublinear term frequency keeps one repeated word from dominating.
+        np.copysign(np.log1p(np.abs(matrix)), matrix, out=matrix)
+        if self.idf is not None:
+            matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed(self, text):
+        return self.embed_many([text])[0]
+
+    def fit_idf(self, texts):
+        """Weight buckets by inverse document frequency over `texts`."""
+        df = np.zeros(self.dim, dtype=np.float64)
+        for _, counts in self._counts(texts):
+            df += (counts != 0).sum(axis=0)
+        self.idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+        return self
+
+
+@functools.lru_cache(maxsize=None)
+def default_embedder(corpus_file=CORPUS_FILE):
+    """Embedder with IDF fitted on the review corpus (unweighted if it is missing)."""
+    embedder = HashingEmbedder()
+    if os.path.exists(corpus_file):
+        embedder.fit_idf([f"{r.title} {r.text}" for r in iter_reviews(corpus_file)])
+    return embedder
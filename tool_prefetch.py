@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Speculative Tool Prefetch
+-------------------------
+A concierge run usually ends up looking up events at the date and place a
+review mentions, and the reviews of the hotel it names, one turn at a time,
+after the first LLM turn has decided to. This module starts those calls
+before the agent does:
+
+  1. extract_signals() pulls dates, locations and hotel names out of the
+     input with local rules (no LLM)
+  2. prefetch_run() launches the likely calls of every @prefetchable tool
+     concurrently, on a shared thread pool, while the first LLM turn runs
+  3. when the agent calls the tool, the wrapper serves the result from the
+     run's cache if a speculative call matches (same or similar
+     arguments), waiting for it if it is still in flight
+
+Only client-side function tools can be prefetched: the RAG tool runs on
+the agent endpoint inside the chat turn.
+
+Usage:
+  @tool
+  @prefetchable(lambda signals: [{"hotel": h} for h in signals.hotels[:2]])
+  def reviews_for_hotel(hotel: str, page: int = 1, page_size: int = 10): ...
+
+  with prefetch_run(prompt) as run:
+      agent.run(prompt)
+  print(run.summary())
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from review_corpus import extract_hotel_mentions
+from text_embedding import HashingEmbedder
+
+MAX_WORKERS = 8
+MAX_SPECULATIVE_CALLS = 4
+# Cosine similarity at which an agent's query is served by a prefetched one
+MATCH_THRESHOLD = 0.55
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july", "august", "september",
+          "october", "november", "december"]
+_MONTH_ALT = "|".join([m.capitalize() for m in MONTHS] + [m[:3].capitalize() for m in MONTHS])
+_DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s+(\d{4}))?"
+_DAY_MONTH_RE = re.compile(rf"\b{_DAY}\s+(?:of\s+)?({_MONTH_ALT})\.?{_YEAR}\b")
+_MONTH_DAY_RE = re.compile(rf"\b({_MONTH_ALT})\.?\s+{_DAY}\b{_YEAR}")
+_ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_LOCATION_RE = re.compile(r"\b(?:in|at|near|around|outside|opposite)\s+((?:[A-Z][\w'’-]+)(?:\s+[A-Z][\w'’-]+){0,3})")
+_NOT_PLACES = {"the", "a", "an", "your", "our", "my", "this", "that", "i", "we", "it", "there", "here"}
+
+# Queries are short: plain hashed features match them well, and need no IDF fitting.
+_query_embedder = HashingEmbedder()
+_current_run = contextvars.ContextVar("prefetch_run", default=None)
+_registry = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class Signals:
+    """What a review mentions that tools are likely to be asked about."""
+
+    def __init__(self, dates, locations, hotels):
+        self.dates = dates
+        self.locations = locations
+        self.hotels = hotels
+
+    def __bool__(self):
+        return bool(self.dates or self.locations or self.hotels)
+
+    def to_dict(self):
+        return {"dates": self.dates, "locations": self.locations, "hotels": self.hotels}
+
+
+def _month_name(value):
+    value = value.lower()[:3]
+    return next(m for m in MONTHS if m.startswith(value)).capitalize()
+
+
+def extract_dates(text):
+    """Dates like 'August 15th', '15 Aug 2024' or '2024-08-15', as 'D Month [YYYY]'."""
+    found = []
+    for match in _DAY_MONTH_RE.finditer(text):
+        day, month, year = match.groups()
+        found.append((match.start(), f"{int(day)} {_month_name(month)}" + (f" {year}" if year else "")))
+    for match in _MONTH_DAY_RE.finditer(text):
+        month, day, year = match.groups()
+        found.append((match.start(), f"{int(day)} {_month_name(month)}" + (f" {year}" if year else "")))
+    for match in _ISO_DATE_RE.finditer(text):
+        year, month, day = match.groups()
+        if 1 <= int(month) <= 12:
+            found.append((match.start(), f"{int(day)} {MONTHS[int(month) - 1].capitalize()} {year}"))
+    return _unique(value for _, value in sorted(found) if 1 <= int(value.split()[0]) <= 31)
+
+
+def extract_locations(text, hotels=()):
+    """Capitalised place names after 'in', 'at', 'near', ... that are not hotels or dates."""
+    found = []
+    for match in _LOCATION_RE.finditer(text):
+        words = match.group(1).split()
+        while words and (words[0].lower() in _NOT_PLACES or words[0].lower()[:3] in (m[:3] for m in MONTHS)):
+            words.pop(0)
+        name = " ".join(words).strip(" .,;:!?'\"’")
+        if len(name) > 2 and name not in hotels and not any(name in h or h in name for h in hotels):
+            found.append(name)
+    return _unique(found)
+
+
+def extract_signals(text):
+    hotels = extract_hotel_mentions(text)
+    return Signals(extract_dates(text), extract_locations(text, hotels), hotels)
+
+
+def _unique(values):
+    seen = []
+    for value in values:
+        if value not in seen:
+            seen.append(value)
+    return seen
+
+
+def event_lookups(signals, limit=MAX_SPECULATIVE_CALLS):
+    """The (place, date) event lookups a concierge is likely to make for these signals."""
+    return [(place, date) for date in signals.dates[:2] for place in signals.locations[:2]][:limit]
+
+
+# ---- per-run cache ----
+def _shared_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="prefetch")
+        return _executor
+
+
+class Prefetch:
+    """One speculative call and its future."""
+
+    def __init__(self, tool, kwargs, future):
+        self.tool = tool
+        self.kwargs = kwargs
+        self.started = time.monotonic()
+        self.finished = None
+        self.used = False
+        self.future = future
+        future.add_done_callback(self._done)
+
+    def _done(self, _future):
+        self.finished = time.monotonic()
+
+
+class PrefetchRun:
+    """Speculative calls of one agent run, matched against the calls it makes."""
+
+    def __init__(self, signals):
+        self.signals = signals
+        self.prefetches = []
+        self.served = 0
+        self.missed = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def launch(self):
+        executor = _shared_executor()
+        for name, (func, signature, speculate) in _registry.items():
+            for kwargs in speculate(self.signals) if self.signals else []:
+                kwargs = _call_arguments(signature, (), kwargs)
+                self.prefetches.append(Prefetch(name, kwargs, executor.submit(func, **kwargs)))
+
+    def _match(self, tool, kwargs):
+        candidates = [p for p in self.prefetches if p.tool == tool and not p.used]
+        for prefetch in candidates:
+            if prefetch.kwargs == kwargs:
+                return prefetch
+        # Free-text arguments (search queries) rarely match verbatim.
+        texts = [(k, v) for k, v in kwargs.items() if isinstance(v, str)]
+        if len(texts) != 1 or not candidates:
+            return None
+        key, value = texts[0]
+        # Only the free text may differ: page=2 is never served by page=1.
+        rest = {k: v for k, v in kwargs.items() if k != key}
+        candidates = [p for p in candidates if isinstance(p.kwargs.get(key), str)
+                      and {k: v for k, v in p.kwargs.items() if k != key} == rest]
+        if not candidates:
+            return None
+        vectors = _query_embedder.embed_many([value] + [p.kwargs[key] for p in candidates])
+        similarities = vectors[1:] @ vectors[0]
+        best = int(similarities.argmax())
+        return candidates[best] if similarities[best] >= MATCH_THRESHOLD else None
+
+    def call(self, tool, func, kwargs):
+        with self._lock:
+            prefetch = self._match(tool, kwargs)
+            if prefetch is not None:
+                prefetch.used = True
+        if prefetch is None:
+            self.missed += 1
+            return func(**kwargs)
+        asked = time.monotonic()
+        try:
+            result = prefetch.future.result()
+        except Exception:
+            self.missed += 1
+            return func(**kwargs)
+        self.served += 1
+        # Latency taken off the agent's critical path: all of the call if it
+        # had finished, else the part that ran before the agent asked.
+        self.saved_seconds += min(prefetch.finished or asked, asked) - prefetch.started
+        return result
+
+    def summary(self):
+        return {
+            "signals": self.signals.to_dict(),
+            "prefetched": len(self.prefetches),
+            "served": self.served,
+            "missed": self.missed,
+            "wasted": sum(1 for p in self.prefetches if not p.used),
+            "saved_s": round(self.saved_seconds, 2),
+        }
+
+
+def _call_arguments(signature, args, kwargs):
+    """Keyword arguments of a call, defaults included, so equal calls compare equal."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+def prefetchable(speculate):
+    """Let a tool's calls be prefetched: speculate(signals) -> list of kwargs dicts."""
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        _registry[func.__name__] = (func, signature, speculate)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            kwargs = _call_arguments(signature, args, kwargs)
+            run = _current_run.get()
+            if run is None:
+                return func(**kwargs)
+            return run.call(func.__name__, func, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def prefetch_run(text, enabled=True):
+    """Start speculative calls for `text` and serve them to tools called inside the block."""
+    run = PrefetchRun(extract_signals(text) if enabled else Signals([], [], []))
+    run.launch()
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        for prefetch in run.prefetches:
+            if not prefetch.used:
+                prefetch.future.cancel()